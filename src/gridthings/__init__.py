@@ -1,9 +1,32 @@
 from importlib_metadata import version
 
-from .cell import Cell, OutOfBoundsCell
-from .collection import Collection
+from .bitgrid import BitGrid, MultiBitGrid
+from .cell import (
+    BaseCell,
+    Cell,
+    CellView,
+    FastCell,
+    FastOutOfBoundsCell,
+    OutOfBoundsCell,
+)
+from .collection import Collection, ColumnarCollection
+from .components import Component
 from .grid import Grid
-from .typed_grids import IntCell, IntGrid
+from .sparse import SparseGrid
+from .storage import ArrayStorage, DictStorage, HashStorage, MmapStorage, Storage
+from .topology import Topology
+from .tracking import KInARow, LineSums, Tracker, ValueCounts
+from .typed_grids import (
+    BoolCell,
+    BoolGrid,
+    CharCell,
+    CharGrid,
+    FloatCell,
+    FloatGrid,
+    IntCell,
+    IntGrid,
+)
+from .views import LineView, SubGridView
 
 # Recommended way to handle __version__ when defining it only in pyproject.toml
 # https://github.com/python-poetry/poetry/issues/1036#issuecomment-489880822
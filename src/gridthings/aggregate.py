@@ -0,0 +1,359 @@
+import collections
+import functools
+import math
+import operator
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# Whole-grid operations that work on a flat, row-major sequence of values
+# instead of calling grid.peek() once per cell.  For a regular grid with
+# `width` columns, the value at y, x lives at values[y * width + x].
+#
+# neighbor_reduce answers "what is the min/max/sum of every cell's neighbors"
+# for all cells at once.  For each neighbor offset it lines up a shifted copy
+# of each row against the original using list slices, and folds that into
+# a running result, so the work is a handful of slice operations per offset
+# rather than one Cell and Collection per cell.
+
+# Neighbor offsets at distance 1, in the same order as grid.peek_linear,
+# grid.peek_diagonal, and grid.peek_all
+NEIGHBOR_OFFSETS: Dict[str, List[Tuple[int, int]]] = {
+    "linear": [(0, -1), (0, 1), (-1, 0), (1, 0)],
+    "diagonal": [(-1, -1), (-1, 1), (1, -1), (1, 1)],
+}
+NEIGHBOR_OFFSETS["all"] = NEIGHBOR_OFFSETS["linear"] + NEIGHBOR_OFFSETS["diagonal"]
+
+# Marks "no neighbor has been seen yet" in a running result, and is the
+# pad value meaning "leave out-of-bounds neighbors out of the result"
+SKIP = object()
+
+
+def neighbor_offsets(neighbors: str, distance: int = 1) -> List[Tuple[int, int]]:
+    "Return the y, x offsets for 'linear', 'diagonal', or 'all' neighbors"
+    if neighbors not in NEIGHBOR_OFFSETS:
+        raise ValueError(
+            f"neighbors must be one of {list(NEIGHBOR_OFFSETS)}, got {neighbors!r}"
+        )
+    return [(dy * distance, dx * distance) for dy, dx in NEIGHBOR_OFFSETS[neighbors]]
+
+
+def _fold(
+    reducer: Callable[[Any, Any], Any], current: Sequence[Any], new: Sequence[Any]
+) -> List[Any]:
+    "Combine a slice of the running result with a slice of neighbor values"
+    return [n if c is SKIP else reducer(c, n) for c, n in zip(current, new)]
+
+
+def neighbor_reduce(
+    values: Sequence[Any],
+    height: int,
+    width: int,
+    offsets: List[Tuple[int, int]],
+    reducer: Callable[[Any, Any], Any],
+    pad: Any = SKIP,
+) -> List[Any]:
+    """
+    Reduce the neighbors at each offset for every position in a flat grid.
+    reducer combines two values, e.g. min, max, or operator.add.
+
+    Out-of-bounds neighbors count as `pad`, or are left out when pad is SKIP.
+    Positions with no neighbors at all come back as None.
+    """
+    result: List[Any] = [SKIP] * (height * width)
+    for dy, dx in offsets:
+        # The columns whose neighbor at dx is inside the row
+        x_start, x_stop = max(0, -dx), min(width, width - dx)
+        for y in range(height):
+            row = y * width
+            if 0 <= y + dy < height and x_start < x_stop:
+                src = (y + dy) * width + dx
+                result[row + x_start : row + x_stop] = _fold(
+                    reducer,
+                    result[row + x_start : row + x_stop],
+                    values[src + x_start : src + x_stop],
+                )
+                edges = [(row, row + x_start), (row + x_stop, row + width)]
+            else:
+                edges = [(row, row + width)]
+            if pad is SKIP:
+                continue
+            for start, stop in edges:
+                if start < stop:
+                    result[start:stop] = _fold(
+                        reducer, result[start:stop], [pad] * (stop - start)
+                    )
+    return [None if value is SKIP else value for value in result]
+
+
+# Sliding windows ---------------------------------------------------------------
+# window_reduce answers "what is the largest product of k adjacent values"
+# style questions.  Each row, column, or diagonal is walked once with a
+# rolling sum / product or a monotonic deque for min / max, instead of
+# building a Collection for every starting cell.  Rolling sums and products
+# are only exact for ints, adding and dividing floats back out of a window
+# piles up rounding errors (and inf / inf is nan), so lines holding anything
+# else have each window's sum or product worked out on its own.
+
+# The (y_step, x_step) of each window direction, matching grid.line()
+WINDOW_DIRECTIONS: Dict[str, Tuple[int, int]] = {
+    "right": (0, 1),
+    "down": (1, 0),
+    "down_right": (1, 1),
+    "down_left": (1, -1),
+}
+
+
+def grid_lines(
+    height: int, width: int, y_step: int, x_step: int
+) -> Iterator[List[int]]:
+    """
+    Yield the flat indexes of every maximal line through the grid going
+    in the y_step, x_step direction, e.g. each row when stepping right.
+    """
+    for y in range(height):
+        for x in range(width):
+            # A line starts at any cell whose previous cell is off the grid
+            prev_y, prev_x = y - y_step, x - x_step
+            if 0 <= prev_y < height and 0 <= prev_x < width:
+                continue
+            line = []
+            line_y, line_x = y, x
+            while 0 <= line_y < height and 0 <= line_x < width:
+                line.append(line_y * width + line_x)
+                line_y += y_step
+                line_x += x_step
+            yield line
+
+
+def _rolling_sum(values: Sequence[Any], length: int) -> Iterator[Any]:
+    total = sum(values[:length])
+    yield total
+    for i in range(length, len(values)):
+        total += values[i] - values[i - length]
+        yield total
+
+
+def _rolling_prod(values: Sequence[int], length: int) -> Iterator[int]:
+    # Track zeros separately so the product of the other values can be
+    # divided back out when they leave the window
+    zeros = 0
+    product = 1
+    for i, value in enumerate(values):
+        if value == 0:
+            zeros += 1
+        else:
+            product *= value
+        if i >= length:
+            leaving = values[i - length]
+            if leaving == 0:
+                zeros -= 1
+            else:
+                product //= leaving
+        if i >= length - 1:
+            yield 0 if zeros else product
+
+
+def _rolling_extreme(
+    values: Sequence[Any], length: int, better: Callable[[Any, Any], bool]
+) -> Iterator[Any]:
+    # Monotonic deque of indexes, values[window[0]] is the window's extreme
+    window: Deque[int] = collections.deque()
+    for i, value in enumerate(values):
+        while window and not better(values[window[-1]], value):
+            window.pop()
+        window.append(i)
+        if window[0] <= i - length:
+            window.popleft()
+        if i >= length - 1:
+            yield values[window[0]]
+
+
+def _window_sum(values: Sequence[Any]) -> Any:
+    # fsum keeps track of the bits plain float addition rounds away
+    if any(isinstance(value, float) for value in values):
+        return math.fsum(values)
+    return sum(values)
+
+
+# Reducers that only roll exactly over ints, and how to reduce one window
+# of anything else
+EXACT: Dict[str, Callable[[Sequence[Any]], Any]] = {
+    "sum": _window_sum,
+    "prod": math.prod,
+}
+
+ROLLING: Dict[str, Callable[[Sequence[Any], int], Iterator[Any]]] = {
+    "sum": _rolling_sum,
+    "prod": _rolling_prod,
+    "max": lambda values, length: _rolling_extreme(values, length, operator.gt),
+    "min": lambda values, length: _rolling_extreme(values, length, operator.lt),
+}
+
+
+def best_window(
+    values: Sequence[Any],
+    height: int,
+    width: int,
+    y_step: int,
+    x_step: int,
+    length: int,
+    reducer: str = "prod",
+    best: str = "max",
+    pad: Any = SKIP,
+) -> Optional[Tuple[Any, int]]:
+    """
+    Reduce every window of `length` values going in the y_step, x_step
+    direction and return (best result, flat index of the window start).
+
+    Windows that run off the grid are skipped when pad is SKIP, otherwise
+    the off-grid positions count as pad.  Returns None if there are no windows.
+    """
+    rolling = ROLLING[reducer]
+    is_better = operator.gt if best == "max" else operator.lt
+    result: Optional[Tuple[Any, int]] = None
+    for line in grid_lines(height, width, y_step, x_step):
+        line_values = [values[i] for i in line]
+        if pad is not SKIP:
+            line_values.extend([pad] * (length - 1))
+        if len(line_values) < length:
+            continue
+        windows: Iterable[Any]
+        if reducer in EXACT and not all(isinstance(v, int) for v in line_values):
+            exact = EXACT[reducer]
+            windows = (
+                exact(line_values[start : start + length])
+                for start in range(len(line_values) - length + 1)
+            )
+        else:
+            windows = rolling(line_values, length)
+        for start, value in enumerate(windows):
+            if result is None or is_better(value, result[0]):
+                result = (value, line[start])
+    return result
+
+
+# Line index --------------------------------------------------------------------
+# find_k_in_a_row answers "is there a line of k equal values" for boards like
+# connect four or bingo.  Each value's positions become the bits of a Python
+# int (bit i set when values[i] matches), and a line of k in a direction with
+# flat step s starts at every bit set in
+#     board & (board >> s) & (board >> 2s) ... & (board >> (k - 1)s)
+# masked to the starts whose line stays on the grid.  Those start masks only
+# depend on the grid's shape, so they're built once and shared by every
+# board of that shape.
+
+
+def bitboard(values: Sequence[Any], value: Any) -> int:
+    "Return an int with bit i set where values[i] == value"
+    return int("".join("1" if v == value else "0" for v in reversed(values)) or "0", 2)
+
+
+def positions_bitboard(positions: Sequence[int], size: int) -> int:
+    "Return an int with the bits at positions set, for a board of size bits"
+    digits = bytearray(b"0") * size
+    for position in positions:
+        digits[size - 1 - position] = ord("1")
+    return int(digits or b"0", 2)
+
+
+def set_bits(board: int) -> Iterator[int]:
+    "Yield the positions of the set bits in board, lowest first"
+    while board:
+        lowest = board & -board
+        yield lowest.bit_length() - 1
+        board ^= lowest
+
+
+class LineIndex:
+    """
+    Every line of `length` cells in a height x width grid, going right, down,
+    down_right, and down_left (see WINDOW_DIRECTIONS).  Get one through
+    line_index() so it's shared between grids of the same shape.
+
+    starts - (direction, flat step, start mask) per direction, where bit i
+             of the start mask is set when a line can start at position i
+    lines - every line as a tuple of flat positions, built on first use
+    """
+
+    def __init__(self, height: int, width: int, length: int) -> None:
+        if length < 1:
+            raise ValueError("length must be at least 1")
+        self.height = height
+        self.width = width
+        self.length = length
+        self.starts: List[Tuple[str, int, int]] = []
+        # A line of 1 is the same cell in every direction, only count it once
+        directions = list(WINDOW_DIRECTIONS.items())[: 1 if length == 1 else None]
+        reach = length - 1
+        for name, (y_step, x_step) in directions:
+            starts = [
+                y * width + x
+                for y in range(height)
+                for x in range(width)
+                if 0 <= y + reach * y_step < height and 0 <= x + reach * x_step < width
+            ]
+            if starts:
+                mask = positions_bitboard(starts, height * width)
+                self.starts.append((name, y_step * width + x_step, mask))
+        self._lines: Optional[Tuple[Tuple[int, ...], ...]] = None
+
+    @property
+    def lines(self) -> Tuple[Tuple[int, ...], ...]:
+        if self._lines is None:
+            self._lines = tuple(
+                self.positions(name, start)
+                for name, _, mask in self.starts
+                for start in set_bits(mask)
+            )
+        return self._lines
+
+    def positions(self, direction: str, start: int) -> Tuple[int, ...]:
+        "Return the flat positions of the line starting at start in direction"
+        y_step, x_step = WINDOW_DIRECTIONS[direction]
+        step = y_step * self.width + x_step
+        return tuple(range(start, start + step * self.length, step))
+
+    def find(self, board: int) -> Iterator[Tuple[str, int]]:
+        "Yield (direction, start position) for every line whose bits are all set"
+        for name, step, mask in self.starts:
+            hits = board & mask
+            for offset in range(1, self.length):
+                if not hits:
+                    break
+                hits &= board >> (offset * step)
+            for start in set_bits(hits):
+                yield name, start
+
+    def boards(self, values: Sequence[Any], value: Any = None) -> Dict[Any, int]:
+        """
+        Return {value: bitboard} for the given value, or for every value
+        that appears at least length times when value is None
+        """
+        if value is not None:
+            return {value: bitboard(values, value)}
+        positions: Dict[Any, List[int]] = {}
+        for position, v in enumerate(values):
+            positions.setdefault(v, []).append(position)
+        return {
+            v: positions_bitboard(found, len(values))
+            for v, found in positions.items()
+            if len(found) >= self.length
+        }
+
+
+# A LineIndex can end up holding the positions of every line in the grid,
+# only keep the recently used ones
+@functools.lru_cache(maxsize=16)
+def line_index(height: int, width: int, length: int) -> LineIndex:
+    "Return the shared LineIndex for lines of `length` in a height x width grid"
+    return LineIndex(height, width, length)
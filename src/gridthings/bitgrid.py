@@ -0,0 +1,306 @@
+import functools
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import aggregate
+from .grid import Grid
+from .storage import ArrayStorage
+
+# Compact grids for board games, where a Grid's dict of pydantic Cells costs
+# hundreds of bytes per square.  A BitGrid keeps a regular grid of booleans
+# as the bits of one Python int, bit y * width + x for the cell at y, x.
+# Looking at every cell's neighbor in some direction is then a single shift,
+# with a mask to stop cells at the end of a row seeing the start of the next.
+#
+# A MultiBitGrid keeps one of those per value, e.g. an "X" board and an "O"
+# board for tic-tac-toe, so every cell holds exactly one value.
+
+
+# Each mask is as big as the grid (height * width bits) and a board only
+# uses one per x offset, only keep the recently used ones
+@functools.lru_cache(maxsize=16)
+def _column_mask(height: int, width: int, x_offset: int) -> int:
+    "Return the bits of cells whose neighbor at x_offset is in the same row"
+    if abs(x_offset) >= width:
+        return 0
+    row = (1 << (width - abs(x_offset))) - 1
+    if x_offset < 0:
+        row <<= -x_offset
+    # 0b...0001_0001 with a bit at the start of every row
+    row_starts = ((1 << (height * width)) - 1) // ((1 << width) - 1)
+    return row * row_starts
+
+
+def _add_to_counter(planes: List[int], board: int) -> None:
+    "Add 1 to the count held as binary digit planes at every bit set in board"
+    carry = board
+    for i, plane in enumerate(planes):
+        if not carry:
+            return
+        planes[i], carry = plane ^ carry, plane & carry
+    if carry:
+        planes.append(carry)
+
+
+class BitGrid:
+    """
+    A regular grid of True / False values held as the bits of a Python int.
+
+    BitGrid.from_grid(grid, value) marks the cells equal to value (or truthy
+    cells when value is None), and bit_grid.to_grid() turns it back into a Grid.
+    BitGrids support &, |, ^, and ~ with each other.
+    """
+
+    __slots__ = ("height", "width", "bits")
+
+    def __init__(self, height: int, width: int, bits: int = 0) -> None:
+        self.height = height
+        self.width = width
+        self.bits = bits & self.full
+
+    @classmethod
+    def from_grid(cls, grid: Grid, value: Any = None) -> "BitGrid":
+        height, width = grid._regular_shape("BitGrid")
+        values = grid.storage.flat_values()
+        if value is None:
+            digits = "".join("1" if v else "0" for v in reversed(values))
+            return cls(height, width, int(digits or "0", 2))
+        return cls(height, width, aggregate.bitboard(values, value))
+
+    def to_grid(self, on: Any = True, off: Any = False, **kwargs: Any) -> Grid:
+        "Return a Grid with on where bits are set and off elsewhere"
+        rows = (
+            (y, [on if bit else off for bit in self._row_bits(y)])
+            for y in range(self.height)
+        )
+        return Grid(ArrayStorage(rows), **kwargs)
+
+    def _row_bits(self, y: int) -> List[bool]:
+        row = self.bits >> (y * self.width)
+        return [bool(row >> x & 1) for x in range(self.width)]
+
+    @property
+    def full(self) -> int:
+        "An int with a bit set for every cell"
+        return (1 << (self.height * self.width)) - 1
+
+    def _new(self, bits: int) -> "BitGrid":
+        return BitGrid(self.height, self.width, bits)
+
+    def contains(self, y: int, x: int) -> bool:
+        return 0 <= y < self.height and 0 <= x < self.width
+
+    def get(self, y: int, x: int) -> bool:
+        if not self.contains(y, x):
+            raise KeyError((y, x))
+        return bool(self.bits >> (y * self.width + x) & 1)
+
+    def set(self, y: int, x: int, on: bool = True) -> None:
+        if not self.contains(y, x):
+            raise KeyError((y, x))
+        bit = 1 << (y * self.width + x)
+        self.bits = self.bits | bit if on else self.bits & ~bit
+
+    def peek(self, y: int, x: int, y_offset: int, x_offset: int) -> bool:
+        "Return the bit offset from y, x, False when that's out of bounds"
+        y_out, x_out = y + y_offset, x + x_offset
+        return self.contains(y_out, x_out) and self.get(y_out, x_out)
+
+    def shift(self, y_offset: int, x_offset: int) -> "BitGrid":
+        """
+        Peek every cell at once, returning a BitGrid where y, x holds the bit
+        at y + y_offset, x + x_offset (False where that's out of bounds)
+        """
+        step = y_offset * self.width + x_offset
+        bits = self.bits >> step if step >= 0 else self.bits << -step
+        return self._new(bits & _column_mask(self.height, self.width, x_offset))
+
+    def _count_planes(self, neighbors: str, distance: int) -> List[int]:
+        planes: List[int] = []
+        for y_offset, x_offset in aggregate.neighbor_offsets(neighbors, distance):
+            _add_to_counter(planes, self.shift(y_offset, x_offset).bits)
+        return planes
+
+    def neighbor_counts(self, neighbors: str = "all", distance: int = 1) -> List[int]:
+        """
+        Return how many neighbors of each cell are set, as a flat row-major
+        list.  neighbors is "linear", "diagonal", or "all".
+        """
+        size = self.height * self.width
+        counts = [0] * size
+        for digit, plane in enumerate(self._count_planes(neighbors, distance)):
+            plane_bits = format(plane, f"0{size}b")[::-1]
+            counts = [c + ((b == "1") << digit) for c, b in zip(counts, plane_bits)]
+        return counts
+
+    def neighbors_equal(
+        self, count: int, neighbors: str = "all", distance: int = 1
+    ) -> "BitGrid":
+        """
+        Return a BitGrid of the cells with exactly count neighbors set, using
+        only bitwise operations.  For example, a Game of Life step is
+        board.neighbors_equal(3) | (board & board.neighbors_equal(2))
+        """
+        planes = self._count_planes(neighbors, distance)
+        if count >> len(planes):
+            return self._new(0)
+        bits = self.full
+        for digit, plane in enumerate(planes):
+            bits &= plane if count >> digit & 1 else ~plane
+        return self._new(bits)
+
+    def find_k_in_a_row(self, k: int) -> List[List[Tuple[int, int]]]:
+        """
+        Return the (y, x) positions of every line of k set cells going right,
+        down, down_right, or down_left
+        """
+        index = aggregate.line_index(self.height, self.width, k)
+        return [
+            [divmod(position, self.width) for position in index.positions(name, start)]
+            for name, start in index.find(self.bits)
+        ]
+
+    def count(self) -> int:
+        "Return how many cells are set"
+        return bin(self.bits).count("1")
+
+    def positions(self) -> Iterator[Tuple[int, int]]:
+        "Yield the (y, x) position of every set cell, row by row"
+        for position in aggregate.set_bits(self.bits):
+            yield divmod(position, self.width)
+
+    def _check_shape(self, other: "BitGrid") -> None:
+        if (self.height, self.width) != (other.height, other.width):
+            raise ValueError("BitGrids must have the same shape")
+
+    def __and__(self, other: "BitGrid") -> "BitGrid":
+        self._check_shape(other)
+        return self._new(self.bits & other.bits)
+
+    def __or__(self, other: "BitGrid") -> "BitGrid":
+        self._check_shape(other)
+        return self._new(self.bits | other.bits)
+
+    def __xor__(self, other: "BitGrid") -> "BitGrid":
+        self._check_shape(other)
+        return self._new(self.bits ^ other.bits)
+
+    def __invert__(self) -> "BitGrid":
+        return self._new(~self.bits)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, BitGrid):
+            return NotImplemented
+        return (self.height, self.width, self.bits) == (
+            other.height,
+            other.width,
+            other.bits,
+        )
+
+    def __repr__(self) -> str:
+        rows = "|".join(
+            "".join("1" if bit else "0" for bit in self._row_bits(y))
+            for y in range(self.height)
+        )
+        return f"<BitGrid shape=({self.height}, {self.width}) {rows}>"
+
+
+class MultiBitGrid:
+    """
+    A regular grid of values held as one bitboard per distinct value,
+    e.g. MultiBitGrid.from_grid(Grid("X.O\\n.X.\\nO.X")) keeps an "X", "O",
+    and "." board.  boards maps each value to the int of its cells.
+    """
+
+    __slots__ = ("height", "width", "boards", "out_of_bounds_value")
+
+    def __init__(
+        self,
+        height: int,
+        width: int,
+        boards: Optional[Dict[Any, int]] = None,
+        out_of_bounds_value: Any = None,
+    ) -> None:
+        self.height = height
+        self.width = width
+        self.boards: Dict[Any, int] = boards or {}
+        self.out_of_bounds_value = out_of_bounds_value
+
+    @classmethod
+    def from_grid(cls, grid: Grid) -> "MultiBitGrid":
+        height, width = grid._regular_shape("MultiBitGrid")
+        positions: Dict[Any, List[int]] = {}
+        for position, value in enumerate(grid.storage.flat_values()):
+            positions.setdefault(value, []).append(position)
+        boards = {
+            value: aggregate.positions_bitboard(found, height * width)
+            for value, found in positions.items()
+        }
+        return cls(height, width, boards, out_of_bounds_value=grid.out_of_bounds_value)
+
+    def to_grid(self, **kwargs: Any) -> Grid:
+        "Return a Grid of the values, empty cells (in no board) are None"
+        values: List[Any] = [None] * (self.height * self.width)
+        for value, bits in self.boards.items():
+            for position in aggregate.set_bits(bits):
+                values[position] = value
+        rows = (
+            (y, values[y * self.width : (y + 1) * self.width])
+            for y in range(self.height)
+        )
+        kwargs.setdefault("out_of_bounds_value", self.out_of_bounds_value)
+        return Grid(ArrayStorage(rows), **kwargs)
+
+    def __getitem__(self, value: Any) -> BitGrid:
+        "Return the BitGrid of cells holding value"
+        return BitGrid(self.height, self.width, self.boards.get(value, 0))
+
+    def contains(self, y: int, x: int) -> bool:
+        return 0 <= y < self.height and 0 <= x < self.width
+
+    def get(self, y: int, x: int) -> Any:
+        if not self.contains(y, x):
+            raise KeyError((y, x))
+        position = y * self.width + x
+        for value, bits in self.boards.items():
+            if bits >> position & 1:
+                return value
+        return None
+
+    def set(self, y: int, x: int, value: Any) -> None:
+        if not self.contains(y, x):
+            raise KeyError((y, x))
+        bit = 1 << (y * self.width + x)
+        for board_value, bits in self.boards.items():
+            if bits & bit:
+                self.boards[board_value] = bits & ~bit
+        self.boards[value] = self.boards.get(value, 0) | bit
+
+    def peek(self, y: int, x: int, y_offset: int, x_offset: int) -> Any:
+        "Return the value offset from y, x, out_of_bounds_value when that's off the grid"
+        y_out, x_out = y + y_offset, x + x_offset
+        if not self.contains(y_out, x_out):
+            return self.out_of_bounds_value
+        return self.get(y_out, x_out)
+
+    def neighbor_counts(
+        self, value: Any, neighbors: str = "all", distance: int = 1
+    ) -> List[int]:
+        "Return how many neighbors of each cell hold value, as a flat row-major list"
+        return self[value].neighbor_counts(neighbors, distance)
+
+    def count(self, value: Any) -> int:
+        "Return how many cells hold value"
+        return self[value].count()
+
+    def find_k_in_a_row(
+        self, k: int, value: Any = None
+    ) -> List[Tuple[Any, List[Tuple[int, int]]]]:
+        """
+        Return (value, positions) for every line of k cells holding value,
+        or holding any one value when value is None
+        """
+        values = list(self.boards) if value is None else [value]
+        return [(v, line) for v in values for line in self[v].find_k_in_a_row(k)]
+
+    def __repr__(self) -> str:
+        return f"<MultiBitGrid shape=({self.height}, {self.width}) values={list(self.boards)}>"
@@ -1,7 +1,13 @@
-from typing import Any
+from typing import TYPE_CHECKING, Any, ClassVar, Dict, Optional, Set, Type, TypeVar
 
 from pydantic import BaseModel
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .grid import Grid
+    from .storage import Storage
+
+CellT = TypeVar("CellT", bound="BaseCell")
+
 # A cell represents a single item in the grid
 # Each cell knows its position (y/x) and its value
 # Cells implement a variety of comparison operators
@@ -12,46 +18,68 @@ from pydantic import BaseModel
 # offer things like min(Row), max(Row) and math.prod(Row)
 
 
-class Cell(BaseModel):
+class BaseCell:
+    """
+    Comparison and math operators shared by every kind of Cell.
+    Subclasses need y, x, and value attributes.
+    """
+
+    __slots__ = ()
     y: int
     x: int
     value: Any
 
+    if TYPE_CHECKING:  # pragma: no cover
+        # What Grid and the storages expect from a cell_cls, Cell and
+        # FastCell both provide these
+        out_of_bounds_cls: ClassVar[Type["BaseCell"]]
+
+        def __init__(self, y: int, x: int, value: Any) -> None:
+            ...
+
+        @classmethod
+        def construct(cls: Type[CellT], *, y: int, x: int, value: Any) -> CellT:
+            ...
+
+    def _fields(self) -> Dict[str, Any]:
+        "Return the fields used when comparing two cells for equality"
+        return {"y": self.y, "x": self.x, "value": self.value}
+
     def __eq__(self, other: Any) -> bool:
-        if isinstance(other, Cell):
-            return self.dict() == other.dict()
+        if isinstance(other, BaseCell):
+            return self._fields() == other._fields()
         return self.value == other
 
     def __ne__(self, other: Any) -> bool:
-        if isinstance(other, Cell):
-            return self.dict() != other.dict()
+        if isinstance(other, BaseCell):
+            return self._fields() != other._fields()
         return self.value != other
 
     def __lt__(self, other: Any) -> bool:
-        if isinstance(other, Cell):
+        if isinstance(other, BaseCell):
             return self.value < other.value
         return self.value < other
 
     def __le__(self, other: Any) -> bool:
-        if isinstance(other, Cell):
+        if isinstance(other, BaseCell):
             return self.value <= other.value
         else:
             return self.value <= other
 
     def __gt__(self, other: Any) -> bool:
-        if isinstance(other, Cell):
+        if isinstance(other, BaseCell):
             return self.value > other.value
         else:
             return self.value > other
 
     def __ge__(self, other: Any) -> bool:
-        if isinstance(other, Cell):
+        if isinstance(other, BaseCell):
             return self.value >= other.value
         else:
             return self.value >= other
 
     def __add__(self, other: Any) -> Any:
-        if isinstance(other, Cell):
+        if isinstance(other, BaseCell):
             return self.value + other.value
         else:
             return self.value + other
@@ -60,7 +88,7 @@ class Cell(BaseModel):
         return other + self.value
 
     def __sub__(self, other: Any) -> Any:
-        if isinstance(other, Cell):
+        if isinstance(other, BaseCell):
             return self.value - other.value
         else:
             return self.value - other
@@ -69,7 +97,7 @@ class Cell(BaseModel):
         return other - self.value
 
     def __mul__(self, other: Any) -> Any:
-        if isinstance(other, Cell):
+        if isinstance(other, BaseCell):
             return self.value * other.value
         else:
             return self.value * other
@@ -78,7 +106,7 @@ class Cell(BaseModel):
         return other * self.value
 
     def __pow__(self, other: Any) -> Any:
-        if isinstance(other, Cell):
+        if isinstance(other, BaseCell):
             return self.value ** other.value
         else:
             return self.value ** other
@@ -87,7 +115,7 @@ class Cell(BaseModel):
         return other ** self.value
 
     def __truediv__(self, other: Any) -> Any:
-        if isinstance(other, Cell):
+        if isinstance(other, BaseCell):
             return self.value / other.value
         else:
             return self.value / other
@@ -96,6 +124,26 @@ class Cell(BaseModel):
         return other / self.value
 
 
+class Cell(BaseCell, BaseModel):
+    y: int
+    x: int
+    value: Any
+
+    # The class Grid.peek uses for positions outside the grid, set below
+    out_of_bounds_cls: ClassVar[Type["Cell"]]
+
+    if TYPE_CHECKING:  # pragma: no cover
+        # pydantic's signature, which also accepts BaseCell's keywords
+        @classmethod
+        def construct(
+            cls: Type[CellT], _fields_set: Optional[Set[str]] = None, **values: Any
+        ) -> CellT:
+            ...
+
+    def _fields(self) -> Dict[str, Any]:
+        return self.dict()
+
+
 class OutOfBoundsCell(Cell):
     """
     Returned when active calls like .peek(y_offset, x_offset)
@@ -103,3 +151,96 @@ class OutOfBoundsCell(Cell):
     """
 
     pass
+
+
+Cell.out_of_bounds_cls = OutOfBoundsCell
+
+
+class FastCell(BaseCell):
+    """
+    A Cell without pydantic, for when validation isn't needed and
+    creating or comparing millions of cells needs to be cheap.
+    Use it with Grid(..., cell_cls=FastCell).
+
+    Equality compares (y, x, value) tuples instead of .dict() output.
+    """
+
+    __slots__ = ("y", "x", "value")
+    out_of_bounds_cls: ClassVar[Type["FastCell"]]
+
+    def __init__(self, y: int, x: int, value: Any) -> None:
+        self.y = y
+        self.x = x
+        self.value = value
+
+    # Mirrors pydantic's BaseModel.construct so storages can build
+    # either kind of cell without validation
+    @classmethod
+    def construct(cls, y: int, x: int, value: Any) -> "FastCell":
+        return cls(y=y, x=x, value=value)
+
+    def dict(self) -> Dict[str, Any]:
+        return {"y": self.y, "x": self.x, "value": self.value}
+
+    _fields = dict
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, FastCell):
+            return (self.y, self.x, self.value) == (other.y, other.x, other.value)
+        return super().__eq__(other)
+
+    def __ne__(self, other: Any) -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(y={self.y}, x={self.x}, value={self.value!r})"
+        )
+
+
+class FastOutOfBoundsCell(FastCell):
+    "The FastCell counterpart to OutOfBoundsCell"
+
+    __slots__ = ()
+
+
+FastCell.out_of_bounds_cls = FastOutOfBoundsCell
+
+
+class CellView(BaseCell):
+    """
+    A lightweight stand-in for a Cell that points at a y, x position in
+    Grid storage and reads the value from there when it's accessed.
+    Setting .value writes through to the storage, using grid.set() for
+    views made by a Grid so dirty and trackers see the change.
+
+    Use .materialize() to get a real Cell object.
+    """
+
+    __slots__ = ("storage", "y", "x", "grid")
+
+    def __init__(
+        self, storage: "Storage", y: int, x: int, grid: Optional["Grid"] = None
+    ) -> None:
+        self.storage = storage
+        self.y = y
+        self.x = x
+        self.grid = grid
+
+    @property
+    def value(self) -> Any:
+        return self.storage.get_value(self.y, self.x)
+
+    @value.setter
+    def value(self, value: Any) -> None:
+        if self.grid is not None:
+            self.grid.set(self.y, self.x, value)
+        else:
+            self.storage.set_value(self.y, self.x, value)
+
+    def materialize(self) -> BaseCell:
+        "Return a Cell object for this position"
+        return self.storage.get_cell(self.y, self.x)
+
+    def __repr__(self) -> str:
+        return f"CellView(y={self.y}, x={self.x}, value={self.value!r})"
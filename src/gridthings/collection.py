@@ -1,7 +1,8 @@
 import collections
+import math
 from typing import Any, List
 
-from .cell import Cell, OutOfBoundsCell
+from .cell import BaseCell, FastOutOfBoundsCell, OutOfBoundsCell
 
 # A Collection is a list of Cells.  They may be represent a single row
 # or column of a grid, such as coming from grid.rows(0), or grid.columns(0).
@@ -12,7 +13,7 @@ from .cell import Cell, OutOfBoundsCell
 
 
 class Collection(collections.abc.Sequence):
-    def __init__(self, cells: List[Cell]):
+    def __init__(self, cells: List[BaseCell]):
         self.cells = cells
 
     def __len__(self) -> int:
@@ -29,7 +30,7 @@ class Collection(collections.abc.Sequence):
         return self.cells.__iter__()
 
     def __add__(self, other):
-        return Collection(cells=self.cells + other.cells)
+        return type(self)(cells=self.cells + other.cells)
 
     def __eq__(self, other):
         if isinstance(other, Collection):
@@ -47,4 +48,60 @@ class Collection(collections.abc.Sequence):
         return [cell.value for cell in self.cells]
 
     def extends_out_of_bounds(self):
-        return any(isinstance(cell, OutOfBoundsCell) for cell in self.cells)
+        return any(
+            isinstance(cell, (OutOfBoundsCell, FastOutOfBoundsCell))
+            for cell in self.cells
+        )
+
+
+# A ColumnarCollection keeps the y, x, and value of its cells in three
+# parallel lists next to the cells themselves.  sum(collection) or
+# max(collection) go through Cell.__radd__ / __lt__ once per cell, while
+# collection.sum() and collection.max() run the builtins over the plain
+# values list.  Plug it in with Grid(..., collections_cls=ColumnarCollection)
+# to get it from get_row, get_column, line, flatten and friends.
+#
+# The columns are read when the collection is made, so they won't see
+# later changes to the grid.
+
+
+class ColumnarCollection(Collection):
+    def __init__(self, cells: List[BaseCell]):
+        super().__init__(cells=cells)
+        self.ys = [cell.y for cell in cells]
+        self.xs = [cell.x for cell in cells]
+        # Named value_list so it doesn't shadow Collection.values()
+        self.value_list = [cell.value for cell in cells]
+
+    def __repr__(self):
+        return f"<ColumnarCollection [{repr(self.cells)}]>"
+
+    def values(self) -> List[Any]:
+        return list(self.value_list)
+
+    def sum(self) -> Any:
+        return sum(self.value_list)
+
+    def prod(self) -> Any:
+        return math.prod(self.value_list)
+
+    def min(self) -> Any:
+        return min(self.value_list)
+
+    def max(self) -> Any:
+        return max(self.value_list)
+
+    def mean(self) -> float:
+        if not self.value_list:
+            raise ValueError("mean of an empty collection")
+        return sum(self.value_list) / len(self.value_list)
+
+    def argmin(self) -> BaseCell:
+        "Return the first Cell with the smallest value"
+        values = self.value_list
+        return self.cells[min(range(len(values)), key=values.__getitem__)]
+
+    def argmax(self) -> BaseCell:
+        "Return the first Cell with the largest value"
+        values = self.value_list
+        return self.cells[max(range(len(values)), key=values.__getitem__)]
@@ -0,0 +1,221 @@
+import array
+import itertools
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .aggregate import NEIGHBOR_OFFSETS
+from .topology import Topology, connectivity_neighbors
+
+# Connected regions of a grid, like the basins in Advent of Code 2021 day 9.
+#
+# flood_fill walks out from one position with a plain index queue over flat
+# positions (y * width + x), so there are no Cell objects to hash or compare.
+# Neighbors come from index arithmetic, or from a Topology when one is given.
+#
+# label_regions labels every region at once.  Instead of visiting cells one
+# at a time it splits each row into runs of cells that belong together,
+# joins runs that touch a run in the row above with a union-find, and then
+# writes each run's label as one slice.
+
+CONNECTIVITY: Dict[int, List[Tuple[int, int]]] = {
+    4: NEIGHBOR_OFFSETS["linear"],
+    8: NEIGHBOR_OFFSETS["all"],
+}
+
+# Key for cells that aren't part of any region
+_BACKGROUND = object()
+
+
+class Component(NamedTuple):
+    """
+    One connected region of a grid, see Grid.label_components.
+    A NamedTuple rather than a pydantic model since grids with many small
+    regions can have millions of these.
+    """
+
+    label: int
+    size: int
+    min_y: int
+    min_x: int
+    max_y: int
+    max_x: int
+
+    @property
+    def bounding_box(self) -> Tuple[int, int, int, int]:
+        "Return (min_y, min_x, max_y, max_x), inclusive"
+        return self.min_y, self.min_x, self.max_y, self.max_x
+
+
+def connectivity_offsets(connectivity: int) -> List[Tuple[int, int]]:
+    "Return the neighbor offsets for 4 (linear) or 8 (linear and diagonal) connectivity"
+    if connectivity not in CONNECTIVITY:
+        raise ValueError(f"connectivity must be 4 or 8, got {connectivity!r}")
+    return CONNECTIVITY[connectivity]
+
+
+def flood_fill(
+    keys: Sequence[Any],
+    height: int,
+    width: int,
+    start: int,
+    connectivity: Union[int, Topology] = 4,
+) -> List[int]:
+    """
+    Return the flat positions connected to start, in breadth-first order.
+    Positions are connected when they're neighbors with equal keys, and
+    positions keyed _BACKGROUND are never part of a region.  connectivity
+    is 4, 8, or a Topology, e.g. for grids that wrap around.
+    """
+    key = keys[start]
+    if key is _BACKGROUND:
+        return []
+    seen = bytearray(height * width)
+    seen[start] = 1
+    queue = [start]
+    # queue doubles as the result, head is the next position to expand
+    head = 0
+    if isinstance(connectivity, Topology):
+        neighbors = connectivity_neighbors(height, width, connectivity)
+        while head < len(queue):
+            for position in neighbors(queue[head]):
+                if not seen[position] and keys[position] == key:
+                    seen[position] = 1
+                    queue.append(position)
+            head += 1
+        return queue
+
+    # Plain neighbors are cheaper to work out than to look up, and only
+    # positions on the edge need their offsets bounds checked
+    steps = [(dy * width + dx, dy, dx) for dy, dx in connectivity_offsets(connectivity)]
+    last_y, last_x = height - 1, width - 1
+    while head < len(queue):
+        position = queue[head]
+        head += 1
+        y, x = divmod(position, width)
+        edge = not (0 < y < last_y and 0 < x < last_x)
+        for step, dy, dx in steps:
+            if edge and not (0 <= y + dy < height and 0 <= x + dx < width):
+                continue
+            neighbor = position + step
+            if not seen[neighbor] and keys[neighbor] == key:
+                seen[neighbor] = 1
+                queue.append(neighbor)
+    return queue
+
+
+def _row_runs(
+    keys: Sequence[Any], start: int, width: int
+) -> List[Tuple[int, int, Any]]:
+    "Split one row into (x_start, x_stop, key) runs of equal keys, skipping background"
+    runs = []
+    x = 0
+    for key, group in itertools.groupby(keys[start : start + width]):
+        length = sum(1 for _ in group)
+        if key is not _BACKGROUND:
+            runs.append((x, x + length, key))
+        x += length
+    return runs
+
+
+def label_regions(
+    keys: Sequence[Any], height: int, width: int, connectivity: int = 4
+) -> Tuple["array.array[int]", List[Component]]:
+    """
+    Label the regions of neighboring positions with equal keys.
+    Returns flat labels, 0 for background and 1, 2, ... for each region
+    numbered in row-major order of their first cell, plus a Component each.
+    """
+    connectivity_offsets(connectivity)
+    # With diagonal connections, runs that touch only at a corner connect too
+    reach = 1 if connectivity == 8 else 0
+    runs: List[Tuple[int, int, int, Any]] = []  # (y, x_start, x_stop, key)
+    parent: List[int] = []
+
+    def find(run: int) -> int:
+        while parent[run] != run:
+            parent[run] = parent[parent[run]]
+            run = parent[run]
+        return run
+
+    previous: List[int] = []  # run ids in the row above
+    for y in range(height):
+        current = []
+        above = 0
+        for x_start, x_stop, key in _row_runs(keys, y * width, width):
+            run_id = len(runs)
+            runs.append((y, x_start, x_stop, key))
+            parent.append(run_id)
+            current.append(run_id)
+            # Runs in the row above are sorted by x, skip any that end too
+            # far left to touch this run or anything after it
+            while above < len(previous) and runs[previous[above]][2] + reach <= x_start:
+                above += 1
+            other = above
+            while other < len(previous):
+                _, other_start, other_stop, other_key = runs[previous[other]]
+                if other_start >= x_stop + reach:
+                    break
+                if other_key == key:
+                    root, other_root = find(run_id), find(previous[other])
+                    if root != other_root:
+                        parent[max(root, other_root)] = min(root, other_root)
+                other += 1
+        previous = current
+
+    # Gather stats in plain lists indexed by label - 1, then build Components
+    labels = array.array("q", bytes(8 * height * width))
+    label_for_root: Dict[int, int] = {}
+    sizes: List[int] = []
+    bounds: List[List[int]] = []  # [min_y, min_x, max_y, max_x]
+    for run_id, (y, x_start, x_stop, _) in enumerate(runs):
+        root = find(run_id)
+        label = label_for_root.get(root)
+        if label is None:
+            label = label_for_root[root] = len(sizes) + 1
+            sizes.append(0)
+            bounds.append([y, x_start, y, x_stop - 1])
+        sizes[label - 1] += x_stop - x_start
+        box = bounds[label - 1]
+        if x_start < box[1]:
+            box[1] = x_start
+        if x_stop - 1 > box[3]:
+            box[3] = x_stop - 1
+        box[2] = y
+        row = y * width
+        labels[row + x_start : row + x_stop] = array.array("q", [label]) * (
+            x_stop - x_start
+        )
+    components = [
+        Component(
+            label=label,
+            size=size,
+            min_y=box[0],
+            min_x=box[1],
+            max_y=box[2],
+            max_x=box[3],
+        )
+        for label, (size, box) in enumerate(zip(sizes, bounds), start=1)
+    ]
+    return labels, components
+
+
+def region_keys(
+    values: Sequence[Any], predicate: Optional[Callable[[Any], bool]] = None
+) -> Sequence[Any]:
+    """
+    Return the keys that decide which positions connect.  With a predicate,
+    matching positions connect to each other and the rest are background.
+    Without one, neighbors connect when their values are equal.
+    """
+    if predicate is None:
+        return values
+    return [True if predicate(value) else _BACKGROUND for value in values]
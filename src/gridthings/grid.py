@@ -1,8 +1,57 @@
+import array
 import operator
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+import os
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
-from .cell import Cell, OutOfBoundsCell
+from . import (
+    aggregate,
+    components,
+    interop,
+    parallel,
+    pathfinding,
+    serialization,
+    simulation,
+    topology,
+    tracking,
+    views,
+    visibility,
+)
+from .cell import BaseCell, Cell, CellView
 from .collection import Collection
+from .components import Component
+from .storage import ArrayStorage, DictStorage, MmapStorage, Row, Storage
+from .topology import Topology
+from .views import LineView, SubGridView
+
+# Reducers for Grid.neighbor_reduce, "count" is handled separately
+_REDUCERS: Dict[str, Callable[[Any, Any], Any]] = {
+    "min": min,
+    "max": max,
+    "sum": operator.add,
+}
+
+TrackerT = TypeVar("TrackerT", bound=tracking.Tracker)
+
+# How much text Grid.from_stream reads at a time when line_sep isn't "\n"
+STREAM_CHUNK_SIZE = 1 << 16
 
 # A Grid represents some tabular data, the kind of thing you might analyze in Pandas
 # This library is about letting you accomplish tasks that may be confusing or
@@ -13,89 +62,392 @@ from .collection import Collection
 
 
 class Grid:
-    # These two _cls variables are here as entrypoints for customizing
+    # These _cls variables are here as entrypoints for customizing
     # your Grid object, plugging in your own Cell or Collection mechanism
     # They can also be inserted in init kwargs
-    cell_cls = Cell
+    cell_cls: Type[BaseCell] = Cell
     collection_cls = Collection
+    # storage_cls decides how values are held in memory, DictStorage keeps
+    # a Cell per value while ArrayStorage keeps raw values in a flat buffer.
+    # typecode is handed to the storage for typed buffers (array.array)
+    storage_cls: Type[Storage] = DictStorage
+    typecode: Optional[str] = None
+    # value_parser converts raw values one row at a time before they reach
+    # storage, so typed grids don't pay for pydantic validation per Cell.
+    # See typed_grids.py
+    value_parser: Optional[Callable[[Any], Any]] = None
+    # When lazy_cells is True, get/peek/line/flatten and friends return
+    # CellViews that read from storage instead of Cell objects.
+    # Call .materialize() on a CellView to get the real Cell
+    lazy_cells: bool = False
 
     def __init__(
         self,
-        data: Union[Dict[int, Dict[int, Any]], List[Dict[int, Any]], str],
+        data: Union[Dict[int, Dict[int, Any]], Sequence[Row], str, TextIO, Storage],
         strip_whitespace: bool = True,
         line_sep: str = "\n",
         sep: Optional[str] = None,
         out_of_bounds_value: Optional[Any] = None,
-        cell_cls: Type[Cell] = None,
+        cell_cls: Type[BaseCell] = None,
         collections_cls: Type[Collection] = None,
+        storage_cls: Type[Storage] = None,
+        lazy_cells: Optional[bool] = None,
     ) -> None:
         """
         Instantiate a Grid object from one of several data formats.
 
         1. a dictionary of dictionaries, e.g. from df.to_dict()
-        2. a list of dictionaries, e.g. from df.to_dict(orient='records')
+        2. a list of dictionaries, e.g. from df.to_dict(orient='records'),
+           or a list of lists, e.g. from grid.values()
         3. a string with line breaks, e.g. 'abc\ndef'
         4. a string with line breaks and in-line separator, e.g. 'a,b,c\nd,e,f'
+        5. a text file object, read incrementally (see Grid.from_stream)
+        6. a Storage object, used as-is (see Grid.from_mmap)
 
-        line_sep and sep only apply when data is a string.
+        line_sep and sep only apply when data is a string or file object.
         line_sep is for the break between lines
         sep is for any in-line separator
+
+        storage_cls picks how values are held in memory, see storage.py
+        lazy_cells=True returns CellViews from read methods instead of Cells
         """
-        self.data: Dict[int, Dict[int, Cell]] = {}
         self.cell_cls = cell_cls or self.cell_cls
         self.collection_cls = collections_cls or self.collection_cls
+        self.storage_cls = storage_cls or self.storage_cls
+        if lazy_cells is not None:
+            self.lazy_cells = lazy_cells
 
         # data is stored internally as y:x:value, following pandas style
         # can also think of it like row-data goes to the y position
         # and column data goes to the x position
+        if isinstance(data, Storage):
+            self.storage = data
+        else:
+            rows = self._parse_rows(
+                data, strip_whitespace=strip_whitespace, line_sep=line_sep, sep=sep
+            )
+            self.storage = self._build_storage(rows)
+
+        # Default value for OutOfBound cells when a Collection
+        # extends outside the grid, which can happen with .peek() and .line()
+        self.out_of_bounds_value = out_of_bounds_value
+
+        # Positions changed through .set(), CellViews, or .simulate() since
+        # pop_dirty() was last called, and the aggregates kept up to date
+        # with every change, see tracking.py
+        self.dirty: Set[Tuple[int, int]] = set()
+        self.trackers: List[tracking.Tracker] = []
+
+    def _build_storage(self, rows: Iterable[Tuple[int, Row]]) -> Storage:
+        "Create the storage for this grid, running rows through value_parser"
+        if self.value_parser:
+            rows = self._convert_rows(rows, self.value_parser)
+        return self.storage_cls(
+            rows,
+            cell_cls=self.cell_cls,
+            typecode=self.typecode,
+            validated=self._parser_validates(self.cell_cls),
+        )
+
+    @classmethod
+    def _parser_validates(cls, cell_cls: Type[BaseCell]) -> bool:
+        """
+        Return True if value_parser checks everything cell_cls would, so
+        Cells can skip pydantic validation.  That's only the case for the
+        cell_cls declared next to value_parser (e.g. IntCell on IntGrid),
+        a different cell_cls may have validators of its own.
+        """
+        for klass in cls.__mro__:
+            if "value_parser" in vars(klass):
+                return (
+                    vars(klass)["value_parser"] is not None
+                    and vars(klass).get("cell_cls") is cell_cls
+                )
+        return False
+
+    @staticmethod
+    def _convert_rows(
+        rows: Iterable[Tuple[int, Row]], parser: Callable[[Any], Any]
+    ) -> Iterator[Tuple[int, Row]]:
+        "Yield rows with parser mapped over each row's values in one pass"
+        for y_pos, row in rows:
+            values = list(row.values()) if isinstance(row, dict) else row
+            try:
+                converted = list(map(parser, values))
+            except (TypeError, ValueError):
+                # Only pay for finding the offending value when there is one
+                for x_pos, value in zip(
+                    row.keys() if isinstance(row, dict) else range(len(values)),
+                    values,
+                ):
+                    try:
+                        parser(value)
+                    except (TypeError, ValueError) as e:
+                        raise ValueError(
+                            f"Invalid value {value!r} at y={y_pos}, x={x_pos}: {e}"
+                        ) from e
+                raise  # pragma: no cover
+            if isinstance(row, dict):
+                yield y_pos, dict(zip(row.keys(), converted))
+            else:
+                yield y_pos, converted
+
+    @staticmethod
+    def _parse_rows(
+        data: Union[Dict[int, Dict[int, Any]], Sequence[Row], str, TextIO],
+        strip_whitespace: bool = True,
+        line_sep: str = "\n",
+        sep: Optional[str] = None,
+    ) -> Iterator[Tuple[int, Row]]:
+        "Yield (y, row) pairs from any of the data formats Grid accepts"
         if isinstance(data, dict):
-            for x_pos, row_data in data.items():
-                for y_pos, value in row_data.items():
-                    if y_pos not in self.data:
-                        self.data[y_pos] = {}
-                    self.data[y_pos][x_pos] = self.cell_cls(
-                        y=y_pos, x=x_pos, value=value
-                    )
+            # df.to_dict() is column-oriented, x:y:value, flip it to y:x:value
+            rows: Dict[int, Dict[int, Any]] = {}
+            for x_pos, column_data in data.items():
+                for y_pos, value in column_data.items():
+                    if y_pos not in rows:
+                        rows[y_pos] = {}
+                    rows[y_pos][x_pos] = value
+            yield from rows.items()
 
         elif isinstance(data, list):
-            for y_pos, column_data in enumerate(data):
-                if y_pos not in self.data:
-                    self.data[y_pos] = {}
-                for x_pos, value in column_data.items():
-                    self.data[y_pos][x_pos] = self.cell_cls(
-                        y=y_pos, x=x_pos, value=value
-                    )
+            yield from enumerate(data)
+
+        elif hasattr(data, "read"):
+            lines = Grid._stream_lines(data, line_sep=line_sep)  # type: ignore
+            if strip_whitespace:
+                lines = Grid._strip_lines(lines, line_sep=line_sep)
+            for y_pos, line in enumerate(lines):
+                if sep:
+                    line = line.split(sep)  # type: ignore
+                yield y_pos, line
 
         elif isinstance(data, str):
             if strip_whitespace:
                 data = data.strip()
             for y_pos, line in enumerate(data.split(line_sep)):
-                if y_pos not in self.data:
-                    self.data[y_pos] = {}
                 if strip_whitespace:
                     line = line.strip()
                 if sep:
                     # mypy doesn't like that line becomes a List[str]
                     # although it should recognize I just care about it being Iterable...
                     line = line.split(sep)  # type: ignore
-                for x_pos, value in enumerate(line):
-                    self.data[y_pos][x_pos] = self.cell_cls(
-                        y=y_pos, x=x_pos, value=value
-                    )
+                yield y_pos, line
 
-        # Default value for OutOfBound cells when a Collection
-        # extends outside the grid, which can happen with .peek() and .line()
-        self.out_of_bounds_value = out_of_bounds_value
+    @staticmethod
+    def _stream_lines(stream: TextIO, line_sep: str = "\n") -> Iterator[str]:
+        """
+        Yield the same lines as stream.read().split(line_sep) without
+        reading the whole stream into memory.  Newline-separated streams
+        are read line by line, anything else in fixed-size chunks.
+        """
+        if line_sep == "\n":
+            line = ""
+            for line in stream:
+                yield line[:-1] if line.endswith("\n") else line
+            # "abc\n".split("\n") ends with an empty string, so does this
+            if line.endswith("\n") or line == "":
+                yield ""
+            return
+        remainder = ""
+        while True:
+            chunk = stream.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            lines = (remainder + chunk).split(line_sep)
+            remainder = lines.pop()
+            yield from lines
+        yield remainder
+
+    @staticmethod
+    def _strip_lines(lines: Iterable[str], line_sep: str = "\n") -> Iterator[str]:
+        """
+        Strip lines the same way the string parser does, data.strip() followed
+        by line.strip().  When line_sep is whitespace, data.strip() drops blank
+        lines from the start and end, so blank lines are held back until we
+        know whether more content follows them.
+        """
+        drop_blank_edges = line_sep.isspace()
+        started = False
+        pending_blank = 0
+        for line in lines:
+            line = line.strip()
+            if drop_blank_edges and not line:
+                pending_blank += 1
+                continue
+            if started:
+                yield from [""] * pending_blank
+            pending_blank = 0
+            started = True
+            yield line
+        if not started:
+            # Whitespace-only data still makes one empty row, like "".split()
+            yield ""
+
+    @classmethod
+    def from_stream(cls, stream: TextIO, **kwargs: Any) -> "Grid":
+        """
+        Create a Grid by reading a text file object incrementally, without
+        holding a copy of the whole text in memory.  Accepts the same
+        keyword arguments as Grid(), e.g. strip_whitespace, line_sep, sep
+        """
+        return cls(stream, **kwargs)  # type: ignore
+
+    @classmethod
+    def from_file(cls, path: Union[str, os.PathLike], **kwargs: Any) -> "Grid":
+        "Create a Grid by streaming a text file from disk, see from_stream"
+        with open(path) as f:
+            return cls.from_stream(f, **kwargs)
+
+    @classmethod
+    def from_mmap(cls, path: Union[str, os.PathLike], **kwargs: Any) -> "Grid":
+        """
+        Create a Grid over a memory-mapped fixed-width text file, where every
+        line is the same length and each byte is one value.  Nothing is
+        parsed up front, values are decoded with value_parser as they're read.
+        Accepts the same keyword arguments as Grid(), except storage_cls
+        """
+        storage = MmapStorage(
+            path,
+            cell_cls=kwargs.get("cell_cls") or cls.cell_cls,
+            value_parser=cls.value_parser,
+        )
+        return cls(storage, **kwargs)
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Write the grid to path in a compact binary format: a header with the
+        shape, value type, Grid / Cell / Collection classes, and
+        out_of_bounds_value, followed by the raw values.  Typed grids like
+        IntGrid store their values as a packed array.  Requires a regular grid.
+        """
+        serialization.save(self, path)
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, os.PathLike],
+        mmap: bool = False,
+        storage_cls: Optional[Type[Storage]] = None,
+    ) -> "Grid":
+        """
+        Read a grid written by Grid.save, as the Grid class it was saved from.
+        Values aren't parsed or validated again, typed values are read
+        straight into an ArrayStorage buffer.
+
+        With mmap=True typed values are memory-mapped instead of read, so
+        loading takes the same time for any size of grid.  Changes to the
+        grid stay in memory and are never written back to the file.
+
+        storage_cls (default ArrayStorage) picks the storage to load into.
+        Grids of arbitrary Python objects are stored with pickle, only load
+        files you trust.
+        """
+        return serialization.load(
+            cls, path, mmap_values=mmap, storage_cls=storage_cls or ArrayStorage
+        )
+
+    @classmethod
+    def from_numpy(
+        cls, arr: Any, storage_cls: Optional[Type[Storage]] = None, **kwargs: Any
+    ) -> "Grid":
+        """
+        Create a Grid from a 2-d numpy array, rows are y and columns are x.
+
+        Numeric arrays that fit the grid's typecode (or any numeric array for
+        a plain Grid) are copied in one go into an ArrayStorage buffer, other
+        arrays are converted with .tolist() and value_parser.  Accepts the
+        same keyword arguments as Grid(), storage_cls defaults to ArrayStorage.
+        """
+        return interop.from_numpy(cls, arr, storage_cls or ArrayStorage, **kwargs)
+
+    def to_numpy(self, copy: bool = False) -> Any:
+        """
+        Return the values of a regular grid as a 2-d numpy array.
+
+        Typed ArrayStorage grids (e.g. IntGrid with storage_cls=ArrayStorage)
+        return an array over the grid's own buffer, so changes to one show up
+        in the other.  Use copy=True for an independent array.
+        """
+        return interop.to_numpy(self, copy=copy)
+
+    @classmethod
+    def from_dataframe(cls, df: Any, **kwargs: Any) -> "Grid":
+        """
+        Create a Grid from a pandas DataFrame, rows are y and columns are x
+        by position (the index and column labels aren't used).
+        See Grid.from_numpy for keyword arguments.
+        """
+        return interop.from_dataframe(cls, df, **kwargs)
+
+    def to_dataframe(self, copy: bool = False) -> Any:
+        """
+        Return the values of a regular grid as a pandas DataFrame, see
+        Grid.to_numpy.  Without copy=True a typed buffer is shared.
+        """
+        return interop.to_dataframe(self, copy=copy)
+
+    @classmethod
+    def from_arrow(
+        cls, table: Any, columns: Optional[List[str]] = None, **kwargs: Any
+    ) -> "Grid":
+        """
+        Create a Grid from a pyarrow Table or RecordBatch, each column is an
+        x position (in table order) and each row a y position.  columns picks
+        a subset of columns by name.  Nulls become None.
+        See Grid.from_numpy for keyword arguments.
+        """
+        return interop.from_arrow(cls, table, columns=columns, **kwargs)
+
+    def to_arrow(self) -> Any:
+        "Return the values of a regular grid as a pyarrow Table with columns named '0', '1', ..."
+        return interop.to_arrow(self)
+
+    @classmethod
+    def from_parquet(
+        cls,
+        path: Union[str, os.PathLike],
+        rows: Optional[Tuple[int, int]] = None,
+        columns: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "Grid":
+        """
+        Create a Grid from a Parquet file, see Grid.from_arrow.
+
+        rows=(start, stop) reads only that range of rows, and only the row
+        groups of the file that hold them.  The first row read is y=0.
+        columns reads only those columns.
+        """
+        table = interop.read_parquet(path, rows=rows, columns=columns)
+        return interop.from_arrow(cls, table, **kwargs)
+
+    def to_parquet(self, path: Union[str, os.PathLike], **kwargs: Any) -> None:
+        """
+        Write the values of a regular grid to a Parquet file, see Grid.to_arrow.
+        kwargs go to pyarrow.parquet.write_table, e.g. row_group_size
+        """
+        interop.write_parquet(self, path, **kwargs)
+
+    @property
+    def data(self) -> Mapping[int, Mapping[int, BaseCell]]:
+        """
+        Return the grid as a y:x:Cell dict-of-dicts.
+
+        With the default DictStorage this is a read-only view of the
+        internal data, other storages build a new dict of Cells on each
+        access.  Use grid.set() to change values.
+        """
+        return self.storage.to_dict()
 
     @property
     def is_regular(self) -> bool:
-        "Return True if all rows are the same length"
-        return all(len(row) == len(self.data[0]) for row in self.data.values())
+        "Return True if the cells fill a rectangle starting at 0, 0, this is O(1)"
+        return self.storage.is_regular
 
     @property
     def shape(self) -> Tuple[int, int]:
-        "Return the shape of the grid"
-        return len(self.data), len(self.data[0])
+        "Return the (height, width) of the grid, the bounding box for irregular grids"
+        return self.storage.shape
 
     def __repr__(self):
         if self.is_regular:
@@ -103,55 +455,143 @@ class Grid:
         else:
             return f"<{self.__class__.__name__} shape=(irregular)>"
 
-    def get(self, y: int, x: int) -> Cell:
+    def _view(self, y: int, x: int) -> CellView:
+        "Return a CellView that writes back through .set()"
+        if not self.storage.contains(y, x):
+            raise KeyError((y, x))
+        return CellView(self.storage, y, x, self)
+
+    def get(self, y: int, x: int) -> BaseCell:
         "Return a Cell object at a given y, x position"
-        return self.data[y][x]
+        if self.lazy_cells:
+            return self._view(y, x)
+        return self.storage.get_cell(y, x)
 
     def get_row(self, y: int) -> Collection:
         "Return the y'th row. coll = grid.get_row(0) gives the top row of the grid"
-        cells = list(self.data[y].values())
+        cells: List[BaseCell]
+        if self.lazy_cells:
+            storage = self.storage
+            cells = [CellView(storage, y, x, self) for x in storage.row_keys(y)]
+        else:
+            cells = self.storage.row_cells(y)
         return self.collection_cls(cells=cells)
 
     def get_column(self, x: int) -> Collection:
         "Return the x'th column. coll = grid.get_column(0) gives the left column of the grid"
-        cells = [row[x] for row in self.data.values()]
+        cells: List[BaseCell]
+        if self.lazy_cells:
+            cells = [self._view(y, x) for y in self.storage.rows()]
+        else:
+            cells = self.storage.column_cells(x)
         return self.collection_cls(cells=cells)
 
+    def row_view(self, y: int) -> LineView:
+        "Return the y'th row as a LineView, which reads cells lazily instead of copying"
+        self._regular_shape("row_view")
+        return cast(LineView, self[y, :])
+
+    def column_view(self, x: int) -> LineView:
+        "Return the x'th column as a LineView, which reads cells lazily instead of copying"
+        self._regular_shape("column_view")
+        return cast(LineView, self[:, x])
+
+    def diagonal_view(
+        self, y: int, x: int, y_step: int = 1, x_step: int = 1
+    ) -> LineView:
+        "Return a LineView from y, x stepping by y_step, x_step until the edge of the grid"
+        self._regular_shape("diagonal_view")
+        if not self.storage.contains(y, x):
+            raise KeyError((y, x))
+        length = 0
+        while self.storage.contains(y + length * y_step, x + length * x_step):
+            length += 1
+            if not y_step and not x_step:
+                break
+        return LineView(self, y, x, y_step, x_step, length)
+
+    def __getitem__(
+        self, key: Tuple[Union[int, slice], Union[int, slice]]
+    ) -> Union[BaseCell, LineView, SubGridView]:
+        """
+        Index the grid numpy-style without copying.
+        grid[y, x] is a Cell, grid[y, :] and grid[:, x] are LineViews of a
+        row or column, and grid[y0:y1, x0:x1] is a SubGridView.
+        """
+        height, width = self._regular_shape("grid[y, x]")
+        return views.index_view(self, range(height), range(width), key)
+
     # Useful for iterating through every cell in the grid.  for cell in grid.flatten():
     def flatten(self) -> Collection:
         "Flatten the 2-d Grid into a 1-d Collection of cells"
-        cells = []
-        for row in self.data.values():
-            for cell in row.values():
-                cells.append(cell)
-        return Collection(cells=cells)
+        cells: List[BaseCell]
+        if self.lazy_cells:
+            storage = self.storage
+            cells = [
+                CellView(storage, y, x, self)
+                for y in storage.rows()
+                for x in storage.row_keys(y)
+            ]
+        else:
+            cells = list(self.storage.cells())
+        return self.collection_cls(cells=cells)
 
     # Primarily useful for integration to pandas: df = pandas.DataFrame(grid.values())
     def values(self) -> List[List[Any]]:
         "Return the grid as a list of lists"
-        return [[cell.value for cell in row.values()] for row in self.data.values()]
+        return self.storage.values()
 
-    def peek(self, y: int, x: int, y_offset: int, x_offset: int) -> Cell:
+    def set(self, y: int, x: int, value: Any) -> None:
+        """
+        Change the value at y, x, marking the position dirty and updating
+        every registered tracker with just that one change
+        """
+        if not self.storage.contains(y, x):
+            raise KeyError((y, x))
+        old = self.storage.get_value(y, x)
+        self.storage.set_value(y, x, value)
+        self.dirty.add((y, x))
+        for tracker in self.trackers:
+            tracker.update(self.storage, y, x, old, value)
+
+    def pop_dirty(self) -> Set[Tuple[int, int]]:
+        "Return the positions changed since the last call, and start over"
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def track(self, tracker: TrackerT) -> TrackerT:
+        """
+        Register an aggregate to maintain through .set(), e.g. LineSums(),
+        ValueCounts(), or KInARow(k).  It's computed once from the current
+        values and returned.
+        """
+        tracker.reset(self.storage)
+        self.trackers.append(tracker)
+        return tracker
+
+    def peek(self, y: int, x: int, y_offset: int, x_offset: int) -> BaseCell:
         "Return a Cell object offset from a given y, x position"
         y_out = y + y_offset
         x_out = x + x_offset
-        if y_out not in self.data or x_out not in self.data[y_out]:
-            return OutOfBoundsCell(y=y_out, x=x_out, value=self.out_of_bounds_value)
-        return self.data[y_out][x_out]
+        if not self.storage.contains(y_out, x_out):
+            return self.cell_cls.out_of_bounds_cls(
+                y=y_out, x=x_out, value=self.out_of_bounds_value
+            )
+        return self.get(y_out, x_out)
 
-    def peek_left(self, y: int, x: int, distance: int = 1) -> Cell:
+    def peek_left(self, y: int, x: int, distance: int = 1) -> BaseCell:
         "Return a Cell object to the left of a given y, x position"
         return self.peek(y=y, x=x, y_offset=0, x_offset=-distance)
 
-    def peek_right(self, y: int, x: int, distance: int = 1) -> Cell:
+    def peek_right(self, y: int, x: int, distance: int = 1) -> BaseCell:
         "Return a Cell object to the right of a given y, x position"
         return self.peek(y=y, x=x, y_offset=0, x_offset=distance)
 
-    def peek_up(self, y: int, x: int, distance: int = 1) -> Cell:
+    def peek_up(self, y: int, x: int, distance: int = 1) -> BaseCell:
         "Return a Cell object above a given y, x position"
         return self.peek(y=y, x=x, y_offset=-distance, x_offset=0)
 
-    def peek_down(self, y: int, x: int, distance: int = 1) -> Cell:
+    def peek_down(self, y: int, x: int, distance: int = 1) -> BaseCell:
         "Return a Cell object below a given y, x position"
         return self.peek(y=y, x=x, y_offset=distance, x_offset=0)
 
@@ -181,6 +621,447 @@ class Grid:
         diag_neighbors = self.peek_diagonal(y=y, x=x, distance=distance)
         return linear_neighbors + diag_neighbors
 
+    def topology(
+        self, neighbors: str = "all", distance: int = 1, wrap: bool = False
+    ) -> Topology:
+        """
+        Return the precomputed neighbors of every cell, see topology.Topology.
+        It's built once per grid shape and shared by every grid with that shape.
+
+        neighbors is "linear", "diagonal", "all", or "hex" (odd rows shifted
+        half a cell right).  wrap=True connects opposite edges of the grid.
+        A Topology can be passed as connectivity to flood_fill, shortest_path,
+        and distance_grid.
+        """
+        height, width = self._regular_shape("topology")
+        return topology.topology(height, width, neighbors, distance, wrap)
+
+    def neighbors(
+        self,
+        y: int,
+        x: int,
+        neighbors: str = "all",
+        distance: int = 1,
+        wrap: bool = False,
+    ) -> Collection:
+        """
+        Return the cells next to y, x, leaving out positions outside the grid
+        instead of returning OutOfBoundsCells like peek_all does.  Uses the
+        grid's cached topology for wrap=True or "hex", see Grid.topology.
+        """
+        height, width = self._regular_shape("neighbors")
+        positions: Callable[[int], Sequence[int]]
+        if wrap or neighbors == "hex":
+            positions = self.topology(neighbors, distance, wrap).neighbors
+        else:
+            offsets = aggregate.neighbor_offsets(neighbors, distance)
+            positions = topology.offset_neighbors(height, width, offsets)
+        if not self.storage.contains(y, x):
+            raise KeyError((y, x))
+        cells = [
+            self.get(*divmod(position, width)) for position in positions(y * width + x)
+        ]
+        return self.collection_cls(cells=cells)
+
+    def neighbor_reduce(
+        self,
+        reducer: str = "sum",
+        neighbors: str = "linear",
+        distance: int = 1,
+        value: Any = None,
+    ) -> "Grid":
+        """
+        Reduce the neighbors of every cell at once, the same as calling something
+        like sum(grid.peek_linear(y, x)) for each cell but without making Cells.
+        Returns a Grid of the results.
+
+        reducer is "min", "max", "sum", or "count".  "count" counts neighbors
+        equal to value, or truthy neighbors when value is None.
+        neighbors is "linear", "diagonal", or "all", see peek_all.
+
+        Out-of-bounds neighbors are padded with out_of_bounds_value, or left
+        out when out_of_bounds_value is None.
+        """
+        height, width = self._regular_shape("neighbor_reduce")
+        values = self.storage.flat_values()
+        pad = self.out_of_bounds_value
+        if reducer == "count":
+            if value is None:
+                values = [1 if v else 0 for v in values]
+                pad = 1 if pad else 0
+            else:
+                values = [1 if v == value else 0 for v in values]
+                pad = 1 if pad == value else 0
+        elif reducer not in _REDUCERS:
+            raise ValueError(
+                f"reducer must be one of {list(_REDUCERS) + ['count']}, got {reducer!r}"
+            )
+        results = aggregate.neighbor_reduce(
+            values,
+            height=height,
+            width=width,
+            offsets=aggregate.neighbor_offsets(neighbors, distance),
+            reducer=_REDUCERS.get(reducer, operator.add),
+            pad=aggregate.SKIP if pad is None else pad,
+        )
+        return self._result_grid(results, width)
+
+    def window_reduce(
+        self,
+        direction: str = "all",
+        length: int = 4,
+        reducer: str = "prod",
+        best: str = "max",
+        include_out_of_bounds: bool = False,
+    ) -> Optional[Tuple[Any, Collection]]:
+        """
+        Reduce every run of `length` adjacent values and return the best one,
+        e.g. "the greatest product of four adjacent numbers in a line".
+        Returns (value, collection) where collection is the winning
+        grid.line(), or None if the grid has no windows that long.
+
+        direction is "right", "down", "down_right", "down_left", or "all".
+        reducer is "prod", "sum", "max", or "min", and best picks whether
+        the "max" or "min" reduced value wins.
+
+        Windows that extend out of bounds are skipped, the same as checking
+        collection.extends_out_of_bounds().  With include_out_of_bounds=True
+        they're included, with out_of_bounds_value in the missing positions.
+        """
+        height, width = self._regular_shape("window_reduce")
+        if direction == "all":
+            directions = list(aggregate.WINDOW_DIRECTIONS)
+        elif direction in aggregate.WINDOW_DIRECTIONS:
+            directions = [direction]
+        else:
+            raise ValueError(
+                f"direction must be one of {list(aggregate.WINDOW_DIRECTIONS) + ['all']}, got {direction!r}"
+            )
+        if reducer not in aggregate.ROLLING:
+            raise ValueError(
+                f"reducer must be one of {list(aggregate.ROLLING)}, got {reducer!r}"
+            )
+        if best not in ("max", "min"):
+            raise ValueError(f"best must be 'max' or 'min', got {best!r}")
+        if length < 1:
+            raise ValueError("length must be at least 1")
+
+        values = self.storage.flat_values()
+        is_better = operator.gt if best == "max" else operator.lt
+        result = None
+        for name in directions:
+            y_step, x_step = aggregate.WINDOW_DIRECTIONS[name]
+            found = aggregate.best_window(
+                values,
+                height=height,
+                width=width,
+                y_step=y_step,
+                x_step=x_step,
+                length=length,
+                reducer=reducer,
+                best=best,
+                pad=self.out_of_bounds_value
+                if include_out_of_bounds
+                else aggregate.SKIP,
+            )
+            if found and (result is None or is_better(found[0], result[0])):
+                result = (found[0], found[1], y_step, x_step)
+        if result is None:
+            return None
+        value, start, y_step, x_step = result
+        y, x = divmod(start, width)
+        return value, self.line(y, x, y_step=y_step, x_step=x_step, distance=length)
+
+    def line_index(self, length: int) -> aggregate.LineIndex:
+        """
+        Return the index of every line of `length` cells going right, down,
+        down_right, and down_left.  It's built once per grid shape and shared
+        by every grid with that shape, see aggregate.LineIndex.
+        """
+        height, width = self._regular_shape("line_index")
+        return aggregate.line_index(height, width, length)
+
+    def find_k_in_a_row(self, k: int, value: Any = None) -> List[Collection]:
+        """
+        Return every line of k cells going right, down, down_right, or down_left
+        whose values are all equal to value, or all equal to each other when
+        value is None.  Each line is a Collection like grid.line() returns,
+        ordered by direction and then by starting cell.
+
+        Lines are found with bitboards, so checking every line costs a few
+        big-integer operations per direction rather than a Collection each.
+        """
+        index = self.line_index(k)
+        width = index.width
+        found = []
+        for board in index.boards(self.storage.flat_values(), value).values():
+            for name, start in index.find(board):
+                y_step, x_step = aggregate.WINDOW_DIRECTIONS[name]
+                found.append((start, name, y_step, x_step))
+        # Sort by direction and start, not by value
+        directions = list(aggregate.WINDOW_DIRECTIONS)
+        found.sort(key=lambda line: (directions.index(line[1]), line[0]))
+        return [
+            self.line(*divmod(start, width), y_step=y_step, x_step=x_step, distance=k)
+            for start, _, y_step, x_step in found
+        ]
+
+    def flood_fill(
+        self,
+        y: int,
+        x: int,
+        predicate: Optional[Callable[[Any], bool]] = None,
+        connectivity: Union[int, Topology] = 4,
+    ) -> Collection:
+        """
+        Return the Cells connected to y, x, like a paint bucket fill, in
+        breadth-first order.  With a predicate, the region is every connected
+        cell where predicate(value) is True (empty if the start cell isn't one).
+        Without one, it's every connected cell with the same value as y, x.
+
+        connectivity is 4 (left/right/up/down), 8 (diagonals too), or a
+        Topology from grid.topology() for wrap-around or hex neighbors
+        """
+        height, width = self._regular_shape("flood_fill")
+        if not self.storage.contains(y, x):
+            raise KeyError((y, x))
+        keys = components.region_keys(self.storage.flat_values(), predicate)
+        positions = components.flood_fill(
+            keys, height, width, start=y * width + x, connectivity=connectivity
+        )
+        cells = [self.get(*divmod(position, width)) for position in positions]
+        return self.collection_cls(cells=cells)
+
+    def label_components(
+        self,
+        predicate: Optional[Callable[[Any], bool]] = None,
+        connectivity: int = 4,
+    ) -> Tuple["Grid", List[Component]]:
+        """
+        Label every connected region of the grid at once.  Regions are
+        connected cells where predicate(value) is True, or connected cells
+        with equal values when there's no predicate.
+
+        Returns a Grid of labels (0 for cells outside any region, otherwise
+        1, 2, ... numbered in the order regions are first seen going row by row)
+        and a Component per label with its size and bounding box.
+        """
+        height, width = self._regular_shape("label_components")
+        keys = components.region_keys(self.storage.flat_values(), predicate)
+        labels, found = components.label_regions(
+            keys, height=height, width=width, connectivity=connectivity
+        )
+        return self._result_grid(labels, width, typecode="q"), found
+
+    def shortest_path(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        cost: Optional[Callable[[Any], Optional[float]]] = None,
+        connectivity: Union[int, Topology] = 4,
+        heuristic: Union[str, Callable[[int, int], float], None] = None,
+    ) -> Optional[Tuple[Any, Collection]]:
+        """
+        Find the cheapest path from start to goal, both (y, x) tuples.
+        Returns (total cost, Collection of cells from start to goal), or
+        None if goal can't be reached.
+
+        Stepping into a cell costs cost(value), or the value itself when cost
+        is None, and cells where cost returns None are walls.  The start cell's
+        own cost isn't counted.  When every step costs 1 this is a breadth-first
+        search, otherwise Dijkstra's algorithm.
+
+        heuristic turns on A*, either "manhattan" (connectivity=4), "chebyshev"
+        (connectivity=8), or a callable(y, x) estimating the cost left to goal.
+
+        connectivity can also be a Topology from grid.topology(), e.g. for
+        a grid that wraps around (the named heuristics don't know about that).
+        """
+        height, width = self._regular_shape("shortest_path")
+        for y, x in (start, goal):
+            if not self.storage.contains(y, x):
+                raise KeyError((y, x))
+        costs = pathfinding.step_costs(self.storage.flat_values(), cost)
+        goal_y, goal_x = goal
+        estimate: Optional[Callable[[int], float]] = None
+        if isinstance(heuristic, str):
+            if heuristic not in pathfinding.HEURISTICS:
+                raise ValueError(
+                    f"heuristic must be one of {list(pathfinding.HEURISTICS)} or a callable"
+                )
+            distance = pathfinding.HEURISTICS[heuristic]
+            cheapest = min((c for c in costs if c is not None), default=0)
+
+            def named_estimate(position: int) -> float:
+                y, x = divmod(position, width)
+                return distance(abs(goal_y - y), abs(goal_x - x)) * cheapest
+
+            estimate = named_estimate
+
+        elif heuristic is not None:
+            user_heuristic = heuristic
+
+            def user_estimate(position: int) -> float:
+                return user_heuristic(*divmod(position, width))
+
+            estimate = user_estimate
+
+        found, previous = pathfinding.search(
+            costs,
+            topology.connectivity_neighbors(height, width, connectivity),
+            sources=[start[0] * width + start[1]],
+            goal=goal_y * width + goal_x,
+            heuristic=estimate,
+        )
+        total = found[goal_y * width + goal_x]
+        if total is None:
+            return None
+        path = pathfinding.trace_path(previous, goal_y * width + goal_x)
+        cells = [self.get(*divmod(position, width)) for position in path]
+        return total, self.collection_cls(cells=cells)
+
+    def distance_grid(
+        self,
+        sources: List[Tuple[int, int]],
+        cost: Optional[Callable[[Any], Optional[float]]] = None,
+        connectivity: Union[int, Topology] = 4,
+    ) -> "Grid":
+        """
+        Return a Grid of the cheapest cost from the nearest of the (y, x)
+        sources to every cell, None where a cell can't be reached.
+        Costs work the same as in shortest_path.
+        """
+        height, width = self._regular_shape("distance_grid")
+        for y, x in sources:
+            if not self.storage.contains(y, x):
+                raise KeyError((y, x))
+        found, _ = pathfinding.search(
+            pathfinding.step_costs(self.storage.flat_values(), cost),
+            topology.connectivity_neighbors(height, width, connectivity),
+            sources=[y * width + x for y, x in sources],
+        )
+        return self._result_grid(found, width)
+
+    def simulate(
+        self,
+        step_fn: Callable[[simulation.Simulation], Any],
+        steps: Optional[int] = None,
+        neighbors: str = "all",
+    ) -> Iterator[Any]:
+        """
+        Run a cellular automaton over the grid, yielding whatever step_fn
+        returns for each generation (e.g. how many cells changed), forever
+        when steps is None.
+
+        step_fn gets a Simulation and fills in sim.next from sim.current, both
+        flat row-major sequences of values where y, x is at y * width + x.
+        sim.next starts each step as a copy of sim.current.  The helpers
+        sim.neighbor_counts(value), sim.neighbors(position), and
+        sim.cascade(seeds, visit) use `neighbors` ("linear", "diagonal", or "all").
+
+        The grid is updated after every step.  Grids with ArrayStorage
+        swap in the new buffer, other grids have the changed values set.
+        Changed positions are added to grid.dirty and handed to every
+        tracker, the same as .set().
+        The grid is checked when simulate is called, not on the first step.
+        """
+        height, width = self._regular_shape("simulate")
+        if isinstance(self.storage, MmapStorage):
+            raise TypeError("simulate can't update a read-only MmapStorage grid")
+        storage = self.storage
+        values: MutableSequence[Any]
+        if isinstance(storage, ArrayStorage):
+            if isinstance(storage.buffer, memoryview):
+                # A buffer mapped by Grid.load(mmap=True) is read into memory,
+                # slices of a memoryview share memory so it can't be doubled
+                view = storage.buffer
+                storage.buffer = array.array(view.format, view.tobytes())
+            values = storage.buffer
+        else:
+            values = list(storage.flat_values())
+
+        def update(sim: simulation.Simulation) -> None:
+            # sim.next still holds the previous generation after the swap
+            current, previous = sim.current, sim.next
+            changed = [
+                divmod(position, width)
+                for position, (value, old) in enumerate(zip(current, previous))
+                if value != old
+            ]
+            if isinstance(storage, ArrayStorage):
+                storage.buffer = current
+            else:
+                for y, x in changed:
+                    storage.set_value(y, x, current[y * width + x])
+            self.dirty.update(changed)
+            # Trackers see the whole generation, not half of it
+            for tracker in self.trackers:
+                for y, x in changed:
+                    position = y * width + x
+                    tracker.update(storage, y, x, previous[position], current[position])
+
+        sim = simulation.Simulation(
+            values,
+            height=height,
+            width=width,
+            neighbors=neighbors,
+            out_of_bounds_value=self.out_of_bounds_value,
+        )
+        return simulation.run(sim, step_fn, steps, on_step=update)
+
+    def parallel_map(
+        self,
+        fn: Callable[["Grid", int, int], Any],
+        tiles: Union[int, Tuple[int, int], None] = None,
+        workers: Optional[int] = None,
+        distance: int = 1,
+    ) -> "Grid":
+        """
+        Call fn(grid, y, x) for every cell using a pool of worker processes,
+        returning a Grid of the results.
+
+        The grid is cut into `tiles` row bands (an int, one band per worker by
+        default) or tiles of (tile_height, tile_width) cells.  fn gets a Grid
+        of its tile plus `distance` cells on every side, keeping the original
+        y, x positions, so peeks up to `distance` away behave the same as on
+        the whole grid.  Typed values (e.g. IntGrid with ArrayStorage) reach
+        the workers through shared memory, other values are sent as lists.
+
+        fn has to be picklable, e.g. defined at module level.
+        workers=1 runs every tile in this process.
+        """
+        height, width = self._regular_shape("parallel_map")
+        if tiles is None:
+            tiles = workers or os.cpu_count() or 1
+        results = parallel.parallel_map(
+            self,
+            fn,
+            height=height,
+            width=width,
+            tiles=tiles,
+            workers=workers,
+            distance=distance,
+        )
+        return self._result_grid(results, width)
+
+    def _regular_shape(self, name: str) -> Tuple[int, int]:
+        "Return the shape of the grid, raising ValueError if it isn't regular"
+        if not self.is_regular:
+            raise ValueError(f"{name} requires a regular grid")
+        return self.shape
+
+    def _result_grid(
+        self, values: Sequence[Any], width: int, typecode: Optional[str] = None
+    ) -> "Grid":
+        "Wrap a flat, row-major sequence of results in a new Grid"
+        # An empty grid has width 0, and no rows to slice
+        starts = range(0, len(values), width) if width else range(0)
+        storage = ArrayStorage(
+            ((y, values[start : start + width]) for y, start in enumerate(starts)),
+            typecode=typecode,
+        )
+        return Grid(storage, out_of_bounds_value=self.out_of_bounds_value)
+
     def line(
         self, y: int, x: int, y_step: int = 0, x_step: int = 0, distance: int = 1
     ) -> Collection:
@@ -210,20 +1091,42 @@ class Grid:
         Useful for situations such as "Count the number of values immediately to the right
         that are shorter than the current cell value."
         """
-        cell = self.get(y, x)
-        cells = []
-        while True:
-            next_cell = self.peek(y=y, x=x, y_offset=y_step, x_offset=x_step)
-            if isinstance(next_cell, OutOfBoundsCell):
-                break
-            if not op(cell.value, next_cell.value):
-                if include_break_case:
-                    cells.append(next_cell)
-                break
-            cells.append(next_cell)
-            y = next_cell.y
-            x = next_cell.x
-        return self.collection_cls(cells=cells)
+        steps = [(y_step, x_step)]
+        return self._op_rays(y, x, steps, op=op, include_break_case=include_break_case)[
+            0
+        ]
+
+    def _op_rays(
+        self,
+        y: int,
+        x: int,
+        steps: List[Tuple[int, int]],
+        op: Callable,
+        include_break_case: bool = False,
+    ) -> List[Collection]:
+        """
+        Walk a ray from y, x for each (y_step, x_step), collecting cells while
+        op(start value, next value) holds.  Positions are stepped and bounds
+        checked directly against storage, so Cells are only made for the
+        positions that end up in a Collection, never for out-of-bounds ones.
+        """
+        contains = self.storage.contains
+        get_value = self.storage.get_value
+        value = get_value(y, x)
+        collections = []
+        for y_step, x_step in steps:
+            cells = []
+            next_y, next_x = y + y_step, x + x_step
+            while contains(next_y, next_x):
+                keep_going = op(value, get_value(next_y, next_x))
+                if keep_going or include_break_case:
+                    cells.append(self.get(next_y, next_x))
+                if not keep_going:
+                    break
+                next_y += y_step
+                next_x += x_step
+            collections.append(self.collection_cls(cells=cells))
+        return collections
 
     def op_left(
         self, y: int, x: int, op: Callable, include_break_case: bool = False
@@ -280,14 +1183,9 @@ class Grid:
         op: Callable,
         include_break_case: bool = False,
     ) -> List[Collection]:
-        "Return a Collection of cells in all directions from a given y/x position"
-        collections = [
-            self.op_left(y=y, x=x, op=op, include_break_case=include_break_case),
-            self.op_right(y=y, x=x, op=op, include_break_case=include_break_case),
-            self.op_up(y=y, x=x, op=op, include_break_case=include_break_case),
-            self.op_down(y=y, x=x, op=op, include_break_case=include_break_case),
-        ]
-        return collections
+        "Return a Collection of cells in each diagonal direction (up/left, up/right, down/left, down/right)"
+        steps = aggregate.NEIGHBOR_OFFSETS["diagonal"]
+        return self._op_rays(y, x, steps, op=op, include_break_case=include_break_case)
 
     def op_all(
         self,
@@ -296,12 +1194,37 @@ class Grid:
         op: Callable,
         include_break_case: bool = False,
     ) -> List[Collection]:
-        "Return a Collection of cells in all directions from a given y/x position"
-        collections = []
-        collections.extend(
-            self.op_linear(y=y, x=x, op=op, include_break_case=include_break_case)
-        )
-        collections.extend(
-            self.op_diagonal(y=y, x=x, op=op, include_break_case=include_break_case)
-        )
-        return collections
+        "Return a Collection of cells in all directions from a given y/x position, linear then diagonal"
+        steps = aggregate.NEIGHBOR_OFFSETS["all"]
+        return self._op_rays(y, x, steps, op=op, include_break_case=include_break_case)
+
+    def line_of_sight(
+        self, op: Callable, include_break_case: bool = False
+    ) -> Tuple[Dict[str, "Grid"], Dict[str, "Grid"]]:
+        """
+        Run op_left, op_right, op_up, and op_down for every cell at once.
+        Returns two dicts keyed by "left", "right", "up", and "down":
+
+        distances - a Grid of len(grid.op_<direction>(y, x, op, include_break_case))
+        edges - a Grid of True where that walk reached the edge of the grid
+
+        This is O(rows * columns) for operator.gt/ge/lt/le/eq/ne, other
+        callables are supported but walk each cell's line.
+        """
+        height, width = self._regular_shape("line_of_sight")
+        values = self.storage.flat_values()
+        distances = {}
+        edges = {}
+        for name, (y_step, x_step) in visibility.SIGHT_DIRECTIONS.items():
+            sight = visibility.line_of_sight(
+                values,
+                height=height,
+                width=width,
+                y_step=y_step,
+                x_step=x_step,
+                op=op,
+                include_break_case=include_break_case,
+            )
+            distances[name] = self._result_grid(sight[0], width)
+            edges[name] = self._result_grid(sight[1], width)
+        return distances, edges
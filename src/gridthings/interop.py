@@ -0,0 +1,203 @@
+import array
+import importlib
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type, Union
+
+from .cell import Cell
+from .storage import ArrayStorage, MmapStorage, Storage, storage_from_flat
+
+if TYPE_CHECKING:
+    from .grid import Grid
+
+# Moving grids in and out of NumPy and pandas without going through Cells.
+#
+# Typed values live in an array.array (or a memoryview, see Grid.load) when
+# a grid uses ArrayStorage, which is the same memory layout as a C-contiguous
+# numpy array.  to_numpy wraps that buffer with np.frombuffer, no copy, and
+# from_numpy copies the array's bytes into a new array.array in one go.
+# Other grids go through a flat list of values, which is still one pass
+# instead of a pydantic Cell per value.
+#
+# Arrow tables are columnar, so column x of the grid is column x of the
+# table and row y is row y.  Numeric columns without nulls come out of Arrow
+# as numpy arrays over Arrow's own buffers, np.column_stack interleaves them
+# into a row-major array (one copy) and from_numpy copies that into the
+# grid's buffer (a second copy).  Parquet files are read through
+# pyarrow, only the row groups and columns that are asked for.
+#
+# numpy, pandas, and pyarrow are optional dependencies, imported on first use.
+
+# (dtype kind, itemsize) -> array.array typecode, for numeric numpy dtypes
+_TYPECODES: Dict[Tuple[str, int], str] = {}
+for _typecode in "bBhHiIqQlLfd":
+    _kind = "f" if _typecode in "fd" else "u" if _typecode.isupper() else "i"
+    _TYPECODES.setdefault((_kind, array.array(_typecode).itemsize), _typecode)
+
+
+def import_optional(name: str, extra: str) -> Any:
+    "Import an optional dependency, explaining how to install it when missing"
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        raise ImportError(
+            f"{name} is required for this, install it with `pip install gridthings[{extra}]`"
+        ) from e
+
+
+def dtype_typecode(dtype: Any) -> Optional[str]:
+    "Return the array.array typecode with the same layout as a numpy dtype, if any"
+    if not dtype.isnative:
+        return None
+    return _TYPECODES.get((dtype.kind, dtype.itemsize))
+
+
+def to_numpy(grid: "Grid", copy: bool = False) -> Any:
+    "Return a regular grid's values as a 2-d numpy array, see Grid.to_numpy"
+    np = import_optional("numpy", "numpy")
+    height, width = grid._regular_shape("to_numpy")
+    values = grid.storage.flat_values()
+    if isinstance(values, (array.array, memoryview)):
+        typecode = values.typecode if isinstance(values, array.array) else values.format
+        if typecode in _TYPECODES.values():
+            result = np.frombuffer(values, dtype=typecode).reshape(height, width)
+            return result.copy() if copy else result
+    if isinstance(grid.storage, MmapStorage):
+        values = list(values)
+    return np.array(values).reshape(height, width)
+
+
+def from_numpy(
+    cls: Type["Grid"],
+    arr: Any,
+    storage_cls: Type[Storage] = ArrayStorage,
+    **kwargs: Any,
+) -> "Grid":
+    "Build a grid from a 2-d numpy array, see Grid.from_numpy"
+    np = import_optional("numpy", "numpy")
+    arr = np.asarray(arr)
+    if arr.ndim != 2:
+        raise ValueError(f"from_numpy requires a 2-d array, got {arr.ndim} dimensions")
+    height, width = arr.shape
+    cell_cls = kwargs.pop("cell_cls", None) or cls.cell_cls
+    validates = issubclass(cell_cls, Cell) and cell_cls is not Cell
+    if validates and not cls._parser_validates(cell_cls):
+        # A custom cell_cls may have validators, build Cells the usual way
+        return cls(arr.tolist(), cell_cls=cell_cls, storage_cls=storage_cls, **kwargs)
+    typecode = cls.typecode
+    if typecode is None and cls.value_parser is None:
+        typecode = dtype_typecode(arr.dtype)
+
+    values: Any
+    if typecode and np.can_cast(arr.dtype, typecode, casting="safe"):
+        # The numpy cast already did the validating.  frombytes copies the raw
+        # bytes once, plus one more copy if arr needs converting to typecode
+        # or isn't C-contiguous
+        values = array.array(typecode)
+        values.frombytes(np.ascontiguousarray(arr, dtype=typecode).ravel().view("B"))
+    else:
+        values = arr.ravel().tolist()
+        if cls.value_parser:
+            rows = ((y, values[y * width : (y + 1) * width]) for y in range(height))
+            converted = cls._convert_rows(rows, cls.value_parser)
+            values = [value for _, row in converted for value in row]
+        if typecode:
+            try:
+                values = array.array(typecode, values)
+            except OverflowError:
+                typecode = None
+    storage = storage_from_flat(
+        storage_cls, values, height, width, cell_cls=cell_cls, typecode=typecode
+    )
+    return cls(storage, cell_cls=cell_cls, **kwargs)
+
+
+def to_dataframe(grid: "Grid", copy: bool = False) -> Any:
+    "Return a regular grid's values as a pandas DataFrame, see Grid.to_dataframe"
+    pd = import_optional("pandas", "pandas")
+    return pd.DataFrame(to_numpy(grid, copy=copy), copy=False)
+
+
+def from_dataframe(cls: Type["Grid"], df: Any, **kwargs: Any) -> "Grid":
+    "Build a grid from a DataFrame's values, see Grid.from_dataframe"
+    return from_numpy(cls, df.to_numpy(), **kwargs)
+
+
+def to_arrow(grid: "Grid") -> Any:
+    "Return a regular grid's values as a pyarrow Table, see Grid.to_arrow"
+    pa = import_optional("pyarrow", "arrow")
+    height, width = grid._regular_shape("to_arrow")
+    values = grid.storage.flat_values()
+    if isinstance(values, (array.array, memoryview)):
+        # Columns are strided in the row-major buffer, numpy slices them
+        # without copying and Arrow makes one copy per column
+        arr = to_numpy(grid)
+        columns = [pa.array(arr[:, x]) for x in range(width)]
+    else:
+        if isinstance(grid.storage, MmapStorage):
+            values = list(values)
+        columns = [pa.array(values[x::width]) for x in range(width)]
+    return pa.Table.from_arrays(columns, names=[str(x) for x in range(width)])
+
+
+def _column_values(column: Any) -> Any:
+    "Return an Arrow column as a numpy array, with nulls as None instead of NaN"
+    np = import_optional("numpy", "arrow")
+    if column.null_count:
+        return np.array(column.to_pylist(), dtype=object)
+    # A Table's ChunkedArray columns always copy if they need to, but a
+    # RecordBatch's Arrays default to zero_copy_only=True, which fails for
+    # e.g. strings
+    return column.to_numpy(zero_copy_only=False)
+
+
+def from_arrow(
+    cls: Type["Grid"], table: Any, columns: Optional[List[str]] = None, **kwargs: Any
+) -> "Grid":
+    "Build a grid from a pyarrow Table or RecordBatch, see Grid.from_arrow"
+    np = import_optional("numpy", "arrow")
+    if columns is not None:
+        table = table.select(columns)
+    arrays = [_column_values(column) for column in table.columns]
+    if not arrays:
+        return from_numpy(cls, np.empty((0, 0)), **kwargs)
+    if len({arr.dtype for arr in arrays}) == 1:
+        stacked = np.column_stack(arrays)
+    else:
+        # column_stack would promote e.g. ints and strings to all strings
+        stacked = np.empty((table.num_rows, len(arrays)), dtype=object)
+        for x, arr in enumerate(arrays):
+            stacked[:, x] = arr
+    return from_numpy(cls, stacked, **kwargs)
+
+
+def read_parquet(
+    path: Union[str, os.PathLike],
+    rows: Optional[Tuple[int, int]] = None,
+    columns: Optional[List[str]] = None,
+) -> Any:
+    """
+    Read a Parquet file into a pyarrow Table, only reading the row groups
+    that overlap rows=(start, stop) and the named columns
+    """
+    pq = import_optional("pyarrow.parquet", "arrow")
+    parquet_file = pq.ParquetFile(path)
+    if rows is None:
+        return parquet_file.read(columns=columns)
+    start, stop = rows
+    groups: List[int] = []
+    first_row = position = 0
+    for i in range(parquet_file.num_row_groups):
+        num_rows = parquet_file.metadata.row_group(i).num_rows
+        if position < stop and position + num_rows > start:
+            if not groups:
+                first_row = position
+            groups.append(i)
+        position += num_rows
+    table = parquet_file.read_row_groups(groups, columns=columns)
+    return table.slice(max(start - first_row, 0), max(stop - start, 0))
+
+
+def write_parquet(grid: "Grid", path: Union[str, os.PathLike], **kwargs: Any) -> None:
+    "Write a regular grid to a Parquet file, see Grid.to_parquet"
+    pq = import_optional("pyarrow.parquet", "arrow")
+    pq.write_table(to_arrow(grid), path, **kwargs)
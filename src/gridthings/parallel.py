@@ -0,0 +1,199 @@
+import array
+import concurrent.futures
+from multiprocessing import shared_memory
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from .storage import DictStorage
+
+if TYPE_CHECKING:
+    from .grid import Grid
+
+# Running a per-cell function over a grid in several processes.
+#
+# The grid is cut into tiles, and each tile is handed to a worker with a
+# "halo" of extra cells around it, so fn can peek up to `distance` cells
+# past the tile's edge.  Values in a typed buffer (e.g. IntGrid with a
+# typecode) are put in one multiprocessing.shared_memory block that every
+# worker reads its tile from.  Anything else is sent as plain lists of raw
+# values, never as pydantic Cells.  Workers rebuild a small Grid for their
+# tile with the original y, x positions, run fn on each cell in the tile,
+# and send back a flat list of results.
+
+# array.array typecodes that memoryview.cast understands
+_SHAREABLE = set("bBhHiIlLqQfd")
+
+# (y_start, y_stop, x_start, x_stop), stops are exclusive
+Box = Tuple[int, int, int, int]
+
+
+class SharedBuffer(NamedTuple):
+    "Where a worker finds the grid's flat values in shared memory"
+    name: str
+    typecode: str
+    width: int
+
+
+class TileTask(NamedTuple):
+    tile: Box
+    halo: Box
+    source: Union[SharedBuffer, List[Tuple[int, List[Any]]]]
+    fn: Callable[..., Any]
+    grid_cls: Type["Grid"]
+    grid_kwargs: Dict[str, Any]
+
+
+def split_tiles(
+    height: int, width: int, tiles: Union[int, Tuple[int, int]]
+) -> List[Box]:
+    """
+    Cut a grid into row bands when tiles is an int (the number of bands),
+    or into tiles of (tile_height, tile_width) cells
+    """
+    if isinstance(tiles, int):
+        if tiles < 1:
+            raise ValueError("tiles must be at least 1")
+        band = -(-height // tiles)  # ceiling division
+        tile_height, tile_width = max(band, 1), max(width, 1)
+    else:
+        tile_height, tile_width = tiles
+        if tile_height < 1 or tile_width < 1:
+            raise ValueError("tile sizes must be at least 1")
+    return [
+        (y, min(y + tile_height, height), x, min(x + tile_width, width))
+        for y in range(0, height, tile_height)
+        for x in range(0, width, tile_width)
+    ]
+
+
+def with_halo(tile: Box, height: int, width: int, distance: int) -> Box:
+    "Grow a tile by distance cells on every side, staying inside the grid"
+    y_start, y_stop, x_start, x_stop = tile
+    return (
+        max(y_start - distance, 0),
+        min(y_stop + distance, height),
+        max(x_start - distance, 0),
+        min(x_stop + distance, width),
+    )
+
+
+def _buffer(block: shared_memory.SharedMemory) -> memoryview:
+    "Return block's buffer, typeshed marks it Optional since close() clears it"
+    return cast(memoryview, block.buf)
+
+
+def _halo_rows(
+    values: Sequence[Any], width: int, halo: Box
+) -> Iterator[Tuple[int, Dict[int, Any]]]:
+    y_start, y_stop, x_start, x_stop = halo
+    for y in range(y_start, y_stop):
+        row = y * width
+        yield y, dict(zip(range(x_start, x_stop), values[row + x_start : row + x_stop]))
+
+
+def run_tile(task: TileTask) -> Tuple[Box, List[Any]]:
+    "Build the Grid for one tile plus its halo and run fn on the tile's cells"
+    if isinstance(task.source, SharedBuffer):
+        # Workers share the parent's resource tracker, which forgets the
+        # block when the parent unlinks it.  typeshed only accepts literal
+        # formats for memoryview.cast, the typecode is checked by _SHAREABLE
+        block = shared_memory.SharedMemory(name=task.source.name)
+        values = _buffer(block).cast(task.source.typecode)  # type: ignore
+        rows = list(_halo_rows(values, task.source.width, task.halo))
+        values.release()
+        block.close()
+    else:
+        rows = [(y, dict(enumerate(row, task.halo[2]))) for y, row in task.source]
+    storage = DictStorage(rows, cell_cls=task.grid_kwargs["cell_cls"], validated=True)
+    grid = task.grid_cls(storage, **task.grid_kwargs)
+    y_start, y_stop, x_start, x_stop = task.tile
+    results = [
+        task.fn(grid, y, x)
+        for y in range(y_start, y_stop)
+        for x in range(x_start, x_stop)
+    ]
+    return task.tile, results
+
+
+def parallel_map(
+    grid: "Grid",
+    fn: Callable[["Grid", int, int], Any],
+    height: int,
+    width: int,
+    tiles: Union[int, Tuple[int, int]],
+    workers: Optional[int],
+    distance: int,
+) -> List[Any]:
+    "Run fn over every cell of a regular grid in tiles, returning flat results"
+    values = grid.storage.flat_values()
+    grid_kwargs = {
+        "cell_cls": grid.cell_cls,
+        "collections_cls": grid.collection_cls,
+        "out_of_bounds_value": grid.out_of_bounds_value,
+    }
+    boxes = split_tiles(height, width, tiles)
+    halos = [with_halo(box, height, width, distance) for box in boxes]
+    results: List[Any] = [None] * (height * width)
+
+    def gather(tile: Box, tile_results: List[Any]) -> None:
+        y_start, y_stop, x_start, x_stop = tile
+        tile_width = x_stop - x_start
+        for y in range(y_start, y_stop):
+            start = (y - y_start) * tile_width
+            row = y * width
+            results[row + x_start : row + x_stop] = tile_results[
+                start : start + tile_width
+            ]
+
+    def plain_tasks() -> Iterator[TileTask]:
+        for box, halo in zip(boxes, halos):
+            rows = [
+                (y, list(values[y * width + halo[2] : y * width + halo[3]]))
+                for y in range(halo[0], halo[1])
+            ]
+            yield TileTask(box, halo, rows, fn, type(grid), grid_kwargs)
+
+    if workers is not None and workers <= 1:
+        for task in plain_tasks():
+            gather(*run_tile(task))
+        return results
+
+    block = None
+    if (
+        isinstance(values, array.array)
+        and values.typecode in _SHAREABLE
+        and len(values)
+    ):
+        block = shared_memory.SharedMemory(
+            create=True, size=len(values) * values.itemsize
+        )
+        _buffer(block)[: len(values) * values.itemsize] = memoryview(values).cast("B")
+        source = SharedBuffer(block.name, values.typecode, width)
+        tasks: Iterator[TileTask] = (
+            TileTask(box, halo, source, fn, type(grid), grid_kwargs)
+            for box, halo in zip(boxes, halos)
+        )
+    else:
+        tasks = plain_tasks()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            for tile, tile_results in pool.map(run_tile, tasks):
+                gather(tile, tile_results)
+    finally:
+        if block is not None:
+            block.close()
+            block.unlink()
+    return results
@@ -0,0 +1,114 @@
+import array
+import collections
+import heapq
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+# Shortest paths over grid cells, where a cell's cost is what it takes to
+# step into it (the Advent of Code "chiton" style maze).  Everything works on
+# flat positions (y * width + x) with a binary heap, and plain breadth-first
+# search when every step costs 1.  A* is Dijkstra with a heuristic added to
+# the heap priority.
+
+# Heuristics for a regular grid, scaled by the cheapest step so they
+# never overestimate the remaining cost
+HEURISTICS = {
+    "manhattan": lambda dy, dx: dy + dx,
+    "chebyshev": lambda dy, dx: max(dy, dx),
+}
+
+
+def step_costs(
+    values: Sequence[Any], cost: Optional[Callable[[Any], Optional[float]]] = None
+) -> List[Optional[float]]:
+    """
+    Return the cost to enter each position, cost(value) or the value itself.
+    None means the position can't be entered.
+    """
+    costs = list(values) if cost is None else [cost(value) for value in values]
+    for c in costs:
+        if c is None:
+            continue
+        try:
+            negative = c < 0
+        except TypeError:
+            raise TypeError(
+                f"step costs must be numbers or None, got {c!r}, "
+                "pass cost to turn values into costs"
+            ) from None
+        if negative:
+            raise ValueError("step costs must not be negative")
+    return costs
+
+
+def search(
+    costs: Sequence[Optional[float]],
+    neighbors: Callable[[int], Iterable[int]],
+    sources: Iterable[int],
+    goal: Optional[int] = None,
+    heuristic: Optional[Callable[[int], float]] = None,
+) -> Tuple[List[Optional[float]], "array.array[int]"]:
+    """
+    Find the cheapest cost from any source to each position, stopping early
+    once goal is settled.  Returns (distances, previous), where distances
+    is None for unreached positions and previous[i] is the position the best
+    path came from, -1 for sources and unreached positions.
+    Steps go from a position to each of neighbors(position), see
+    topology.connectivity_neighbors.
+    """
+    size = len(costs)
+    distances: List[Optional[float]] = [None] * size
+    previous = array.array("q", [-1]) * size
+    sources = list(sources)
+    for source in sources:
+        distances[source] = 0
+
+    if heuristic is None and all(c is None or c == 1 for c in costs):
+        # Every step costs the same, breadth-first order is cheapest-first
+        queue = collections.deque(sources)
+        while queue:
+            position = queue.popleft()
+            if position == goal:
+                break
+            step = distances[position] + 1  # type: ignore
+            for neighbor in neighbors(position):
+                if distances[neighbor] is None and costs[neighbor] is not None:
+                    distances[neighbor] = step
+                    previous[neighbor] = position
+                    queue.append(neighbor)
+        return distances, previous
+
+    estimate = heuristic or (lambda position: 0)
+    heap: List[Tuple[float, float, int]] = [
+        (estimate(source), 0, source) for source in sources
+    ]
+    heapq.heapify(heap)
+    settled = bytearray(size)
+    while heap:
+        _, distance, position = heapq.heappop(heap)
+        if settled[position]:
+            continue
+        settled[position] = 1
+        if position == goal:
+            break
+        for neighbor in neighbors(position):
+            step_cost = costs[neighbor]
+            if step_cost is None or settled[neighbor]:
+                continue
+            new_distance = distance + step_cost
+            current = distances[neighbor]
+            if current is None or new_distance < current:
+                distances[neighbor] = new_distance
+                previous[neighbor] = position
+                heapq.heappush(
+                    heap, (new_distance + estimate(neighbor), new_distance, neighbor)
+                )
+    return distances, previous
+
+
+def trace_path(previous: Sequence[int], goal: int) -> List[int]:
+    "Follow previous links back from goal, returning positions from the source"
+    path = [goal]
+    while previous[path[-1]] != -1:
+        path.append(previous[path[-1]])
+    path.reverse()
+    return path
@@ -0,0 +1,191 @@
+import array
+import importlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    MutableSequence,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from .storage import ArrayStorage, HashStorage, Storage, storage_from_flat
+
+if TYPE_CHECKING:
+    from .grid import Grid
+
+# A compact binary file format for regular grids, so a big grid can be
+# loaded again without re-parsing text or validating a pydantic Cell per
+# value.  The layout is:
+#
+#   MAGIC, then (version, header length) as two little-endian uint32s
+#   a JSON header with the shape, dtype, grid / cell / collection classes,
+#   and out_of_bounds_value
+#   zero padding up to a multiple of 8 bytes
+#   the values, row after row
+#
+# dtype is an array.array typecode (e.g. "q" for IntGrid) when the values fit
+# in a typed buffer, and then the values are the raw bytes of that buffer.
+# Loading those is one copy into an array.array, or with mmap=True no copy
+# at all, the grid's buffer is a memoryview over the mapped file.
+# "char" is for grids of single characters, stored as UTF-32, and anything
+# else is a pickled list of values.  Classes are stored by import path,
+# the same way pickle finds them.
+
+MAGIC = b"GRIDTHNG"
+VERSION = 1
+_PREFIX = struct.Struct("<II")
+_ALIGNMENT = 8
+
+
+def _class_path(cls: type) -> str:
+    "Return module:qualname for cls, checking that it can be imported again"
+    path = f"{cls.__module__}:{cls.__qualname__}"
+    try:
+        found = _import_class(path)
+    except (ImportError, AttributeError):
+        found = None
+    if found is not cls:
+        raise TypeError(f"{cls!r} can't be saved, it isn't importable as {path}")
+    return path
+
+
+def _import_class(path: str) -> Any:
+    module_name, _, qualname = path.partition(":")
+    found: Any = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        found = getattr(found, name)
+    return found
+
+
+def _encode_values(grid: "Grid", values: Sequence[Any]) -> Tuple[str, Any]:
+    "Pick the dtype for a grid's flat values and return (dtype, bytes-like)"
+    if isinstance(values, (array.array, memoryview)):
+        return (
+            values.format if isinstance(values, memoryview) else values.typecode,
+            values,
+        )
+    if grid.typecode:
+        try:
+            return grid.typecode, array.array(grid.typecode, values)
+        except (OverflowError, TypeError):
+            pass
+    if all(isinstance(value, str) and len(value) == 1 for value in values):
+        return "char", "".join(values).encode("utf-32-le")
+    return "pickle", pickle.dumps(list(values), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def save(grid: "Grid", path: Union[str, os.PathLike]) -> None:
+    "Write a regular grid to path, see Grid.save"
+    if isinstance(grid.storage, HashStorage):
+        raise TypeError("save doesn't support grids with HashStorage")
+    height, width = grid._regular_shape("save")
+    dtype, data = _encode_values(grid, grid.storage.flat_values())
+    try:
+        out_of_bounds_value = json.loads(json.dumps(grid.out_of_bounds_value))
+    except TypeError:
+        raise TypeError("out_of_bounds_value must be JSON serializable to save a grid")
+    header: Dict[str, Any] = {
+        "shape": [height, width],
+        "dtype": dtype,
+        "itemsize": data.itemsize if dtype not in {"char", "pickle"} else None,
+        "byteorder": sys.byteorder,
+        "grid_cls": _class_path(type(grid)),
+        "cell_cls": _class_path(grid.cell_cls),
+        "collection_cls": _class_path(grid.collection_cls),
+        "out_of_bounds_value": out_of_bounds_value,
+        "lazy_cells": grid.lazy_cells,
+    }
+    encoded = json.dumps(header).encode("utf-8")
+    start = len(MAGIC) + _PREFIX.size + len(encoded)
+    padding = -start % _ALIGNMENT
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_PREFIX.pack(VERSION, len(encoded)))
+        f.write(encoded)
+        f.write(b"\0" * padding)
+        f.write(data)
+
+
+def read_header(path: Union[str, os.PathLike]) -> Tuple[Dict[str, Any], int]:
+    "Return the header of a saved grid and where its values start in the file"
+    with open(path, "rb") as f:
+        prefix = f.read(len(MAGIC) + _PREFIX.size)
+        if not prefix.startswith(MAGIC) or len(prefix) < len(MAGIC) + _PREFIX.size:
+            raise ValueError(f"{os.fspath(path)} is not a saved grid")
+        version, header_length = _PREFIX.unpack(prefix[len(MAGIC) :])
+        if version != VERSION:
+            raise ValueError(f"Unsupported grid file version {version}")
+        header = json.loads(f.read(header_length).decode("utf-8"))
+    start = len(prefix) + header_length
+    return header, start + -start % _ALIGNMENT
+
+
+def load(
+    cls: Type["Grid"],
+    path: Union[str, os.PathLike],
+    mmap_values: bool = False,
+    storage_cls: Type[Storage] = ArrayStorage,
+) -> "Grid":
+    "Read a grid written by save, see Grid.load"
+    header, offset = read_header(path)
+    grid_cls = _import_class(header["grid_cls"])
+    if not issubclass(grid_cls, cls):
+        raise TypeError(f"{path} holds a {grid_cls.__name__}, not a {cls.__name__}")
+    cell_cls = _import_class(header["cell_cls"])
+    height, width = header["shape"]
+    dtype = header["dtype"]
+    typecode = None if dtype in {"char", "pickle"} else dtype
+
+    if typecode and array.array(typecode).itemsize != header["itemsize"]:
+        raise ValueError(
+            f"{path} was saved with {header['itemsize']} byte {typecode!r} values, "
+            f"this platform uses {array.array(typecode).itemsize}"
+        )
+    swap = typecode is not None and header["byteorder"] != sys.byteorder
+
+    values: MutableSequence[Any]
+    if typecode and mmap_values and storage_cls is ArrayStorage and not swap:
+        with open(path, "rb") as f:
+            # ACCESS_COPY keeps the grid writable, changes stay in memory
+            # and never reach the file
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        # memoryviews take item assignment, typeshed just doesn't call
+        # them a MutableSequence
+        values = cast(MutableSequence[Any], memoryview(mapped)[offset:].cast(typecode))
+    else:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        if typecode:
+            values = array.array(typecode)
+            values.frombytes(data)
+            if swap:
+                values.byteswap()
+        elif dtype == "char":
+            values = list(data.decode("utf-32-le"))
+        else:
+            values = pickle.loads(data)
+    if len(values) != height * width:
+        raise ValueError(
+            f"{path} should hold {height * width} values, found {len(values)}"
+        )
+    storage = storage_from_flat(
+        storage_cls, values, height, width, cell_cls=cell_cls, typecode=typecode
+    )
+    return grid_cls(
+        storage,
+        out_of_bounds_value=header["out_of_bounds_value"],
+        cell_cls=cell_cls,
+        collections_cls=_import_class(header["collection_cls"]),
+        lazy_cells=header["lazy_cells"],
+    )
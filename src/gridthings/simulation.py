@@ -0,0 +1,127 @@
+import operator
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    MutableSequence,
+    Optional,
+    Sequence,
+)
+
+from . import aggregate
+from .topology import Topology, offset_neighbors, topology
+
+# Step-by-step simulations like Conway's Game of Life or the Advent of Code
+# 2021 day 11 octopuses.  A Simulation holds two flat, row-major value
+# buffers.  Each generation, a step function reads `current` and writes
+# `next`, then the two are swapped, so no per-generation copies of the grid
+# pile up and no Cells are created.  Whatever the step function returns
+# (e.g. how many cells flashed) is streamed back to the caller.
+
+
+class Simulation:
+    """
+    The state handed to a step function by Grid.simulate.
+
+    current - this generation's values, read from these
+    next - the next generation, starts as a copy of current, write to these
+    step - how many generations have run before this one
+    """
+
+    def __init__(
+        self,
+        values: MutableSequence[Any],
+        height: int,
+        width: int,
+        neighbors: str = "all",
+        out_of_bounds_value: Any = None,
+    ) -> None:
+        self.height = height
+        self.width = width
+        self.neighbors_name = neighbors
+        self.offsets = aggregate.neighbor_offsets(neighbors)
+        self._neighbors = offset_neighbors(height, width, self.offsets)
+        self.out_of_bounds_value = out_of_bounds_value
+        self.current = values
+        # Slicing keeps the buffer type, e.g. array.array stays an array
+        self.next = values[:]
+        self.step = 0
+
+    def advance(self, step_fn: Callable[["Simulation"], Any]) -> Any:
+        "Run one generation of step_fn and swap the buffers"
+        self.next[:] = self.current
+        result = step_fn(self)
+        self.current, self.next = self.next, self.current
+        self.step += 1
+        return result
+
+    @property
+    def topology(self) -> Topology:
+        "The shared Topology for this grid's shape and neighbors"
+        return topology(self.height, self.width, self.neighbors_name)
+
+    def neighbors(self, position: int) -> Sequence[int]:
+        "Return the flat positions around a flat position that are inside the grid"
+        return self._neighbors(position)
+
+    def neighbor_counts(self, value: Any = None) -> List[int]:
+        """
+        Count each position's neighbors in the current generation that equal
+        value, or that are truthy when value is None, computed for the whole
+        grid at once.  Out-of-bounds neighbors count as out_of_bounds_value.
+        """
+        if value is None:
+            mask = [1 if v else 0 for v in self.current]
+            pad = 1 if self.out_of_bounds_value else 0
+        else:
+            mask = [1 if v == value else 0 for v in self.current]
+            pad = 1 if self.out_of_bounds_value == value else 0
+        return aggregate.neighbor_reduce(
+            mask,
+            height=self.height,
+            width=self.width,
+            offsets=self.offsets,
+            reducer=operator.add,
+            pad=pad,
+        )
+
+    def cascade(
+        self, seeds: Iterable[int], visit: Callable[[int], Iterable[int]]
+    ) -> List[int]:
+        """
+        Spread an effect through the grid with a work queue, e.g. flashes
+        that set off their neighbors.  visit(position) is called once for
+        each seed and each position it (or a later visit) returns, and
+        returns the positions that should trigger next.  A position only
+        triggers once per cascade.  Returns the triggered positions in order.
+        """
+        triggered = bytearray(self.height * self.width)
+        queue = []
+        for position in seeds:
+            if not triggered[position]:
+                triggered[position] = 1
+                queue.append(position)
+        head = 0
+        while head < len(queue):
+            for position in visit(queue[head]):
+                if not triggered[position]:
+                    triggered[position] = 1
+                    queue.append(position)
+            head += 1
+        return queue
+
+
+def run(
+    simulation: Simulation,
+    step_fn: Callable[[Simulation], Any],
+    steps: Optional[int] = None,
+    on_step: Optional[Callable[[Simulation], None]] = None,
+) -> Iterator[Any]:
+    "Yield step_fn's result for each generation, forever when steps is None"
+    while steps is None or simulation.step < steps:
+        result = simulation.advance(step_fn)
+        if on_step:
+            on_step(simulation)
+        yield result
@@ -0,0 +1,197 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .aggregate import NEIGHBOR_OFFSETS, neighbor_offsets
+from .cell import BaseCell, FastCell
+from .collection import Collection
+from .grid import Grid
+from .storage import ArrayStorage, HashStorage, Row, Storage
+
+# A SparseGrid is an unbounded plane where most cells hold a default value,
+# like the "infinite" grids in Advent of Code puzzles.  Only the other cells
+# are stored, in a HashStorage dict keyed by (y, x), so memory follows how
+# many cells are occupied instead of the area they're spread across.
+# Coordinates can be negative and there are no out-of-bounds cells, asking
+# for an empty position gives a Cell holding the default value.
+
+
+class SparseGrid(Grid):
+    # Cells are made on demand for every get and peek, FastCells are cheapest
+    cell_cls = FastCell
+    storage_cls = HashStorage
+    storage: HashStorage
+
+    def __init__(
+        self,
+        data: Union[Dict[Tuple[int, int], Any], str, List[Dict[int, Any]], None] = None,
+        default: Any = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Instantiate a SparseGrid from a {(y, x): value} dict of occupied
+        cells, or from any format Grid accepts (e.g. a string with "." for
+        empty cells and default=".").  Values equal to default aren't stored.
+        """
+        self.default = default
+        if data is None:
+            data = {}
+        if isinstance(data, dict) and all(isinstance(key, tuple) for key in data):
+            rows: Dict[int, Dict[int, Any]] = {}
+            for (y, x), value in data.items():
+                rows.setdefault(y, {})[x] = value
+            super().__init__(self._build_storage(rows.items()), **kwargs)
+        else:
+            # Anything else is one of the formats Grid parses
+            super().__init__(data, **kwargs)  # type: ignore
+
+    def _build_storage(self, rows: Iterable[Tuple[int, Row]]) -> Storage:
+        if self.value_parser:
+            rows = self._convert_rows(rows, self.value_parser)
+        return HashStorage(
+            rows,
+            cell_cls=self.cell_cls,
+            typecode=self.typecode,
+            validated=self._parser_validates(self.cell_cls),
+            default=self.default,
+        )
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} cells={len(self)} bounding_box={self.bounding_box}>"
+
+    def __len__(self) -> int:
+        "Return the number of occupied cells"
+        return len(self.storage.data)
+
+    def __iter__(self) -> Iterator[BaseCell]:
+        "Iterate through the occupied cells, row by row"
+        return self.storage.cells()
+
+    def __getitem__(self, key: Tuple[int, int]) -> BaseCell:  # type: ignore
+        "grid[y, x] is the same as grid.get(y, x), negative numbers are coordinates"
+        return self.get(*key)
+
+    @property
+    def bounding_box(self) -> Optional[Tuple[int, int, int, int]]:
+        "Return (min_y, min_x, max_y, max_x) of the occupied cells, inclusive"
+        extent = self.storage.extent
+        if not extent.size:
+            return None
+        return extent.min_y, extent.min_x, extent.max_y, extent.max_x
+
+    def get(self, y: int, x: int) -> BaseCell:
+        "Return the Cell at y, x, holding the default value if it's empty"
+        value = self.storage.data.get((y, x), self.default)
+        return self.cell_cls.construct(y=y, x=x, value=value)
+
+    def set(self, y: int, x: int, value: Any) -> None:
+        "Change the value at y, x, setting it to default empties the cell"
+        old = self.storage.data.get((y, x), self.default)
+        self.storage.set_value(y, x, value)
+        self.dirty.add((y, x))
+        for tracker in self.trackers:
+            tracker.update(self.storage, y, x, old, value)
+
+    def peek(self, y: int, x: int, y_offset: int, x_offset: int) -> BaseCell:
+        "Return the Cell offset from y, x, there's no out of bounds on a SparseGrid"
+        return self.get(y + y_offset, x + x_offset)
+
+    def _peek_offsets(
+        self, y: int, x: int, offsets: List[Tuple[int, int]], distance: int
+    ) -> Collection:
+        data = self.storage.data
+        default = self.default
+        construct = self.cell_cls.construct
+        cells: List[BaseCell] = []
+        for dy, dx in offsets:
+            ny, nx = y + dy * distance, x + dx * distance
+            cells.append(construct(y=ny, x=nx, value=data.get((ny, nx), default)))
+        return self.collection_cls(cells=cells)
+
+    def peek_linear(self, y: int, x: int, distance: int = 1) -> Collection:
+        return self._peek_offsets(y, x, NEIGHBOR_OFFSETS["linear"], distance)
+
+    def peek_diagonal(self, y: int, x: int, distance: int = 1) -> Collection:
+        return self._peek_offsets(y, x, NEIGHBOR_OFFSETS["diagonal"], distance)
+
+    def peek_all(self, y: int, x: int, distance: int = 1) -> Collection:
+        return self._peek_offsets(y, x, NEIGHBOR_OFFSETS["all"], distance)
+
+    def occupied_neighbors(self, y: int, x: int, neighbors: str = "all") -> Collection:
+        "Return only the non-empty cells around y, x"
+        data = self.storage.data
+        construct = self.cell_cls.construct
+        cells: List[BaseCell] = []
+        for dy, dx in neighbor_offsets(neighbors):
+            position = (y + dy, x + dx)
+            if position in data:
+                cells.append(construct(y=y + dy, x=x + dx, value=data[position]))
+        return self.collection_cls(cells=cells)
+
+    def _op_rays(
+        self,
+        y: int,
+        x: int,
+        steps: List[Tuple[int, int]],
+        op: Callable,
+        include_break_case: bool = False,
+    ) -> List[Collection]:
+        """
+        Walk rays like Grid._op_rays, with empty positions holding default.
+        The edge of a SparseGrid is its bounding box, past it every position
+        is empty so the rays stop there.
+        """
+        data = self.storage.data
+        default = self.default
+        construct = self.cell_cls.construct
+        box = self.bounding_box
+        value = data.get((y, x), default)
+        collections = []
+        for y_step, x_step in steps:
+            cells: List[BaseCell] = []
+            length = 0 if box is None else _steps_in_box(y, x, y_step, x_step, box)
+            for step in range(1, length + 1):
+                next_y, next_x = y + y_step * step, x + x_step * step
+                next_value = data.get((next_y, next_x), default)
+                keep_going = op(value, next_value)
+                if keep_going or include_break_case:
+                    cells.append(construct(y=next_y, x=next_x, value=next_value))
+                if not keep_going:
+                    break
+            collections.append(self.collection_cls(cells=cells))
+        return collections
+
+    def to_grid(self) -> Grid:
+        """
+        Return a dense Grid covering the bounding box, filled in with default.
+        The top left of the bounding box becomes 0, 0.
+        """
+        box = self.bounding_box
+        if box is None:
+            return Grid(ArrayStorage([]), cell_cls=self.cell_cls)
+        min_y, min_x, max_y, max_x = box
+        data = self.storage.data
+        default = self.default
+        rows = (
+            (y - min_y, [data.get((y, x), default) for x in range(min_x, max_x + 1)])
+            for y in range(min_y, max_y + 1)
+        )
+        storage = ArrayStorage(rows, cell_cls=self.cell_cls, validated=True)
+        return Grid(storage, cell_cls=self.cell_cls)
+
+
+def _steps_in_box(
+    y: int, x: int, y_step: int, x_step: int, box: Tuple[int, int, int, int]
+) -> int:
+    "Return how many steps from y, x stay inside the inclusive box"
+    min_y, min_x, max_y, max_x = box
+    steps = []
+    for position, step, low, high in (
+        (y, y_step, min_y, max_y),
+        (x, x_step, min_x, max_x),
+    ):
+        if step > 0:
+            steps.append((high - position) // step)
+        elif step < 0:
+            steps.append((position - low) // -step)
+        elif not low <= position <= high:
+            return 0
+    return max(min(steps, default=0), 0)
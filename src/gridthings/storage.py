@@ -0,0 +1,727 @@
+import array
+import mmap
+import os
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .cell import BaseCell, Cell, CellView
+
+# Storage is where a Grid keeps its values.  The Grid asks its storage
+# questions like "what is at y, x" and "is y, x inside the grid", which lets
+# us swap out how the data is laid out in memory without changing any of
+# the Grid methods built on top of it.
+#
+# DictStorage is the original layout, a dict-of-dicts of Cell objects.
+# It's flexible (sparse keys, irregular rows) but each value costs a full
+# pydantic model.  ArrayStorage keeps raw values in one contiguous buffer,
+# a list or a stdlib array.array, and only creates Cells when asked for one.
+# HashStorage keeps raw values in a dict keyed by (y, x) and skips a default
+# value, for huge mostly-empty planes (see sparse.py).
+#
+# Storages are built from an iterable of (y, row) pairs.  A row is either
+# a dict of {x: value} or a sequence of values where x is the position.
+
+Row = Union[Dict[int, Any], Sequence[Any]]
+
+
+def _row_items(row: Row) -> Iterable[Tuple[int, Any]]:
+    "Return (x, value) pairs from a dict row or a sequence row"
+    if isinstance(row, dict):
+        return row.items()
+    return enumerate(row)
+
+
+class Extent:
+    """
+    The bounding box, size, and per-row lengths and min / max x of a storage,
+    updated as positions are added so shape and is_regular are O(1).
+    """
+
+    def __init__(self) -> None:
+        self.size = 0
+        self.row_lengths: Dict[int, int] = {}
+        self.row_min_x: Dict[int, int] = {}
+        self.row_max_x: Dict[int, int] = {}
+        self.min_y = self.max_y = self.min_x = self.max_x = 0
+
+    def _grow(self, y: int, min_x: int, max_x: int) -> None:
+        "Stretch the bounding box to cover row y from min_x to max_x"
+        if not self.size:
+            self.min_y = self.max_y = y
+            self.min_x, self.max_x = min_x, max_x
+        else:
+            self.min_y, self.max_y = min(self.min_y, y), max(self.max_y, y)
+            self.min_x, self.max_x = min(self.min_x, min_x), max(self.max_x, max_x)
+
+    def set_row(self, y: int, xs: Collection[int]) -> None:
+        "Record every x position in row y, positions are never removed"
+        if not xs:
+            return
+        min_x, max_x = min(xs), max(xs)
+        self._grow(y, min_x, max_x)
+        self.size += len(xs) - self.row_lengths.get(y, 0)
+        self.row_lengths[y] = len(xs)
+        self.row_min_x[y] = min_x
+        self.row_max_x[y] = max_x
+
+    def add(self, y: int, x: int) -> None:
+        "Record one new position"
+        if y not in self.row_lengths:
+            self.set_row(y, (x,))
+            return
+        self._grow(y, x, x)
+        self.size += 1
+        self.row_lengths[y] += 1
+        self.row_min_x[y] = min(self.row_min_x[y], x)
+        self.row_max_x[y] = max(self.row_max_x[y], x)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        "Return the height and width of the bounding box"
+        if not self.size:
+            return 0, 0
+        return self.max_y - self.min_y + 1, self.max_x - self.min_x + 1
+
+    @property
+    def is_regular(self) -> bool:
+        "Return True if the positions fill the bounding box, starting from 0, 0"
+        height, width = self.shape
+        return self.size == height * width and (
+            not self.size or self.min_y == self.min_x == 0
+        )
+
+
+class Storage:
+    """
+    Base class for the containers that hold a Grid's values.
+
+    typecode is a hint for storages that keep values in a typed buffer,
+    it's ignored by storages that don't.  validated=True means the values
+    were already checked (see Grid.value_parser) and Cells can be built
+    without running pydantic validation again.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Tuple[int, Row]],
+        cell_cls: Type[BaseCell] = Cell,
+        typecode: Optional[str] = None,
+        validated: bool = False,
+    ) -> None:
+        raise NotImplementedError
+
+    def contains(self, y: int, x: int) -> bool:
+        "Return True if there is a value at the y, x position"
+        raise NotImplementedError
+
+    def get_value(self, y: int, x: int) -> Any:
+        "Return the raw value at a y, x position, raising KeyError if out of bounds"
+        raise NotImplementedError
+
+    def set_value(self, y: int, x: int, value: Any) -> None:
+        "Replace the value at a y, x position"
+        raise NotImplementedError
+
+    def get_cell(self, y: int, x: int) -> BaseCell:
+        "Return a Cell at a y, x position, raising KeyError if out of bounds"
+        raise NotImplementedError
+
+    def rows(self) -> List[int]:
+        "Return the y position of every row"
+        raise NotImplementedError
+
+    def row_keys(self, y: int) -> List[int]:
+        "Return the x position of every value in row y"
+        raise NotImplementedError
+
+    def row_length(self, y: int) -> int:
+        "Return the number of values in row y"
+        return len(self.row_keys(y))
+
+    def row_bounds(self, y: int) -> Tuple[int, int]:
+        "Return the smallest and largest x in row y"
+        keys = self.row_keys(y)
+        return min(keys), max(keys)
+
+    def view(self, y: int, x: int) -> CellView:
+        "Return a CellView at a y, x position, raising KeyError if out of bounds"
+        if not self.contains(y, x):
+            raise KeyError((y, x))
+        return CellView(self, y, x)
+
+    def row_views(self, y: int) -> List[CellView]:
+        "Return CellViews for row y"
+        return [CellView(self, y, x) for x in self.row_keys(y)]
+
+    def column_views(self, x: int) -> List[CellView]:
+        "Return CellViews for column x"
+        return [self.view(y, x) for y in self.rows()]
+
+    def views(self) -> Iterator[CellView]:
+        "Iterate through a CellView for every position, row by row"
+        for y in self.rows():
+            yield from self.row_views(y)
+
+    def row_cells(self, y: int) -> List[BaseCell]:
+        "Return the Cells in row y"
+        raise NotImplementedError
+
+    def column_cells(self, x: int) -> List[BaseCell]:
+        "Return the Cells in column x"
+        return [self.get_cell(y, x) for y in self.rows()]
+
+    def cells(self) -> Iterator[BaseCell]:
+        "Iterate through every Cell, row by row"
+        for y in self.rows():
+            yield from self.row_cells(y)
+
+    def values(self) -> List[List[Any]]:
+        "Return the raw values as a list of lists"
+        raise NotImplementedError
+
+    def flat_values(self) -> Sequence[Any]:
+        "Return every raw value in one flat sequence, row after row"
+        return [value for row in self.values() for value in row]
+
+    def to_dict(self) -> Mapping[int, Mapping[int, BaseCell]]:
+        "Return the data in the original y:x:Cell dict-of-dicts layout"
+        return {y: {cell.x: cell for cell in self.row_cells(y)} for y in self.rows()}
+
+    @property
+    def is_regular(self) -> bool:
+        "Return True if every row has the same x positions, starting from 0, 0"
+        raise NotImplementedError
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """
+        Return the height and width of the grid.  For irregular grids that's
+        the bounding box of every position, (0, 0) when there are no values.
+        """
+        raise NotImplementedError
+
+
+class DictStorage(Storage):
+    "Store a Cell object per value in a dict-of-dicts keyed by y then x"
+
+    def __init__(
+        self,
+        rows: Iterable[Tuple[int, Row]],
+        cell_cls: Type[BaseCell] = Cell,
+        typecode: Optional[str] = None,
+        validated: bool = False,
+    ) -> None:
+        self.cell_cls = cell_cls
+        self.data: Dict[int, Dict[int, BaseCell]] = {}
+        self.extent = Extent()
+        make_cell: Callable[..., BaseCell] = cell_cls
+        if validated:
+            make_cell = cell_cls.construct
+        for y, row in rows:
+            if y not in self.data:
+                self.data[y] = {}
+            for x, value in _row_items(row):
+                self.data[y][x] = make_cell(y=y, x=x, value=value)
+            self.extent.set_row(y, self.data[y].keys())
+
+    def contains(self, y: int, x: int) -> bool:
+        return y in self.data and x in self.data[y]
+
+    def get_value(self, y: int, x: int) -> Any:
+        return self.data[y][x].value
+
+    def set_value(self, y: int, x: int, value: Any) -> None:
+        if self.contains(y, x):
+            self.data[y][x].value = value
+        else:
+            self.data.setdefault(y, {})[x] = self.cell_cls(y=y, x=x, value=value)
+            self.extent.add(y, x)
+
+    def get_cell(self, y: int, x: int) -> BaseCell:
+        return self.data[y][x]
+
+    def rows(self) -> List[int]:
+        return list(self.data.keys())
+
+    def row_keys(self, y: int) -> List[int]:
+        return list(self.data[y].keys())
+
+    def row_length(self, y: int) -> int:
+        return len(self.data[y])
+
+    def row_bounds(self, y: int) -> Tuple[int, int]:
+        return self.extent.row_min_x[y], self.extent.row_max_x[y]
+
+    def row_cells(self, y: int) -> List[BaseCell]:
+        return list(self.data[y].values())
+
+    def column_cells(self, x: int) -> List[BaseCell]:
+        return [row[x] for row in self.data.values()]
+
+    def values(self) -> List[List[Any]]:
+        return [[cell.value for cell in row.values()] for row in self.data.values()]
+
+    def to_dict(self) -> Mapping[int, Mapping[int, BaseCell]]:
+        # Read-only, adding cells behind set_value's back would leave the
+        # extent stale
+        return MappingProxyType(
+            {y: MappingProxyType(row) for y, row in self.data.items()}
+        )
+
+    @property
+    def is_regular(self) -> bool:
+        return self.extent.is_regular
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.extent.shape
+
+
+class ArrayStorage(Storage):
+    """
+    Store raw values in one flat buffer, row after row.
+
+    The buffer is an array.array when a typecode is given (e.g. "q" for
+    64-bit ints), otherwise a list.  offsets[y] is where row y starts in the
+    buffer, so irregular rows are supported, but y and x must both be
+    0-based and contiguous.  Cells are created on demand by get_cell.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Tuple[int, Row]],
+        cell_cls: Type[BaseCell] = Cell,
+        typecode: Optional[str] = None,
+        validated: bool = False,
+    ) -> None:
+        self.cell_cls = cell_cls
+        self.typecode = typecode
+        self.buffer: MutableSequence[Any] = array.array(typecode) if typecode else []
+        self.offsets: List[int] = [0]
+        # Only pydantic Cell subclasses narrow what a value can be,
+        # a plain Cell or a FastCell accepts anything
+        validate = issubclass(cell_cls, Cell) and cell_cls is not Cell
+        validate = validate and not validated
+        for expected_y, (y, row) in enumerate(rows):
+            if y != expected_y:
+                raise ValueError(
+                    f"ArrayStorage requires contiguous rows, expected y={expected_y} got y={y}"
+                )
+            if isinstance(row, dict) and list(row.keys()) != list(range(len(row))):
+                raise ValueError(
+                    f"ArrayStorage requires contiguous columns, got x={list(row.keys())} in row {y}"
+                )
+            values = row.values() if isinstance(row, dict) else row
+            if validate:
+                values = [
+                    cell_cls(y=y, x=x, value=value).value
+                    for x, value in enumerate(values)
+                ]
+            start = len(self.buffer)
+            try:
+                self.buffer.extend(values)
+            except OverflowError:
+                # e.g. an int too big for "q", fall back to a list buffer
+                self.buffer = list(self.buffer[:start])
+                self.typecode = None
+                self.buffer.extend(values)
+            self.offsets.append(len(self.buffer))
+        # Rows can't change length after this, so work the shape out once
+        lengths = [self.row_length(y) for y in self.rows()]
+        self.width = max(lengths, default=0)
+        self._regular = all(length == self.width for length in lengths)
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: MutableSequence[Any],
+        height: int,
+        width: int,
+        cell_cls: Type[BaseCell] = Cell,
+        typecode: Optional[str] = None,
+    ) -> "ArrayStorage":
+        """
+        Wrap a flat, row-major buffer of height rows of width values as-is,
+        without copying or validating it (see Grid.load).  The buffer can be
+        a list, an array.array, or a writable memoryview.
+        """
+        if len(buffer) != height * width:
+            raise ValueError(
+                f"A {height}x{width} grid needs {height * width} values, got {len(buffer)}"
+            )
+        storage = cls([], cell_cls=cell_cls, typecode=typecode)
+        storage.buffer = buffer
+        storage.offsets = [y * width for y in range(height + 1)]
+        storage.width = width if height else 0
+        return storage
+
+    def _index(self, y: int, x: int) -> int:
+        "Return the position of y, x in the flat buffer"
+        if 0 <= y < len(self.offsets) - 1:
+            start = self.offsets[y]
+            if 0 <= x < self.offsets[y + 1] - start:
+                return start + x
+        raise KeyError((y, x))
+
+    def contains(self, y: int, x: int) -> bool:
+        return 0 <= y < len(self.offsets) - 1 and 0 <= x < self.row_length(y)
+
+    def row_length(self, y: int) -> int:
+        "Return the number of values in row y"
+        return self.offsets[y + 1] - self.offsets[y]
+
+    def get_value(self, y: int, x: int) -> Any:
+        return self.buffer[self._index(y, x)]
+
+    def set_value(self, y: int, x: int, value: Any) -> None:
+        self.buffer[self._index(y, x)] = value
+
+    def get_cell(self, y: int, x: int) -> BaseCell:
+        # Values were validated when the storage was built, skip re-validating
+        return self.cell_cls.construct(y=y, x=x, value=self.get_value(y, x))
+
+    def rows(self) -> List[int]:
+        return list(range(len(self.offsets) - 1))
+
+    def row_keys(self, y: int) -> List[int]:
+        if not 0 <= y < len(self.offsets) - 1:
+            raise KeyError(y)
+        return list(range(self.row_length(y)))
+
+    def row_values(self, y: int) -> List[Any]:
+        "Return the raw values in row y"
+        if not 0 <= y < len(self.offsets) - 1:
+            raise KeyError(y)
+        return list(self.buffer[self.offsets[y] : self.offsets[y + 1]])
+
+    def row_cells(self, y: int) -> List[BaseCell]:
+        construct = self.cell_cls.construct
+        return [
+            construct(y=y, x=x, value=value)
+            for x, value in enumerate(self.row_values(y))
+        ]
+
+    def values(self) -> List[List[Any]]:
+        return [self.row_values(y) for y in self.rows()]
+
+    def flat_values(self) -> Sequence[Any]:
+        # The buffer already is the flat values, no copy needed
+        return self.buffer
+
+    @property
+    def is_regular(self) -> bool:
+        return self._regular
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (len(self.offsets) - 1, self.width) if self.width else (0, 0)
+
+
+def storage_from_flat(
+    storage_cls: Type[Storage],
+    values: MutableSequence[Any],
+    height: int,
+    width: int,
+    cell_cls: Type[BaseCell] = Cell,
+    typecode: Optional[str] = None,
+) -> Storage:
+    """
+    Build a storage_cls from flat, row-major values that are already
+    validated, wrapping them as-is when storage_cls is ArrayStorage
+    """
+    if issubclass(storage_cls, ArrayStorage):
+        return storage_cls.from_buffer(
+            values, height, width, cell_cls=cell_cls, typecode=typecode
+        )
+    rows = ((y, values[y * width : (y + 1) * width]) for y in range(height))
+    return storage_cls(  # type: ignore
+        rows, cell_cls=cell_cls, typecode=typecode, validated=True
+    )
+
+
+# Marks bytes in an MmapStorage decode table that the value parser rejected
+_INVALID = object()
+
+
+class MmapStorage(Storage):
+    """
+    Read a fixed-width text file as a 2-d byte matrix through mmap.
+
+    Every line must be the same length, separated by "\\n" or "\\r\\n".
+    Nothing is parsed up front, y, x is turned into a byte offset and the
+    byte is decoded when it's read, using value_parser (e.g. int for digit
+    grids) on the single character.  The mapping is read-only and is shared
+    by the OS page cache, so many processes can open the same large file
+    cheaply.  Pickling an MmapStorage re-opens the file by path.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        cell_cls: Type[BaseCell] = Cell,
+        value_parser: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        self.path = os.fspath(path)
+        self.cell_cls = cell_cls
+        self.value_parser = value_parser
+        self._open()
+
+    def _open(self) -> None:
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap can't map an empty file, an empty bytes object works the same
+            self.mm: Union[mmap.mmap, bytes] = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+        first_break = self.mm.find(b"\n")
+        if first_break == -1:
+            self.width, newline = size, b""
+        elif first_break > 0 and self.mm[first_break - 1 : first_break] == b"\r":
+            self.width, newline = first_break - 1, b"\r\n"
+        else:
+            self.width, newline = first_break, b"\n"
+        self.stride = self.width + len(newline)
+        self.height = -(-size // self.stride) if self.stride else 0
+        # The last line may or may not end with a line break, anything
+        # else means the lines aren't all the same length
+        if self.stride and size % self.stride not in {0, self.width}:
+            raise ValueError(f"{self.path} is not a fixed-width file")
+        for y in range(self.height - 1):
+            end = y * self.stride + self.width
+            if self.mm[end : end + len(newline)] != newline:
+                raise ValueError(f"{self.path} is not a fixed-width file, see y={y}")
+        if self.height:
+            # The last line has no break after it to check above, make sure
+            # it's a full line and not a short one followed by a line break
+            start = (self.height - 1) * self.stride
+            last_line = self.mm[start : start + self.width]
+            ending = self.mm[start + self.width : size]
+            if b"\n" in last_line or ending not in {b"", newline}:
+                raise ValueError(
+                    f"{self.path} is not a fixed-width file, see y={self.height - 1}"
+                )
+        self._table = self._decode_table(self.value_parser)
+
+    @staticmethod
+    def _decode_table(parser: Optional[Callable[[Any], Any]]) -> List[Any]:
+        "Decode every possible byte once so reads are a list lookup"
+        table = []
+        for byte in range(256):
+            char = chr(byte)
+            try:
+                table.append(parser(char) if parser else char)
+            except (TypeError, ValueError):
+                table.append(_INVALID)
+        return table
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "cell_cls": self.cell_cls,
+            "value_parser": self.value_parser,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._open()
+
+    def close(self) -> None:
+        "Release the memory map"
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+
+    def _decode(self, y: int, x: int, byte: int) -> Any:
+        value = self._table[byte]
+        if value is _INVALID:
+            raise ValueError(f"Invalid value {chr(byte)!r} at y={y}, x={x}")
+        return value
+
+    def contains(self, y: int, x: int) -> bool:
+        return 0 <= y < self.height and 0 <= x < self.width
+
+    def get_value(self, y: int, x: int) -> Any:
+        if not self.contains(y, x):
+            raise KeyError((y, x))
+        return self._decode(y, x, self.mm[y * self.stride + x])
+
+    def set_value(self, y: int, x: int, value: Any) -> None:
+        raise TypeError("MmapStorage is read-only")
+
+    def get_cell(self, y: int, x: int) -> BaseCell:
+        return self.cell_cls.construct(y=y, x=x, value=self.get_value(y, x))
+
+    def rows(self) -> List[int]:
+        return list(range(self.height))
+
+    def row_keys(self, y: int) -> List[int]:
+        if not 0 <= y < self.height:
+            raise KeyError(y)
+        return list(range(self.width))
+
+    def row_length(self, y: int) -> int:
+        if not 0 <= y < self.height:
+            raise KeyError(y)
+        return self.width
+
+    def row_values(self, y: int) -> List[Any]:
+        "Return the decoded values in row y"
+        if not 0 <= y < self.height:
+            raise KeyError(y)
+        start = y * self.stride
+        return [
+            self._decode(y, x, byte)
+            for x, byte in enumerate(self.mm[start : start + self.width])
+        ]
+
+    def row_cells(self, y: int) -> List[BaseCell]:
+        construct = self.cell_cls.construct
+        return [
+            construct(y=y, x=x, value=value)
+            for x, value in enumerate(self.row_values(y))
+        ]
+
+    def values(self) -> List[List[Any]]:
+        return [self.row_values(y) for y in self.rows()]
+
+    @property
+    def is_regular(self) -> bool:
+        return True
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+
+class HashStorage(Storage):
+    """
+    Store raw values in one dict keyed by (y, x), for sparse grids where only
+    a few cells across a huge area hold anything (see SparseGrid).  Positions
+    can be negative and needn't be contiguous.  Values equal to `default`
+    aren't stored at all, and Cells are created on demand by get_cell.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Tuple[int, Row]],
+        cell_cls: Type[BaseCell] = Cell,
+        typecode: Optional[str] = None,
+        validated: bool = False,
+        default: Any = None,
+    ) -> None:
+        self.cell_cls = cell_cls
+        self.default = default
+        self.data: Dict[Tuple[int, int], Any] = {}
+        # The x positions stored in each row, so reading a row doesn't scan
+        # every stored value
+        self._row_xs: Dict[int, Set[int]] = {}
+        self._extent: Optional[Extent] = Extent()
+        self._validate = issubclass(cell_cls, Cell) and cell_cls is not Cell
+        self._validate = self._validate and not validated
+        for y, row in rows:
+            for x, value in _row_items(row):
+                self.set_value(y, x, value)
+
+    @property
+    def extent(self) -> Extent:
+        "The bounding box and row stats, rebuilt after deletes"
+        if self._extent is None:
+            self._extent = Extent()
+            for y, xs in self._row_xs.items():
+                self._extent.set_row(y, xs)
+        return self._extent
+
+    def contains(self, y: int, x: int) -> bool:
+        return (y, x) in self.data
+
+    def get_value(self, y: int, x: int) -> Any:
+        return self.data[y, x]
+
+    def set_value(self, y: int, x: int, value: Any) -> None:
+        "Store a value, or remove the position if value equals the default"
+        if value == self.default:
+            self.delete(y, x)
+            return
+        if self._validate:
+            value = self.cell_cls(y=y, x=x, value=value).value
+        if (y, x) not in self.data:
+            self._row_xs.setdefault(y, set()).add(x)
+            if self._extent is not None:
+                self._extent.add(y, x)
+        self.data[y, x] = value
+
+    def delete(self, y: int, x: int) -> None:
+        "Remove the value at y, x if there is one"
+        if (y, x) in self.data:
+            del self.data[y, x]
+            xs = self._row_xs[y]
+            xs.discard(x)
+            if not xs:
+                del self._row_xs[y]
+            # The bounding box might shrink, rebuild it when it's next needed
+            self._extent = None
+
+    def get_cell(self, y: int, x: int) -> BaseCell:
+        return self.cell_cls.construct(y=y, x=x, value=self.data[y, x])
+
+    def items(self) -> List[Tuple[Tuple[int, int], Any]]:
+        "Return ((y, x), value) for every stored value, sorted row by row"
+        return sorted(self.data.items(), key=lambda item: item[0])
+
+    def rows(self) -> List[int]:
+        return sorted(self._row_xs)
+
+    def row_keys(self, y: int) -> List[int]:
+        return sorted(self._row_xs[y])
+
+    def row_length(self, y: int) -> int:
+        return self.extent.row_lengths[y]
+
+    def row_bounds(self, y: int) -> Tuple[int, int]:
+        return self.extent.row_min_x[y], self.extent.row_max_x[y]
+
+    def row_cells(self, y: int) -> List[BaseCell]:
+        return [self.get_cell(y, x) for x in self.row_keys(y)]
+
+    def column_cells(self, x: int) -> List[BaseCell]:
+        return [self.get_cell(y, x) for (y, column), _ in self.items() if column == x]
+
+    def cells(self) -> Iterator[BaseCell]:
+        construct = self.cell_cls.construct
+        for (y, x), value in self.items():
+            yield construct(y=y, x=x, value=value)
+
+    def values(self) -> List[List[Any]]:
+        rows: Dict[int, List[Any]] = {}
+        for (y, _), value in self.items():
+            rows.setdefault(y, []).append(value)
+        return list(rows.values())
+
+    def to_dict(self) -> Dict[int, Dict[int, BaseCell]]:
+        data: Dict[int, Dict[int, BaseCell]] = {}
+        for cell in self.cells():
+            data.setdefault(cell.y, {})[cell.x] = cell
+        return data
+
+    @property
+    def is_regular(self) -> bool:
+        return self.extent.is_regular
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.extent.shape
@@ -0,0 +1,238 @@
+import array
+import collections
+import itertools
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+from .aggregate import neighbor_offsets
+
+# Which cells are next to which, worked out once per grid shape.
+#
+# Walking a grid means asking "what's around position p" over and over,
+# each time redoing the offsets and bounds checks.  A Topology answers that
+# for every cell up front and keeps the answers in CSR (compressed sparse
+# row) layout: the in-bounds neighbors of flat position p are
+# indices[indptr[p] : indptr[p + 1]], and directions holds which offset
+# each of those came from.  Topologies only depend on the shape, so
+# topology() caches them and grids of the same shape share one.
+#
+# A Topology costs memory for every neighbor of every cell, and for plain
+# in-bounds neighbors on a big grid working the positions out with index
+# arithmetic is faster than reading them back.  offset_neighbors does that,
+# and is what flood_fill, shortest_path and friends use unless they're
+# handed a Topology for wrap-around or hex neighbors.
+#
+# Besides the usual "linear", "diagonal", and "all" neighbors there are two
+# variants.  wrap=True makes the grid a torus, stepping off one edge comes
+# back on the opposite edge.  "hex" treats the grid as pointy-top hexagons
+# with every odd row shifted half a cell right ("odd-r" offset coordinates),
+# so each cell has 6 neighbors.
+
+# Offsets for hex grids by row parity, left, right, then the two above and
+# the two below
+HEX_OFFSETS: Dict[int, List[Tuple[int, int]]] = {
+    0: [(0, -1), (0, 1), (-1, -1), (-1, 0), (1, -1), (1, 0)],
+    1: [(0, -1), (0, 1), (-1, 0), (-1, 1), (1, 0), (1, 1)],
+}
+
+# Grid.flood_fill / shortest_path connectivity numbers
+CONNECTIVITY_NEIGHBORS = {4: "linear", 8: "all"}
+
+
+class Topology:
+    """
+    The in-bounds neighbors of every cell of a height x width grid, as flat
+    positions (y * width + x) in CSR layout.  Get one through topology() so
+    it's shared between grids of the same shape.
+
+    indptr - where each position's neighbors start in indices, size + 1 long
+    indices - neighbor positions, grouped by position
+    directions - for each entry in indices, which offset it came from,
+                 see offsets(y)
+    """
+
+    def __init__(
+        self,
+        height: int,
+        width: int,
+        neighbors: str = "all",
+        distance: int = 1,
+        wrap: bool = False,
+    ) -> None:
+        if neighbors == "hex":
+            if distance != 1:
+                raise ValueError("hex neighbors only support distance=1")
+            if wrap and height % 2:
+                raise ValueError("wrapping hex grids need an even height")
+        else:
+            # Raises ValueError for unknown neighbors
+            neighbor_offsets(neighbors, distance)
+        self.height = height
+        self.width = width
+        self.neighbors_name = neighbors
+        self.distance = distance
+        self.wrap = wrap
+        self.indptr = array.array("q", [0])
+        self.indices = array.array("q")
+        self.directions = array.array("B")
+        for y in range(height):
+            self._add_row(y)
+
+    def _add_row(self, y: int) -> None:
+        """
+        Add row y's neighbors.  Rather than checking every cell and offset,
+        each offset fills its in-bounds neighbors into a dense (x, direction)
+        table as one slice.  Only cells near the edges have gaps to skip
+        when the table is copied into CSR.
+        """
+        height, width = self.height, self.width
+        offsets = self.offsets(y)
+        k = len(offsets)
+        dense = [-1] * (width * k)
+        # How many neighbors each cell gains at x, and loses after x
+        changes = [0] * (width + 1)
+        # Cells from full_lo to full_hi have every neighbor, no compacting needed
+        full_lo, full_hi = 0, width
+        for direction, (dy, dx) in enumerate(offsets):
+            ny = y + dy
+            if self.wrap:
+                ny %= height
+            elif not 0 <= ny < height:
+                full_hi = 0
+                continue
+            row_start = ny * width
+            if self.wrap:
+                lo, hi = 0, width
+                shift = dx % width
+                targets: Sequence[int] = list(
+                    range(row_start + shift, row_start + width)
+                ) + list(range(row_start, row_start + shift))
+            else:
+                lo, hi = max(0, -dx), min(width, width - dx)
+                if lo >= hi:
+                    full_hi = 0
+                    continue
+                targets = range(row_start + lo + dx, row_start + hi + dx)
+            dense[lo * k + direction : hi * k : k] = targets
+            changes[lo] += 1
+            changes[hi] -= 1
+            full_lo, full_hi = max(full_lo, lo), min(full_hi, hi)
+        full_hi = max(full_lo, full_hi)
+
+        def compact(start: int, stop: int) -> None:
+            for x in range(start, stop):
+                for direction, i in enumerate(dense[x * k : (x + 1) * k]):
+                    if i >= 0:
+                        self.indices.append(i)
+                        self.directions.append(direction)
+
+        compact(0, full_lo)
+        self.indices.extend(dense[full_lo * k : full_hi * k])
+        self.directions.extend(array.array("B", range(k)) * (full_hi - full_lo))
+        compact(full_hi, width)
+        counts = itertools.accumulate(changes[:width])
+        starts = itertools.accumulate(counts, initial=self.indptr[-1])
+        next(starts)  # the initial value is already in indptr
+        self.indptr.extend(starts)
+
+    def __repr__(self):
+        return (
+            f"<Topology shape=({self.height}, {self.width}) "
+            f"neighbors={self.neighbors_name!r} distance={self.distance} wrap={self.wrap}>"
+        )
+
+    @property
+    def size(self) -> int:
+        return self.height * self.width
+
+    def offsets(self, y: int) -> List[Tuple[int, int]]:
+        "Return the (y, x) offsets used for cells in row y"
+        if self.neighbors_name == "hex":
+            return HEX_OFFSETS[y % 2]
+        return neighbor_offsets(self.neighbors_name, self.distance)
+
+    def neighbors(self, position: int) -> Sequence[int]:
+        "Return the flat positions next to a flat position"
+        return self.indices[self.indptr[position] : self.indptr[position + 1]]
+
+    def degree(self, position: int) -> int:
+        "Return how many neighbors a flat position has"
+        return self.indptr[position + 1] - self.indptr[position]
+
+
+# Topologies hold a few ints for every neighbor of every cell, so the cache
+# is bounded by the total number of cells rather than the number of
+# topologies.  The least recently used ones are dropped first, and one
+# bigger than the whole budget is built each time it's asked for.
+TOPOLOGY_CACHE_CELLS = 1 << 20
+_cache: "collections.OrderedDict[Tuple[int, int, str, int, bool], Topology]" = (
+    collections.OrderedDict()
+)
+
+
+def topology(
+    height: int,
+    width: int,
+    neighbors: str = "all",
+    distance: int = 1,
+    wrap: bool = False,
+) -> Topology:
+    "Return the shared Topology for a height x width grid"
+    key = (height, width, neighbors, distance, wrap)
+    found = _cache.get(key)
+    if found is not None:
+        _cache.move_to_end(key)
+        return found
+    found = Topology(height, width, neighbors, distance, wrap)
+    if found.size <= TOPOLOGY_CACHE_CELLS:
+        _cache[key] = found
+        while sum(cached.size for cached in _cache.values()) > TOPOLOGY_CACHE_CELLS:
+            _cache.popitem(last=False)
+    return found
+
+
+def offset_neighbors(
+    height: int, width: int, offsets: Sequence[Tuple[int, int]]
+) -> Callable[[int], List[int]]:
+    """
+    Return a function giving the in-bounds flat positions at each offset
+    from a flat position, worked out with index arithmetic
+    """
+    steps = [dy * width + dx for dy, dx in offsets]
+    reach = max((max(abs(dy), abs(dx)) for dy, dx in offsets), default=0)
+
+    def neighbors(position: int) -> List[int]:
+        y, x = divmod(position, width)
+        if reach <= y < height - reach and reach <= x < width - reach:
+            # Far enough from every edge that no offset leaves the grid
+            return [position + step for step in steps]
+        return [
+            (y + dy) * width + x + dx
+            for dy, dx in offsets
+            if 0 <= y + dy < height and 0 <= x + dx < width
+        ]
+
+    return neighbors
+
+
+def connectivity_neighbors(
+    height: int, width: int, connectivity: Union[int, Topology]
+) -> Callable[[int], Sequence[int]]:
+    """
+    Return a function giving the flat positions next to a flat position,
+    for 4 (linear) or 8 (linear and diagonal) connectivity, or from a
+    Topology after checking that it fits the grid
+    """
+    if isinstance(connectivity, Topology):
+        if (connectivity.height, connectivity.width) != (height, width):
+            raise ValueError(
+                f"Topology shape ({connectivity.height}, {connectivity.width}) "
+                f"doesn't match the grid's ({height}, {width})"
+            )
+        return connectivity.neighbors
+    if connectivity not in CONNECTIVITY_NEIGHBORS:
+        raise ValueError(
+            f"connectivity must be 4, 8, or a Topology, got {connectivity!r}"
+        )
+    return offset_neighbors(
+        height, width, neighbor_offsets(CONNECTIVITY_NEIGHBORS[connectivity])
+    )
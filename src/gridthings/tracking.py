@@ -0,0 +1,148 @@
+import collections
+from typing import Any, Counter, Dict, List, Optional, Tuple
+
+from .storage import Storage
+
+# Aggregates that follow a grid as it changes, for boards that get one move
+# at a time (tic-tac-toe, connect four, bingo).  Register one with
+# grid.track(tracker) and every grid.set(y, x, value) hands the tracker the
+# old and new value, as do writes through the grid's CellViews and each step
+# of grid.simulate.  Sums, counts, and winners are patched in O(1) or O(k)
+# instead of rescanning rows, columns, and diagonals after every move.
+
+# The directions a k-in-a-row line can run, each also walked backwards
+LINE_DIRECTIONS: List[Tuple[int, int]] = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+class Tracker:
+    """
+    Base class for incrementally maintained aggregates, see Grid.track.
+
+    reset() computes the aggregate from scratch and update() patches it
+    after a single cell changes from old to new.
+    """
+
+    def reset(self, storage: Storage) -> None:
+        raise NotImplementedError
+
+    def update(self, storage: Storage, y: int, x: int, old: Any, new: Any) -> None:
+        raise NotImplementedError
+
+
+class LineSums(Tracker):
+    """
+    Sums of every row, column, and diagonal.  rows and columns are keyed by
+    y and x, diagonals (going down-right) by y - x, and anti_diagonals
+    (going down-left) by y + x.
+    """
+
+    def __init__(self) -> None:
+        self.rows: Dict[int, Any] = {}
+        self.columns: Dict[int, Any] = {}
+        self.diagonals: Dict[int, Any] = {}
+        self.anti_diagonals: Dict[int, Any] = {}
+
+    def _sums(self, y: int, x: int) -> List[Tuple[Dict[int, Any], int]]:
+        return [
+            (self.rows, y),
+            (self.columns, x),
+            (self.diagonals, y - x),
+            (self.anti_diagonals, y + x),
+        ]
+
+    def reset(self, storage: Storage) -> None:
+        self.rows, self.columns, self.diagonals, self.anti_diagonals = {}, {}, {}, {}
+        for y in storage.rows():
+            for x in storage.row_keys(y):
+                value = storage.get_value(y, x)
+                for sums, key in self._sums(y, x):
+                    sums[key] = sums.get(key, 0) + value
+
+    def update(self, storage: Storage, y: int, x: int, old: Any, new: Any) -> None:
+        for sums, key in self._sums(y, x):
+            sums[key] = sums[key] - old + new
+
+
+class ValueCounts(Tracker):
+    "How many cells hold each value, in a Counter at .counts"
+
+    def __init__(self) -> None:
+        self.counts: Counter[Any] = collections.Counter()
+
+    def reset(self, storage: Storage) -> None:
+        self.counts = collections.Counter(
+            storage.get_value(y, x) for y in storage.rows() for x in storage.row_keys(y)
+        )
+
+    def update(self, storage: Storage, y: int, x: int, old: Any, new: Any) -> None:
+        self.counts[old] -= 1
+        if not self.counts[old]:
+            del self.counts[old]
+        self.counts[new] += 1
+
+
+class KInARow(Tracker):
+    """
+    Detect k equal values in a row, column, or diagonal.  After each set(),
+    only the lines through the changed cell are checked, walking at most k - 1
+    cells each way.  Cells equal to empty never count towards a line.
+
+    line - the (y, x) positions of the most recent winning line, or None
+           once a change breaks it
+    winners - every value that has completed a line, in order
+    """
+
+    def __init__(self, k: int, empty: Any = None) -> None:
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.k = k
+        self.empty = empty
+        self.line: Optional[List[Tuple[int, int]]] = None
+        self.winners: List[Any] = []
+
+    def check(
+        self, storage: Storage, y: int, x: int
+    ) -> Optional[List[Tuple[int, int]]]:
+        "Return k positions in a row through y, x that share its value, or None"
+        value = storage.get_value(y, x)
+        if value == self.empty:
+            return None
+        for y_step, x_step in LINE_DIRECTIONS:
+            line = [(y, x)]
+            for sign in (-1, 1):
+                line_y, line_x = y + sign * y_step, x + sign * x_step
+                while (
+                    len(line) < self.k
+                    and storage.contains(line_y, line_x)
+                    and storage.get_value(line_y, line_x) == value
+                ):
+                    line.append((line_y, line_x))
+                    line_y += sign * y_step
+                    line_x += sign * x_step
+            if len(line) == self.k:
+                return sorted(line)
+        return None
+
+    def _record(self, storage: Storage, y: int, x: int) -> None:
+        line = self.check(storage, y, x)
+        if line:
+            self.line = line
+            value = storage.get_value(y, x)
+            if value not in self.winners:
+                self.winners.append(value)
+
+    def reset(self, storage: Storage) -> None:
+        self.line = None
+        self.winners = []
+        for y in storage.rows():
+            for x in storage.row_keys(y):
+                self._record(storage, y, x)
+
+    def update(self, storage: Storage, y: int, x: int, old: Any, new: Any) -> None:
+        if self.line and (y, x) in self.line:
+            first = storage.get_value(*self.line[0])
+            if first == self.empty or any(
+                storage.get_value(*position) != first for position in self.line[1:]
+            ):
+                self.line = None
+        self._record(storage, y, x)
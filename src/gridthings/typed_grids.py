@@ -1,8 +1,38 @@
+from typing import Any
+
+from pydantic import constr
+
 from .cell import Cell
 from .grid import Grid
 
-# Typed Grids are Grids that apply data validation while reading the data
-# thanks to subclassed Cell pydantic models
+# Typed Grids are Grids that apply data validation while reading the data.
+# The Cell pydantic models describe the type, and each Grid has a
+# value_parser that converts a whole row of raw values in one pass
+# (e.g. map(int, row)) so that reading a large grid doesn't mean
+# validating one pydantic model per value.  Errors point at the y/x
+# position of the bad value.
+
+
+def parse_bool(value: Any) -> bool:
+    "Convert a value to bool using the same rules as pydantic"
+    if value is True or value is False:
+        return value
+    if isinstance(value, str):
+        value = value.lower()
+        if value in {"1", "on", "t", "true", "y", "yes"}:
+            return True
+        if value in {"0", "off", "f", "false", "n", "no"}:
+            return False
+    elif value in {0, 1}:
+        return bool(value)
+    raise ValueError(f"{value!r} is not a valid boolean")
+
+
+def parse_char(value: Any) -> str:
+    "Check a value is a single character string"
+    if not isinstance(value, str) or len(value) != 1:
+        raise ValueError(f"{value!r} is not a single character")
+    return value
 
 
 class IntCell(Cell):
@@ -11,3 +41,36 @@ class IntCell(Cell):
 
 class IntGrid(Grid):
     cell_cls = IntCell
+    value_parser = int
+    # 64-bit signed ints when using ArrayStorage
+    typecode = "q"
+
+
+class FloatCell(Cell):
+    value: float
+
+
+class FloatGrid(Grid):
+    cell_cls = FloatCell
+    value_parser = float
+    typecode = "d"
+
+
+class BoolCell(Cell):
+    value: bool
+
+
+class BoolGrid(Grid):
+    cell_cls = BoolCell
+    # staticmethod so self.value_parser isn't bound, mypy 0.910 can't see
+    # through it to the Callable that Grid.value_parser expects
+    value_parser = staticmethod(parse_bool)  # type: ignore
+
+
+class CharCell(Cell):
+    value: constr(min_length=1, max_length=1)  # type: ignore
+
+
+class CharGrid(Grid):
+    cell_cls = CharCell
+    value_parser = staticmethod(parse_char)  # type: ignore
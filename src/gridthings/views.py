@@ -0,0 +1,183 @@
+import collections
+from typing import TYPE_CHECKING, Any, Iterator, List, Tuple, Union
+
+from .cell import BaseCell
+from .collection import Collection
+
+if TYPE_CHECKING:
+    from .grid import Grid
+
+# Views are windows onto a Grid that don't copy anything.  grid.get_row(0)
+# builds a new list of Cells, while grid.row_view(0) only remembers where
+# the row starts and which way it goes, and fetches each Cell from storage
+# as it's iterated.  Views see changes made to the grid after they're made.
+#
+# A LineView is a row, column, or diagonal: a start position, a step, and a
+# length.  A SubGridView is a rectangle of the grid, like grid[1:3, 0:2],
+# made of a range of rows and a range of columns.  Slicing either one makes
+# another view.  Call .to_collection() or .to_grid() to copy.
+
+
+class LineView(collections.abc.Sequence):
+    "Cells from y, x stepping by y_step, x_step for `length` cells, read lazily"
+
+    def __init__(
+        self, grid: "Grid", y: int, x: int, y_step: int, x_step: int, length: int
+    ) -> None:
+        self.grid = grid
+        self.y = y
+        self.x = x
+        self.y_step = y_step
+        self.x_step = x_step
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __repr__(self):
+        return (
+            f"<LineView y={self.y} x={self.x} y_step={self.y_step} "
+            f"x_step={self.x_step} length={self.length}>"
+        )
+
+    def position(self, index: int) -> Tuple[int, int]:
+        "Return the y, x of the index'th cell in the line"
+        return self.y + index * self.y_step, self.x + index * self.x_step
+
+    # mypy says: Signature of "__getitem__" incompatible with supertype "Sequence" ??
+    def __getitem__(self, index: Union[int, slice]):  # type: ignore
+        if isinstance(index, slice):
+            indexes = range(self.length)[index]
+            y, x = self.position(indexes.start)
+            return LineView(
+                self.grid,
+                y,
+                x,
+                self.y_step * indexes.step,
+                self.x_step * indexes.step,
+                len(indexes),
+            )
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("LineView index out of range")
+        return self.grid.get(*self.position(index))
+
+    def __iter__(self) -> Iterator[BaseCell]:
+        get = self.grid.get
+        y, x = self.y, self.x
+        for _ in range(self.length):
+            yield get(y, x)
+            y += self.y_step
+            x += self.x_step
+
+    def __eq__(self, other):
+        if isinstance(other, (LineView, Collection)):
+            return list(self) == list(other)
+        return False
+
+    # mypy says: Signature of "index" incompatible with supertype "Sequence" ??
+    def index(self, value: Any) -> int:  # type: ignore
+        for i, cell in enumerate(self):
+            if cell.value == value:
+                return i
+        raise ValueError(f"{value} is not in line")
+
+    def values(self) -> List[Any]:
+        get_value = self.grid.storage.get_value
+        return [get_value(*self.position(i)) for i in range(self.length)]
+
+    def extends_out_of_bounds(self) -> bool:
+        "Views only cover cells inside the grid"
+        return False
+
+    def to_collection(self) -> Collection:
+        "Copy the cells into the grid's collection_cls"
+        return self.grid.collection_cls(cells=list(self))
+
+
+class SubGridView:
+    """
+    A rectangle of a grid covering ys rows and xs columns (both range objects),
+    e.g. grid[1:3, ::2].  view[y, x] and slicing are relative to the view.
+    Iterating gives the cells row by row.
+    """
+
+    def __init__(self, grid: "Grid", ys: range, xs: range) -> None:
+        self.grid = grid
+        self.ys = ys
+        self.xs = xs
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.ys), len(self.xs)
+
+    def __len__(self) -> int:
+        return len(self.ys) * len(self.xs)
+
+    def __repr__(self):
+        return f"<SubGridView ys={self.ys} xs={self.xs}>"
+
+    def __getitem__(self, key: Tuple[Union[int, slice], Union[int, slice]]):
+        return index_view(self.grid, self.ys, self.xs, key)
+
+    def __iter__(self) -> Iterator[BaseCell]:
+        get = self.grid.get
+        for y in self.ys:
+            for x in self.xs:
+                yield get(y, x)
+
+    def get_row(self, y: int) -> LineView:
+        return self[y, :]
+
+    def get_column(self, x: int) -> LineView:
+        return self[:, x]
+
+    def rows(self) -> Iterator[LineView]:
+        for y in range(len(self.ys)):
+            yield self.get_row(y)
+
+    def values(self) -> List[List[Any]]:
+        get_value = self.grid.storage.get_value
+        return [[get_value(y, x) for x in self.xs] for y in self.ys]
+
+    def to_collection(self) -> Collection:
+        "Copy the cells, row by row, into the grid's collection_cls"
+        return self.grid.collection_cls(cells=list(self))
+
+    def to_grid(self) -> "Grid":
+        "Copy the values into a new Grid of the same type, positioned from 0, 0"
+        grid = self.grid
+        return type(grid)(
+            self.values(),
+            out_of_bounds_value=grid.out_of_bounds_value,
+            cell_cls=grid.cell_cls,
+            collections_cls=grid.collection_cls,
+            storage_cls=grid.storage_cls,
+            lazy_cells=grid.lazy_cells,
+        )
+
+
+def index_view(
+    grid: "Grid",
+    ys: range,
+    xs: range,
+    key: Tuple[Union[int, slice], Union[int, slice]],
+):
+    """
+    Index a ys by xs window of grid with a (y, x) key.  Two ints give a Cell,
+    an int and a slice give a row or column LineView, two slices a SubGridView.
+    """
+    if not isinstance(key, tuple) or len(key) != 2:
+        raise TypeError("grid views are indexed with [y, x]")
+    y_key, x_key = key
+    if isinstance(y_key, slice):
+        rows = ys[y_key]
+        if isinstance(x_key, slice):
+            return SubGridView(grid, rows, xs[x_key])
+        return LineView(grid, rows.start, xs[x_key], rows.step, 0, len(rows))
+    if isinstance(x_key, slice):
+        columns = xs[x_key]
+        row = ys[y_key]
+        return LineView(grid, row, columns.start, 0, columns.step, len(columns))
+    return grid.get(ys[y_key], xs[x_key])
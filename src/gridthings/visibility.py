@@ -0,0 +1,87 @@
+import operator
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .aggregate import grid_lines
+
+# Line-of-sight for every cell at once, the bulk version of grid.op().
+#
+# grid.op(y, x, y_step, x_step, op) walks away from a cell while
+# op(cell.value, next.value) is True.  For a cell, the walk is stopped by
+# the nearest cell in that direction that "blocks" it, one where op fails.
+# Scanning a line towards the cells that are looking back along it, that's a
+# "nearest previous blocker" problem, which a monotonic stack solves in
+# one pass: a cell that doesn't block the current cell can never be the
+# nearest blocker for anything after it, so it's popped off for good.
+#
+# That holds for the ordering operators and operator.eq.  operator.ne is
+# handled by remembering where each value was last seen, and any other
+# callable falls back to walking each cell's line directly.
+
+# The (y_step, x_step) of each direction, matching grid.op_left and friends
+SIGHT_DIRECTIONS: Dict[str, Tuple[int, int]] = {
+    "left": (0, -1),
+    "right": (0, 1),
+    "up": (-1, 0),
+    "down": (1, 0),
+}
+
+_STACK_OPS = {operator.gt, operator.ge, operator.lt, operator.le, operator.eq}
+
+
+def nearest_blockers(
+    values: Sequence[Any], op: Callable[[Any, Any], bool]
+) -> List[int]:
+    """
+    For each position i, return the nearest j < i where op(values[i], values[j])
+    is False, or -1 if op holds for everything before i.
+    """
+    blockers = [-1] * len(values)
+    if op in _STACK_OPS:
+        stack: List[int] = []
+        for i, value in enumerate(values):
+            while stack and op(value, values[stack[-1]]):
+                stack.pop()
+            if stack:
+                blockers[i] = stack[-1]
+            stack.append(i)
+    elif op is operator.ne:
+        last_seen: Dict[Any, int] = {}
+        for i, value in enumerate(values):
+            blockers[i] = last_seen.get(value, -1)
+            last_seen[value] = i
+    else:
+        for i, value in enumerate(values):
+            j = i - 1
+            while j >= 0 and op(value, values[j]):
+                j -= 1
+            blockers[i] = j
+    return blockers
+
+
+def line_of_sight(
+    values: Sequence[Any],
+    height: int,
+    width: int,
+    y_step: int,
+    x_step: int,
+    op: Callable[[Any, Any], bool],
+    include_break_case: bool = False,
+) -> Tuple[List[int], List[bool]]:
+    """
+    Return (distances, edges) for every flat position looking in the
+    y_step, x_step direction.  distances[i] is len(grid.op(...)) for that
+    cell and edges[i] is True when the walk reached the edge of the grid.
+    """
+    distances = [0] * (height * width)
+    edges = [False] * (height * width)
+    # Scan against the direction of sight, so that the cells a position can
+    # see are the ones that came before it in the scan
+    for line in grid_lines(height, width, -y_step, -x_step):
+        line_values = [values[i] for i in line]
+        for i, blocker in enumerate(nearest_blockers(line_values, op)):
+            if blocker == -1:
+                distances[line[i]] = i
+                edges[line[i]] = True
+            else:
+                distances[line[i]] = i - blocker - (0 if include_break_case else 1)
+    return distances, edges
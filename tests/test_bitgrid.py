@@ -0,0 +1,95 @@
+import pytest
+
+from gridthings import BitGrid, Grid, MultiBitGrid
+
+# Test BitGrid ------------------------------------------------------------------
+
+
+@pytest.fixture
+def board() -> BitGrid:
+    grid = Grid(
+        """
+        X.O
+        .XO
+        O.X
+        """
+    )
+    return BitGrid.from_grid(grid, "X")
+
+
+def test_bit_grid_from_grid(board: BitGrid):
+    assert board.get(0, 0) is True
+    assert board.get(0, 1) is False
+    assert board.count() == 3
+    assert list(board.positions()) == [(0, 0), (1, 1), (2, 2)]
+    assert repr(board) == "<BitGrid shape=(3, 3) 100|010|001>"
+    assert board.to_grid(on="X", off=".").values() == [
+        ["X", ".", "."],
+        [".", "X", "."],
+        [".", ".", "X"],
+    ]
+    truthy = BitGrid.from_grid(Grid([[0, 1], [2, 0]]))
+    assert list(truthy.positions()) == [(0, 1), (1, 0)]
+    with pytest.raises(KeyError):
+        board.get(3, 0)
+
+
+def test_bit_grid_set(board: BitGrid):
+    board.set(0, 2)
+    board.set(0, 0, False)
+    assert list(board.positions()) == [(0, 2), (1, 1), (2, 2)]
+
+
+def test_bit_grid_shift(board: BitGrid):
+    # Each cell sees the cell to its right, nothing wraps to the next row
+    assert list(board.shift(0, 1).positions()) == [(1, 0), (2, 1)]
+    assert list(board.shift(-1, -1).positions()) == [(1, 1), (2, 2)]
+    assert board.peek(1, 1, 1, 1) is True
+    assert board.peek(2, 2, 0, 1) is False
+
+
+def test_bit_grid_neighbors(board: BitGrid):
+    assert board.neighbor_counts() == [1, 2, 1, 2, 2, 2, 1, 2, 1]
+    assert board.neighbor_counts("linear") == [0, 2, 0, 2, 0, 2, 0, 2, 0]
+    assert list(board.neighbors_equal(1).positions()) == [
+        (0, 0),
+        (0, 2),
+        (2, 0),
+        (2, 2),
+    ]
+    assert board.neighbors_equal(9).count() == 0
+
+
+def test_bit_grid_life():
+    blinker = BitGrid.from_grid(Grid("...\n###\n..."), "#")
+    step = blinker.neighbors_equal(3) | (blinker & blinker.neighbors_equal(2))
+    assert list(step.positions()) == [(0, 1), (1, 1), (2, 1)]
+    assert (step ^ blinker).count() == 4
+    assert (~step).count() == 6
+    with pytest.raises(ValueError):
+        step & BitGrid(2, 2)
+
+
+def test_bit_grid_k_in_a_row(board: BitGrid):
+    assert board.find_k_in_a_row(3) == [[(0, 0), (1, 1), (2, 2)]]
+    assert board.find_k_in_a_row(2) == [[(0, 0), (1, 1)], [(1, 1), (2, 2)]]
+
+
+# Test MultiBitGrid -------------------------------------------------------------
+
+
+def test_multi_bit_grid():
+    grid = Grid("X.O\n.XO\nO.X")
+    board = MultiBitGrid.from_grid(grid)
+    assert board.to_grid().values() == grid.values()
+    assert board.get(0, 2) == "O"
+    assert board.count(".") == 3
+    assert board["X"] == BitGrid.from_grid(grid, "X")
+    assert board.peek(0, 0, 0, -1) is None
+    assert board.peek(0, 0, 1, 1) == "X"
+    assert board.neighbor_counts("O", "linear")[:3] == [0, 1, 1]
+    assert board.find_k_in_a_row(3) == [("X", [(0, 0), (1, 1), (2, 2)])]
+    board.set(2, 2, "O")
+    assert board.find_k_in_a_row(3) == [("O", [(0, 2), (1, 2), (2, 2)])]
+    assert board.find_k_in_a_row(3, "X") == []
+    assert board.count("X") == 2
@@ -1,6 +1,15 @@
 import pytest
 
-from gridthings import Cell
+from gridthings import (
+    ArrayStorage,
+    Cell,
+    CellView,
+    FastCell,
+    FastOutOfBoundsCell,
+    Grid,
+    IntCell,
+    IntGrid,
+)
 
 # Cells represent individual data points in a grid
 # They implement a variety of mathematical dunder methods
@@ -119,3 +128,57 @@ def test_subclass_cell():
 
     cell2 = MyCell(y=0, x=0, value=1, extra_arg=False)
     assert cell2.dict() == {"y": 0, "x": 0, "value": 1, "extra_arg": False}
+
+
+def test_cell_view():
+    grid = IntGrid("12\n34", storage_cls=ArrayStorage)
+    view = CellView(grid.storage, y=1, x=0)
+    assert view.value == 3
+    assert view == Cell(y=1, x=0, value=3)
+    assert view + 1 == 4
+    assert view > Cell(y=0, x=0, value=1)
+    assert repr(view) == "CellView(y=1, x=0, value=3)"
+
+    # views read through to storage, so they see updates
+    view.value = 9
+    assert grid.storage.get_value(1, 0) == 9
+    assert view == 9
+
+    cell = view.materialize()
+    assert isinstance(cell, IntCell)
+    assert cell == view
+
+
+def test_fast_cell():
+    c1 = FastCell(y=0, x=0, value=2)
+    c2 = FastCell(y=0, x=1, value=4)
+    assert c1 == FastCell(y=0, x=0, value=2)
+    assert c1 != c2
+    assert c1 == 2
+    assert c1 < c2
+    assert c1 + c2 == 6
+    assert 10 - c2 == 6
+    assert c1 * c2 * 2 == 16
+    assert c2 / c1 == 2
+    assert c1 ** 3 == 8
+    assert sorted([c2, c1]) == [c1, c2]
+    assert c1.dict() == {"y": 0, "x": 0, "value": 2}
+    assert repr(c1) == "FastCell(y=0, x=0, value=2)"
+    # FastCells and pydantic Cells with the same fields compare equal
+    assert c1 == Cell(y=0, x=0, value=2)
+    assert Cell(y=0, x=0, value=2) == c1
+    with pytest.raises(AttributeError):
+        c1.extra = True
+
+
+def test_fast_cell_grid():
+    grid = Grid("abc\ndef", cell_cls=FastCell)
+    assert isinstance(grid.get(0, 0), FastCell)
+    assert grid.get_row(1).values() == ["d", "e", "f"]
+    out_of_bounds_cell = grid.peek_left(0, 0)
+    assert isinstance(out_of_bounds_cell, FastOutOfBoundsCell)
+    assert grid.line(y=0, x=1, x_step=1, distance=3).extends_out_of_bounds()
+
+    grid = Grid("abc\ndef", cell_cls=FastCell, storage_cls=ArrayStorage)
+    assert isinstance(grid.get(1, 1), FastCell)
+    assert grid.get(1, 1) == FastCell(y=1, x=1, value="e")
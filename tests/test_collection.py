@@ -3,7 +3,7 @@ import statistics
 
 import pytest
 
-from gridthings import Cell, Collection
+from gridthings import Cell, Collection, ColumnarCollection
 
 # Collections are custom collections.abc.Sequence that are aware
 # the "value" in each cell is what is important when comparing
@@ -133,3 +133,30 @@ def test_collection_repr():
     collection = Collection(cells=[Cell(y=0, x=0, value=1)])
     print(collection)
     assert repr(collection) == "<Collection [[Cell(y=0, x=0, value=1)]]>"
+
+
+def test_columnar_collection():
+    cells = [
+        Cell(y=0, x=0, value=2),
+        Cell(y=0, x=1, value=8),
+        Cell(y=1, x=1, value=4),
+        Cell(y=1, x=2, value=8),
+    ]
+    collection = ColumnarCollection(cells=cells)
+    assert collection.ys == [0, 0, 1, 1]
+    assert collection.xs == [0, 1, 1, 2]
+    assert collection.values() == [2, 8, 4, 8]
+    assert collection.sum() == sum(collection) == 22
+    assert collection.prod() == math.prod(collection) == 512
+    assert collection.min() == 2
+    assert collection.max() == 8
+    assert collection.mean() == 5.5
+    assert collection.argmin() == Cell(y=0, x=0, value=2)
+    assert collection.argmax() == Cell(y=0, x=1, value=8)
+    assert collection == Collection(cells=cells)
+    assert repr(collection[:1]) == "[Cell(y=0, x=0, value=2)]"
+    combined = collection + ColumnarCollection(cells=[Cell(y=2, x=0, value=1)])
+    assert isinstance(combined, ColumnarCollection)
+    assert combined.min() == 1
+    with pytest.raises(ValueError):
+        ColumnarCollection(cells=[]).mean()
@@ -1,6 +1,40 @@
+import array
+import collections
+import io
+import operator
+
+import pydantic
 import pytest
 
-from gridthings import Cell, Collection, Grid, IntGrid, OutOfBoundsCell
+import gridthings.grid
+import gridthings.topology
+from gridthings import (
+    ArrayStorage,
+    BoolCell,
+    BoolGrid,
+    Cell,
+    CellView,
+    CharCell,
+    CharGrid,
+    Collection,
+    ColumnarCollection,
+    Component,
+    DictStorage,
+    FastCell,
+    FloatCell,
+    FloatGrid,
+    Grid,
+    IntCell,
+    IntGrid,
+    KInARow,
+    LineSums,
+    LineView,
+    OutOfBoundsCell,
+    SparseGrid,
+    SubGridView,
+    Topology,
+    ValueCounts,
+)
 
 # Test grid initilization ------------------------------------------------------
 # Imagine seed data generated from something like
@@ -159,6 +193,64 @@ def test_flatten():
     )
 
 
+def test_columnar_collection_hook():
+    grid = IntGrid("123\n456", collections_cls=ColumnarCollection)
+    assert isinstance(grid.flatten(), ColumnarCollection)
+    assert grid.get_row(1).sum() == 15
+    assert grid.get_column(2).argmax() == IntCell(y=1, x=2, value=6)
+    assert grid.line(0, 0, 1, 1, distance=2).values() == [1, 5]
+    assert grid.flatten().mean() == 3.5
+
+
+def test_grid_indexing():
+    grid = Grid("abcd\nefgh\nijkl")
+    assert grid[1, 2] == Cell(y=1, x=2, value="g")
+    assert grid[-1, -1].value == "l"
+    row = grid[1, :]
+    assert isinstance(row, LineView)
+    assert row == grid.get_row(1)
+    assert grid[:, 1].values() == ["b", "f", "j"]
+    assert grid[:, -1][::-1].values() == ["l", "h", "d"]
+    with pytest.raises(IndexError):
+        grid[3, 0]
+    with pytest.raises(TypeError):
+        grid[0]
+
+
+def test_line_views():
+    grid = Grid("abcd\nefgh\nijkl")
+    row = grid.row_view(0)
+    assert len(row) == 4
+    assert row[1:3].values() == ["b", "c"]
+    assert row.index("c") == 2
+    assert grid.column_view(3) == grid.get_column(3)
+    assert grid.diagonal_view(0, 0).values() == ["a", "f", "k"]
+    assert grid.diagonal_view(0, 3, x_step=-1).values() == ["d", "g", "j"]
+    assert grid.diagonal_view(0, 1).to_collection() == grid.line(0, 1, 1, 1, 3)
+    # Views read from the grid, they don't copy it
+    grid.set(0, 1, "z")
+    assert row.values()[1] == "z"
+    assert row[1].value == "z"
+
+
+def test_sub_grid_view():
+    grid = IntGrid("1234\n5678\n9012")
+    view = grid[1:, 1:3]
+    assert isinstance(view, SubGridView)
+    assert view.shape == (2, 2)
+    assert view.values() == [[6, 7], [0, 1]]
+    assert [cell.value for cell in view] == [6, 7, 0, 1]
+    assert view[1, 0] == IntCell(y=2, x=1, value=0)
+    assert view[:, 1].values() == [7, 1]
+    assert view[0:1, :].values() == [[6, 7]]
+    assert [r.values() for r in view.rows()] == [[6, 7], [0, 1]]
+    assert grid[::2, ::3].values() == [[1, 4], [9, 2]]
+    copy = view.to_grid()
+    assert isinstance(copy, IntGrid)
+    assert copy.values() == [[6, 7], [0, 1]]
+    assert sum(view.to_collection()) == 14
+
+
 def test_values():
     data = "abc\ndef\nxyz"
     grid = Grid(data)
@@ -175,11 +267,98 @@ def test_shape():
     assert Grid("abc").shape == (1, 3)
 
 
+def test_shape_irregular_and_sparse():
+    grid = Grid("ab\ncde")
+    assert grid.shape == (2, 3)
+    assert [grid.storage.row_length(y) for y in (0, 1)] == [2, 3]
+    # Rows with gaps or that don't start at 0 aren't regular
+    sparse = Grid([{0: "a", 3: "b"}, {}, {0: "c", 3: "d"}])
+    assert sparse.shape == (3, 4)
+    assert not sparse.is_regular
+    assert sparse.storage.row_bounds(2) == (0, 3)
+    assert sparse.storage.row_length(2) == 2
+
+
+def test_shape_tracks_new_cells():
+    grid = Grid("ab\nc")
+    assert not grid.is_regular
+    grid.storage.set_value(1, 1, "d")
+    assert grid.is_regular
+    assert repr(grid) == "<Grid shape=(2, 2)>"
+    grid.storage.set_value(-1, 0, "e")
+    assert grid.shape == (3, 2)
+    assert not grid.is_regular
+
+
+def test_data_is_read_only():
+    grid = Grid("ab\nc")
+    assert grid.data[1][0] == Cell(y=1, x=0, value="c")
+    # Adding cells behind the storage's back would leave shape stale
+    with pytest.raises(TypeError):
+        grid.data[1][1] = Cell(y=1, x=1, value="d")
+    with pytest.raises(TypeError):
+        grid.data[2] = {}
+    assert grid.shape == (2, 2)
+    grid.set(1, 0, "d")
+    assert grid.data[1][0].value == "d"
+
+
 def test_repr():
     assert repr(Grid("abc\ndef")) == "<Grid shape=(2, 3)>"
     assert repr(Grid("abc\nd")) == "<Grid shape=(irregular)>"
 
 
+# Sparse grids ----------------------------------------------------------------
+def test_sparse_grid():
+    grid = SparseGrid({(-5, 3): "#", (1_000_000, -2_000_000): "#"}, default=".")
+    assert len(grid) == 2
+    assert grid.bounding_box == (-5, -2_000_000, 1_000_000, 3)
+    assert repr(grid) == "<SparseGrid cells=2 bounding_box=(-5, -2000000, 1000000, 3)>"
+    assert grid.get(-5, 3) == FastCell(y=-5, x=3, value="#")
+    assert grid[0, 0].value == "."
+    assert [(cell.y, cell.x) for cell in grid] == [(-5, 3), (1_000_000, -2_000_000)]
+    assert not grid.is_regular
+
+
+def test_sparse_grid_from_text():
+    grid = SparseGrid("#..\n.#.\n..#", default=".")
+    assert len(grid) == 3
+    assert grid.peek_left(0, 0).value == "."
+    assert grid.peek_all(1, 1).values() == [".", ".", ".", ".", "#", ".", ".", "#"]
+    assert [(c.y, c.x) for c in grid.occupied_neighbors(1, 1)] == [(0, 0), (2, 2)]
+    assert grid.to_grid().values() == [
+        ["#", ".", "."],
+        [".", "#", "."],
+        [".", ".", "#"],
+    ]
+
+
+def test_sparse_grid_set():
+    grid = SparseGrid(default=0)
+    assert grid.bounding_box is None
+    assert grid.to_grid().shape == (0, 0)
+    grid.set(-2, -2, 5)
+    grid.set(1, 3, 7)
+    assert grid.bounding_box == (-2, -2, 1, 3)
+    grid.set(-2, -2, 0)
+    assert len(grid) == 1
+    assert grid.bounding_box == (1, 3, 1, 3)
+    assert grid.dirty == {(-2, -2), (1, 3)}
+    assert grid.to_grid().values() == [[7]]
+
+
+def test_sparse_grid_op_walks_empty_cells():
+    grid = SparseGrid({(0, 0): 1, (0, 3): 5, (2, 0): 2}, default=0)
+    ray = grid.op_right(0, 0, operator.gt, include_break_case=True)
+    assert ray.values() == [0, 0, 5]
+    assert grid.op_down(0, 0, operator.gt).values() == [0]
+    # Rays stop at the bounding box instead of walking empty cells forever
+    assert [(c.y, c.x) for c in grid.op_right(1, 1, operator.ge)] == [(1, 2), (1, 3)]
+    assert grid.op_down(-3, 0, operator.le).values() == [0, 0, 1, 0, 2]
+    assert [len(ray) for ray in grid.op_linear(5, 5, operator.le)] == [0, 0, 0, 0]
+    assert SparseGrid(default=0).op_left(0, 0, operator.le).values() == []
+
+
 # Typed grids -----------------------------------------------------------------
 def test_intgrid():
     data = "123\n456"
@@ -204,6 +383,66 @@ def test_intgrid_invalid():
         IntGrid(data)
 
 
+def test_typed_grid_error_position():
+    with pytest.raises(ValueError, match="'x' at y=1, x=2"):
+        IntGrid("123\n45x")
+    with pytest.raises(ValueError, match="at y=0, x=1"):
+        IntGrid([{0: 1, 1: "b"}])
+    with pytest.raises(ValueError, match="at y=1, x=0"):
+        BoolGrid("10\n21")
+
+
+def test_typed_grids():
+    grid = FloatGrid("1.5,2\n3,4.25", sep=",")
+    assert isinstance(grid.get(0, 0), FloatCell)
+    assert grid.values() == [[1.5, 2.0], [3.0, 4.25]]
+
+    grid = BoolGrid("10\n01")
+    assert isinstance(grid.get(0, 0), BoolCell)
+    assert grid.values() == [[True, False], [False, True]]
+    assert BoolGrid("true,no", sep=",").values() == [[True, False]]
+
+    grid = CharGrid("ab\ncd")
+    assert isinstance(grid.get(0, 0), CharCell)
+    assert grid.values() == [["a", "b"], ["c", "d"]]
+    with pytest.raises(ValueError, match="at y=0, x=0"):
+        CharGrid("ab,c", sep=",")
+
+
+def test_typed_grid_custom_cell_validators():
+    class SmallCell(IntCell):
+        @pydantic.validator("value")
+        def small(cls, value):
+            if value > 5:
+                raise ValueError("too big")
+            return value
+
+    class SmallGrid(IntGrid):
+        cell_cls = SmallCell
+
+    # value_parser only checks for ints, SmallCell's validator still runs
+    for storage_cls in [DictStorage, ArrayStorage]:
+        with pytest.raises(pydantic.ValidationError):
+            SmallGrid("19", storage_cls=storage_cls)
+        with pytest.raises(pydantic.ValidationError):
+            IntGrid("19", cell_cls=SmallCell, storage_cls=storage_cls)
+    assert SmallGrid("12").values() == [[1, 2]]
+    assert isinstance(SmallGrid("12").get(0, 0), SmallCell)
+
+
+def test_typed_grids_array_storage():
+    grid = IntGrid("123\n456", storage_cls=ArrayStorage)
+    assert grid.storage.typecode == "q"
+    grid = FloatGrid("1\n2", storage_cls=ArrayStorage)
+    assert grid.storage.typecode == "d"
+    assert grid.values() == [[1.0], [2.0]]
+    # values too large for the typed buffer fall back to a list
+    big = 2 ** 70
+    grid = IntGrid([{0: 1, 1: big}], storage_cls=ArrayStorage)
+    assert grid.storage.typecode is None
+    assert grid.values() == [[1, big]]
+
+
 def test_get():
     grid = IntGrid("123\n456")
     assert grid.get(0, 0) == Cell(y=0, x=0, value=1)
@@ -351,3 +590,678 @@ def test_default_out_of_bounds_value():
     out_of_bounds_cell = grid.peek_left(y=0, x=0)
     assert isinstance(out_of_bounds_cell, OutOfBoundsCell)
     assert out_of_bounds_cell == OutOfBoundsCell(y=0, x=-1, value="default")
+
+
+def test_lazy_cells():
+    grid = Grid("abc\ndef\nxyz", storage_cls=ArrayStorage, lazy_cells=True)
+    cell = grid.get(1, 1)
+    assert isinstance(cell, CellView)
+    assert cell == Cell(y=1, x=1, value="e")
+    assert all(isinstance(c, CellView) for c in grid.flatten())
+    assert grid.get_row(0).values() == ["a", "b", "c"]
+    assert grid.get_column(2).values() == ["c", "f", "z"]
+    assert grid.line(y=0, x=0, y_step=1, x_step=1, distance=3).values() == [
+        "a",
+        "e",
+        "z",
+    ]
+    # edges still give OutOfBoundsCells
+    assert isinstance(grid.peek_up(0, 0), OutOfBoundsCell)
+    assert isinstance(grid.peek_down(0, 0), CellView)
+    with pytest.raises(KeyError):
+        grid.get(3, 0)
+
+
+# Streaming -------------------------------------------------------------------
+def test_from_stream():
+    text = """
+    a,b,c
+
+    d,e,f
+    """
+    expected = Grid(text, sep=",").values()
+    assert Grid.from_stream(io.StringIO(text), sep=",").values() == expected
+    assert expected == [["a", "b", "c"], [""], ["d", "e", "f"]]
+
+    text = "ab\ncd\n"
+    assert (
+        Grid.from_stream(io.StringIO(text), strip_whitespace=False).values()
+        == Grid(text, strip_whitespace=False).values()
+    )
+
+
+def test_from_stream_chunked(monkeypatch):
+    # Separators other than "\n" are read in chunks, use tiny chunks
+    # so lines and separators get split across chunk boundaries
+    monkeypatch.setattr(gridthings.grid, "STREAM_CHUNK_SIZE", 2)
+    text = "  abc||def||xyz  "
+    grid = Grid.from_stream(io.StringIO(text), line_sep="||")
+    assert grid.values() == Grid(text, line_sep="||").values()
+    assert grid.values() == [["a", "b", "c"], ["d", "e", "f"], ["x", "y", "z"]]
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / "grid.txt"
+    path.write_text("123\n456\n")
+    grid = IntGrid.from_file(path, storage_cls=ArrayStorage)
+    assert isinstance(grid, IntGrid)
+    assert isinstance(grid.storage, ArrayStorage)
+    assert grid.values() == [[1, 2, 3], [4, 5, 6]]
+    with pytest.raises(ValueError, match="at y=1, x=1"):
+        path.write_text("123\n4x6\n")
+        IntGrid.from_file(path)
+
+
+# Whole-grid operations ---------------------------------------------------------
+def test_neighbor_reduce():
+    grid = IntGrid("123\n456\n789")
+    assert grid.neighbor_reduce("sum").values() == [
+        [6, 9, 8],
+        [13, 20, 17],
+        [12, 21, 14],
+    ]
+    assert grid.neighbor_reduce("min", "diagonal").values() == [
+        [5, 4, 5],
+        [2, 1, 2],
+        [5, 4, 5],
+    ]
+    assert grid.neighbor_reduce("max", "all").get(1, 1).value == 9
+    assert grid.neighbor_reduce("sum", distance=2).values() == [
+        [10, 8, 10],
+        [6, None, 4],
+        [10, 2, 10],
+    ]
+
+
+def test_neighbor_reduce_matches_peek():
+    grid = IntGrid("2199943210\n3987894921\n9856789892", out_of_bounds_value=9)
+    lowest = grid.neighbor_reduce("min")
+    for cell in grid.flatten():
+        expected = min(grid.peek_linear(cell.y, cell.x)).value
+        assert lowest.get(cell.y, cell.x).value == expected
+
+
+def test_neighbor_reduce_count():
+    grid = Grid("#.#\n.#.\n#..", storage_cls=ArrayStorage)
+    assert grid.neighbor_reduce("count", "all", value="#").values() == [
+        [1, 3, 1],
+        [3, 3, 2],
+        [1, 2, 1],
+    ]
+    grid = Grid("#.\n..", out_of_bounds_value="#")
+    assert grid.neighbor_reduce("count", value="#").values() == [[2, 3], [3, 2]]
+
+
+def test_neighbor_reduce_invalid():
+    grid = IntGrid("12\n34")
+    with pytest.raises(ValueError):
+        grid.neighbor_reduce("median")
+    with pytest.raises(ValueError):
+        grid.neighbor_reduce("sum", neighbors="hex")
+    with pytest.raises(ValueError):
+        IntGrid("12\n3").neighbor_reduce("sum")
+
+
+def test_window_reduce():
+    grid = IntGrid(
+        """
+        1 2 3 4
+        5 9 1 2
+        0 3 9 1
+        4 2 1 9
+        """,
+        sep=" ",
+    )
+    value, collection = grid.window_reduce(length=3)
+    assert value == 729
+    assert collection == grid.line(y=1, x=1, y_step=1, x_step=1, distance=3)
+
+    value, collection = grid.window_reduce("right", length=2, reducer="sum")
+    assert value == 14
+    assert collection.values() == [5, 9]
+
+    value, collection = grid.window_reduce("down", 4, reducer="max", best="min")
+    assert value == 5
+    assert [(cell.y, cell.x) for cell in collection] == [(0, 0), (1, 0), (2, 0), (3, 0)]
+
+    # products with zeros in the window
+    value, collection = grid.window_reduce("down_left", 3, best="min")
+    assert value == 0
+
+
+def test_window_reduce_floats():
+    # Rolling sums and products would round, or turn inf / inf into nan
+    grid = FloatGrid("1e16,1,1", sep=",")
+    value, collection = grid.window_reduce("right", 2, reducer="sum", best="min")
+    assert value == 2
+    assert collection.values() == [1, 1]
+    grid = FloatGrid("0.1,0.2,0.3,0.4,0.5", sep=",")
+    assert grid.window_reduce("right", 2, reducer="sum")[0] == 0.9
+    grid = FloatGrid("inf,2,3,0.5", sep=",")
+    value, collection = grid.window_reduce("right", 2, best="min")
+    assert value == 1.5
+    assert collection.values() == [3, 0.5]
+
+
+def test_window_reduce_out_of_bounds():
+    grid = IntGrid("12\n34", out_of_bounds_value=10)
+    assert grid.window_reduce(length=3) is None
+    value, collection = grid.window_reduce(length=3, include_out_of_bounds=True)
+    assert value == 400
+    assert collection.values() == [4, 10, 10]
+    assert collection.extends_out_of_bounds()
+    with pytest.raises(ValueError):
+        grid.window_reduce("up")
+    with pytest.raises(ValueError):
+        grid.window_reduce(reducer="mean")
+
+
+def test_line_of_sight():
+    grid = IntGrid("30373\n25512\n65332\n33549\n35390")
+    distances, edges = grid.line_of_sight(operator.gt, include_break_case=True)
+    for cell in grid.flatten():
+        collections = grid.op_linear(
+            cell.y, cell.x, operator.gt, include_break_case=True
+        )
+        for direction, collection in zip(["left", "right", "up", "down"], collections):
+            assert distances[direction].get(cell.y, cell.x).value == len(collection)
+    assert [distances[d].get(3, 2).value for d in ["left", "right", "up", "down"]] == [
+        2,
+        2,
+        2,
+        1,
+    ]
+    # trees visible from outside the grid
+    visible = sum(
+        any(edges[d].get(cell.y, cell.x).value for d in edges)
+        for cell in grid.flatten()
+    )
+    assert visible == 21
+    assert edges["left"].get(1, 1).value
+    assert not edges["right"].get(1, 1).value
+
+
+def test_line_of_sight_other_ops():
+    grid = IntGrid("1121\n2222")
+    distances, edges = grid.line_of_sight(operator.eq)
+    assert distances["right"].values() == [[1, 0, 0, 0], [3, 2, 1, 0]]
+    distances, edges = grid.line_of_sight(operator.ne)
+    assert distances["left"].values() == [[0, 0, 2, 1], [0, 0, 0, 0]]
+    distances, edges = grid.line_of_sight(lambda a, b: a + b < 4)
+    assert distances["down"].values() == [[1, 1, 0, 1], [0, 0, 0, 0]]
+
+
+def test_op():
+    grid = IntGrid("30373\n25512\n65332\n33549\n35390")
+    assert grid.op_right(y=3, x=2, op=operator.gt) == Collection(
+        cells=[Cell(y=3, x=3, value=4)]
+    )
+    assert grid.op_right(
+        y=3, x=2, op=operator.gt, include_break_case=True
+    ) == Collection(cells=[Cell(y=3, x=3, value=4), Cell(y=3, x=4, value=9)])
+    assert grid.op_left(y=3, x=2, op=operator.gt).values() == [3, 3]
+    assert grid.op_up(y=3, x=2, op=operator.gt).values() == [3]
+    assert grid.op_down(y=3, x=2, op=operator.gt).values() == [3]
+    assert grid.op(y=0, x=0, y_step=1, x_step=1, op=operator.ne).values() == [5]
+
+
+def test_op_diagonal():
+    grid = IntGrid("30373\n25512\n65332\n33549\n35390")
+    collections = grid.op_diagonal(y=2, x=2, op=operator.gt)
+    assert [c.values() for c in collections] == [[], [1], [], []]
+    collections = grid.op_diagonal(y=2, x=2, op=operator.gt, include_break_case=True)
+    assert [c.values() for c in collections] == [[5], [1, 3], [3], [4]]
+    assert [(c.y, c.x) for c in collections[1]] == [(1, 3), (0, 4)]
+
+    collections = grid.op_all(y=2, x=2, op=operator.gt)
+    assert len(collections) == 8
+    assert collections[:4] == grid.op_linear(y=2, x=2, op=operator.gt)
+    assert collections[4:] == grid.op_diagonal(y=2, x=2, op=operator.gt)
+
+
+# Regions ---------------------------------------------------------------------
+BASINS = """
+2199943210
+3987894921
+9856789892
+8767896789
+9899965678
+"""
+
+
+def test_find_k_in_a_row():
+    grid = Grid(
+        """
+        X..O
+        XOO.
+        XOX.
+        OX.X
+        """
+    )
+    lines = grid.find_k_in_a_row(3, "X")
+    assert [[(cell.y, cell.x) for cell in line] for line in lines] == [
+        [(0, 0), (1, 0), (2, 0)]
+    ]
+    lines = grid.find_k_in_a_row(3)
+    assert [line.values() for line in lines] == [["X"] * 3, ["O"] * 3, ["O"] * 3]
+    assert [(line[0].y, line[0].x) for line in lines] == [(0, 0), (0, 3), (1, 2)]
+    assert grid.find_k_in_a_row(5) == []
+    assert len(grid.find_k_in_a_row(1, ".")) == 5
+
+
+def test_line_index_is_shared():
+    index = Grid("abc\ndef").line_index(2)
+    assert Grid("123\n456").line_index(2) is index
+    assert index.lines == (
+        (0, 1),
+        (1, 2),
+        (3, 4),
+        (4, 5),
+        (0, 3),
+        (1, 4),
+        (2, 5),
+        (0, 4),
+        (1, 5),
+        (1, 3),
+        (2, 4),
+    )
+
+
+def test_flood_fill():
+    grid = IntGrid(BASINS)
+    basin = grid.flood_fill(0, 0, predicate=lambda value: value != 9)
+    assert sorted((cell.y, cell.x) for cell in basin) == [(0, 0), (0, 1), (1, 0)]
+    assert basin[0] == grid.get(0, 0)
+    assert len(grid.flood_fill(2, 2, predicate=lambda value: value != 9)) == 14
+    assert len(grid.flood_fill(0, 2, predicate=lambda value: value != 9)) == 0
+    # without a predicate, fill cells with the same value
+    assert [(c.y, c.x) for c in grid.flood_fill(0, 2)] == [(0, 2), (0, 3), (0, 4)]
+    # every 9 in the grid touches another one at least diagonally
+    assert len(grid.flood_fill(0, 2, connectivity=8)) == 14
+    with pytest.raises(KeyError):
+        grid.flood_fill(5, 0)
+    with pytest.raises(ValueError):
+        grid.flood_fill(0, 0, connectivity=6)
+
+
+def test_label_components():
+    grid = IntGrid(BASINS, storage_cls=ArrayStorage)
+    labels, components = grid.label_components(lambda value: value != 9)
+    assert labels.values() == [
+        [1, 1, 0, 0, 0, 2, 2, 2, 2, 2],
+        [1, 0, 3, 3, 3, 0, 2, 0, 2, 2],
+        [0, 3, 3, 3, 3, 3, 0, 4, 0, 2],
+        [3, 3, 3, 3, 3, 0, 4, 4, 4, 0],
+        [0, 3, 0, 0, 0, 4, 4, 4, 4, 4],
+    ]
+    assert [c.size for c in components] == [3, 9, 14, 9]
+    assert components[2].bounding_box == (1, 0, 4, 5)
+    assert components[1] == Component(
+        label=2, size=9, min_y=0, min_x=5, max_y=2, max_x=9
+    )
+
+
+def test_label_components_by_value():
+    grid = Grid("aab\nbab\nbba")
+    labels, components = grid.label_components()
+    assert labels.values() == [[1, 1, 2], [3, 1, 2], [3, 3, 4]]
+    labels, components = grid.label_components(connectivity=8)
+    assert labels.values() == [[1, 1, 2], [2, 1, 2], [2, 2, 1]]
+    assert [c.size for c in components] == [4, 5]
+
+
+# Paths -----------------------------------------------------------------------
+CHITONS = """
+1163751742
+1381373672
+2136511328
+3694931569
+7463417111
+1319128137
+1359912421
+3125421639
+1293138521
+2311944581
+"""
+
+
+def test_shortest_path():
+    grid = IntGrid(CHITONS, storage_cls=ArrayStorage)
+    total, path = grid.shortest_path((0, 0), (9, 9))
+    assert total == 40
+    assert (path[0].y, path[0].x) == (0, 0)
+    assert (path[-1].y, path[-1].x) == (9, 9)
+    assert sum(path[1:]) == 40
+    total, _ = grid.shortest_path((0, 0), (9, 9), heuristic="manhattan")
+    assert total == 40
+    total, _ = grid.shortest_path((0, 0), (9, 9), heuristic=lambda y, x: 0)
+    assert total == 40
+
+
+def test_shortest_path_walls():
+    grid = Grid(
+        """
+        S.#.
+        .##.
+        ...G
+        """
+    )
+    walls = lambda value: None if value == "#" else 1  # noqa: E731
+    total, path = grid.shortest_path((0, 0), (2, 3), cost=walls)
+    assert total == 5
+    assert [(cell.y, cell.x) for cell in path][:3] == [(0, 0), (1, 0), (2, 0)]
+    total, path = grid.shortest_path((0, 0), (2, 3), cost=walls, connectivity=8)
+    assert total == 4
+    assert grid.shortest_path((0, 0), (0, 3), cost=walls) is not None
+    closed = Grid("S#.\n##.\n..G")
+    assert closed.shortest_path((0, 0), (2, 2), cost=walls) is None
+    with pytest.raises(KeyError):
+        grid.shortest_path((0, 0), (5, 5), cost=walls)
+    # Text values aren't costs without a cost function
+    with pytest.raises(TypeError, match="pass cost"):
+        grid.shortest_path((0, 0), (2, 3))
+
+
+def test_distance_grid():
+    grid = Grid("a..\n.#.\n..b")
+    walls = lambda value: None if value == "#" else 1  # noqa: E731
+    distances = grid.distance_grid([(0, 0), (2, 2)], cost=walls)
+    assert distances.values() == [[0, 1, 2], [1, None, 1], [2, 1, 0]]
+    grid = IntGrid("19\n11")
+    assert grid.distance_grid([(0, 0)]).values() == [[0, 9], [1, 2]]
+    with pytest.raises(ValueError):
+        IntGrid("11").distance_grid([(0, 0)], cost=lambda value: -1)
+
+
+OCTOPUSES = """
+5483143223
+2745854711
+5264556173
+6141336146
+6357385478
+4167524645
+2176841721
+6882881134
+4846848554
+5283751526
+"""
+
+
+def octopus_step(sim):
+    "Advent of Code 2021 day 11, returns how many octopuses flashed"
+    energy = sim.next
+    for position in range(len(energy)):
+        energy[position] += 1
+
+    def flash(position):
+        for neighbor in sim.neighbors(position):
+            energy[neighbor] += 1
+            if energy[neighbor] > 9:
+                yield neighbor
+
+    seeds = [position for position, value in enumerate(energy) if value > 9]
+    flashed = sim.cascade(seeds, flash)
+    for position in flashed:
+        energy[position] = 0
+    return len(flashed)
+
+
+def test_simulate_cascade():
+    grid = IntGrid(OCTOPUSES)
+    assert sum(grid.simulate(octopus_step, steps=100)) == 1656
+    assert grid.values()[0] == [0, 3, 9, 7, 6, 6, 6, 8, 6, 6]
+    grid = IntGrid(OCTOPUSES, storage_cls=ArrayStorage)
+    for step, flashes in enumerate(grid.simulate(octopus_step), start=1):
+        if flashes == 100:
+            break
+    assert step == 195
+    assert grid.get(0, 0).value == 0
+
+
+def test_simulate_neighbor_counts():
+    def life(sim):
+        counts = sim.neighbor_counts("#")
+        sim.next[:] = [
+            "#" if count == 3 or (value == "#" and count == 2) else "."
+            for value, count in zip(sim.current, counts)
+        ]
+        return sim.next.count("#")
+
+    grid = Grid(".#.\n.#.\n.#.")
+    assert list(grid.simulate(life, steps=1)) == [3]
+    assert grid.values() == [[".", ".", "."], ["#", "#", "#"], [".", ".", "."]]
+    assert list(grid.simulate(life, steps=2)) == [3, 3]
+    assert grid.values() == [[".", ".", "."], ["#", "#", "#"], [".", ".", "."]]
+
+
+def test_set_tracks_dirty_cells():
+    grid = IntGrid("12\n34")
+    grid.set(1, 0, 7)
+    assert grid.get(1, 0).value == 7
+    assert grid.dirty == {(1, 0)}
+    with pytest.raises(KeyError):
+        grid.set(2, 0, 1)
+
+
+def test_set_updates_trackers():
+    grid = IntGrid("123\n456\n789")
+    sums = grid.track(LineSums())
+    counts = grid.track(ValueCounts())
+    assert sums.rows == {0: 6, 1: 15, 2: 24}
+    assert sums.diagonals[0] == 15
+    assert sums.anti_diagonals[2] == 15
+    grid.set(1, 1, 1)
+    assert sums.rows == {0: 6, 1: 11, 2: 24}
+    assert sums.columns == {0: 12, 1: 11, 2: 18}
+    assert sums.diagonals[0] == 11
+    assert sums.anti_diagonals[2] == 11
+    assert counts.counts[1] == 2
+    assert 5 not in counts.counts
+
+
+def test_k_in_a_row():
+    grid = Grid(
+        """
+        .X..
+        .O..
+        .O..
+        XO..
+        """
+    )
+    connect = grid.track(KInARow(3, empty="."))
+    assert connect.winners == ["O"]
+    assert connect.line == [(1, 1), (2, 1), (3, 1)]
+    grid.set(1, 2, "X")
+    assert connect.line == [(1, 1), (2, 1), (3, 1)]
+    grid.set(2, 1, "X")
+    assert connect.line == [(1, 2), (2, 1), (3, 0)]
+    assert connect.winners == ["O", "X"]
+    assert connect.check(grid.storage, 1, 1) is None
+    grid.set(2, 1, ".")
+    assert connect.check(grid.storage, 1, 2) is None
+
+
+def test_trackers_follow_cell_views_and_simulate():
+    for storage_cls in [DictStorage, ArrayStorage]:
+        grid = Grid("XX.\n...\n...", storage_cls=storage_cls, lazy_cells=True)
+        counts = grid.track(ValueCounts())
+        connect = grid.track(KInARow(3, empty="."))
+        grid.get(0, 2).value = "X"
+        assert connect.line == [(0, 0), (0, 1), (0, 2)]
+        assert counts.counts == {"X": 3, ".": 6}
+        assert grid.pop_dirty() == {(0, 2)}
+        assert grid.dirty == set()
+        # Writes through a row's views are tracked too, breaking the line
+        grid.get_row(0)[1].value = "O"
+        assert connect.line is None
+        assert counts.counts == {"X": 2, "O": 1, ".": 6}
+
+        def fill_column(sim):
+            for position in range(0, len(sim.next), sim.width):
+                sim.next[position] = "O"
+
+        next(grid.simulate(fill_column))
+        assert grid.values()[0] == ["O", "O", "X"]
+        assert connect.winners == ["X", "O"]
+        assert connect.line == [(0, 0), (1, 0), (2, 0)]
+        assert counts.counts == {"X": 1, "O": 4, ".": 4}
+        assert grid.dirty == {(0, 1), (0, 0), (1, 0), (2, 0)}
+        sums = IntGrid("12\n34", storage_cls=storage_cls)
+        line_sums = sums.track(LineSums())
+        next(sums.simulate(lambda sim: sim.next.__setitem__(0, 5)))
+        assert line_sums.rows == {0: 7, 1: 7}
+        assert line_sums.columns == {0: 8, 1: 6}
+
+
+def neighbor_sum(grid, y, x):
+    return sum(cell.value for cell in grid.peek_all(y, x))
+
+
+def test_parallel_map():
+    text = "\n".join(
+        "".join(str((y * 7 + x * 3) % 10) for x in range(9)) for y in range(8)
+    )
+    grid = IntGrid(text, storage_cls=ArrayStorage, out_of_bounds_value=0)
+    expected = grid.neighbor_reduce("sum", neighbors="all")
+    # Workers read the typed buffer out of shared memory
+    result = grid.parallel_map(neighbor_sum, workers=2)
+    assert result.values() == expected.values()
+    # In-process, with tiles that don't line up with the grid's edges
+    result = IntGrid(text, out_of_bounds_value=0).parallel_map(
+        neighbor_sum, tiles=(3, 4), workers=1
+    )
+    assert result.values() == expected.values()
+    with pytest.raises(ValueError):
+        grid.parallel_map(neighbor_sum, tiles=0, workers=1)
+
+
+def test_save_load(tmp_path):
+    path = tmp_path / "grid.bin"
+    grid = IntGrid("123\n456", out_of_bounds_value=0)
+    grid.save(path)
+    loaded = Grid.load(path)
+    assert isinstance(loaded, IntGrid)
+    assert isinstance(loaded.storage, ArrayStorage)
+    assert loaded.storage.buffer == array.array("q", [1, 2, 3, 4, 5, 6])
+    assert loaded.get(1, 2) == IntCell(y=1, x=2, value=6)
+    assert loaded.out_of_bounds_value == 0
+    loaded = IntGrid.load(path, storage_cls=DictStorage)
+    assert loaded.data == grid.data
+
+    for grid in [Grid("ab\ncd"), Grid([{0: (1, 2), 1: None}]), CharGrid("xy")]:
+        grid.save(path)
+        loaded = Grid.load(path)
+        assert type(loaded) is type(grid)
+        assert loaded.values() == grid.values()
+
+    with pytest.raises(TypeError):
+        IntGrid.load(path)
+    path.write_bytes(b"123\n456\n")
+    with pytest.raises(ValueError):
+        Grid.load(path)
+
+
+def test_load_mmap(tmp_path):
+    path = tmp_path / "grid.bin"
+    IntGrid("123\n456").save(path)
+    grid = IntGrid.load(path, mmap=True)
+    assert isinstance(grid.storage.buffer, memoryview)
+    assert grid.neighbor_reduce("sum").values() == [[6, 9, 8], [6, 12, 8]]
+    grid.set(0, 0, 9)
+    assert grid.values() == [[9, 2, 3], [4, 5, 6]]
+    # Changes aren't written back to the file
+    assert IntGrid.load(path).values() == [[1, 2, 3], [4, 5, 6]]
+
+
+def test_topology():
+    grid = Grid("abc\ndef\nghi")
+    topology = grid.topology("linear")
+    assert topology is Grid("123\n456\n789").topology("linear")
+    assert list(topology.indptr) == [0, 2, 5, 7, 10, 14, 17, 19, 22, 24]
+    assert list(topology.neighbors(4)) == [3, 5, 1, 7]
+    assert grid.neighbors(0, 0).values() == ["b", "d", "e"]
+    assert grid.neighbors(0, 0, "linear", wrap=True).values() == ["c", "b", "g", "d"]
+    # odd rows are shifted half a cell right
+    assert grid.neighbors(1, 1, "hex").values() == ["d", "f", "b", "c", "h", "i"]
+    assert grid.neighbors(0, 1, "hex").values() == ["a", "c", "d", "e"]
+    with pytest.raises(ValueError):
+        grid.topology("hex", distance=2)
+    with pytest.raises(KeyError):
+        grid.neighbors(3, 0)
+
+
+def test_topology_cache_is_bounded_by_cells(monkeypatch):
+    monkeypatch.setattr(gridthings.topology, "TOPOLOGY_CACHE_CELLS", 20)
+    monkeypatch.setattr(gridthings.topology, "_cache", collections.OrderedDict())
+    small, other = Grid("ab\ncd"), Grid("abc\ndef\nghi")
+    assert small.topology() is small.topology()
+    assert other.topology() is other.topology()
+    # Adding 9 more cells to 4 + 9 + 4 goes over the budget, the least
+    # recently used topologies are dropped until it fits
+    assert small.topology("linear") is small.topology("linear")
+    assert other.topology("linear") is other.topology("linear")
+    assert list(gridthings.topology._cache) == [
+        (2, 2, "linear", 1, False),
+        (3, 3, "linear", 1, False),
+    ]
+    # Too big to cache at all
+    big = Grid("\n".join(["abcde"] * 5))
+    assert big.topology() is not big.topology()
+    # Plain neighbors don't build a Topology
+    monkeypatch.setattr(gridthings.topology, "_cache", collections.OrderedDict())
+    assert big.neighbors(2, 2, "linear").values() == ["b", "d", "c", "c"]
+    big.flood_fill(0, 0)
+    assert not gridthings.topology._cache
+
+
+def test_topology_connectivity():
+    grid = IntGrid(
+        """
+        191
+        999
+        191
+        """
+    )
+    wrap = grid.topology("linear", wrap=True)
+    assert isinstance(wrap, Topology)
+    corners = grid.flood_fill(0, 0, lambda value: value == 1, connectivity=wrap)
+    assert len(corners) == 4
+    total, path = grid.shortest_path((0, 0), (2, 2), connectivity=wrap)
+    assert total == 2
+    assert grid.distance_grid([(0, 0)], connectivity=wrap).get(2, 0).value == 1
+    with pytest.raises(ValueError):
+        grid.flood_fill(0, 0, connectivity=Grid("ab").topology())
+
+
+def test_whole_grid_operations_empty():
+    grid = Grid("")
+    assert grid.neighbor_reduce().shape == (0, 0)
+    labels, components = grid.label_components()
+    assert labels.shape == (0, 0)
+    assert components == []
+    assert grid.distance_grid([]).shape == (0, 0)
+    distances, edges = grid.line_of_sight(operator.gt)
+    assert {g.shape for g in distances.values()} == {(0, 0)}
+    assert {g.shape for g in edges.values()} == {(0, 0)}
+
+
+def test_simulate_checks_and_updates_every_step(tmp_path):
+    def count_up(sim):
+        for position, value in enumerate(sim.current):
+            sim.next[position] = value + 1
+
+    # Bad grids are rejected when simulate is called, not on the first step
+    with pytest.raises(ValueError):
+        IntGrid([{0: 1, 1: 2}, {0: 3}]).simulate(count_up)
+    path = tmp_path / "grid.txt"
+    path.write_text("12\n34")
+    with pytest.raises(TypeError):
+        Grid.from_mmap(path).simulate(count_up)
+
+    for storage_cls in [DictStorage, ArrayStorage]:
+        grid = IntGrid("12\n34", storage_cls=storage_cls)
+        steps = grid.simulate(count_up)
+        next(steps)
+        assert grid.values() == [[2, 3], [4, 5]]
+        next(steps)
+        assert grid.values() == [[3, 4], [5, 6]]
@@ -0,0 +1,89 @@
+import pydantic
+import pytest
+
+from gridthings import ArrayStorage, BoolGrid, DictStorage, Grid, IntCell, IntGrid
+
+np = pytest.importorskip("numpy")
+
+# NumPy and pandas are optional, these tests only run when they're installed
+
+
+class PositiveCell(IntCell):
+    @pydantic.validator("value")
+    def positive(cls, value):
+        if value < 1:
+            raise ValueError("not positive")
+        return value
+
+
+def test_from_numpy():
+    grid = IntGrid.from_numpy(np.arange(6, dtype="int32").reshape(2, 3))
+    assert isinstance(grid.storage, ArrayStorage)
+    assert grid.storage.buffer.typecode == "q"
+    assert grid.get(1, 2) == IntCell(y=1, x=2, value=5)
+    grid = Grid.from_numpy(np.array([[1.5, 2.5]]), out_of_bounds_value=0)
+    assert grid.storage.buffer.typecode == "d"
+    assert grid.peek_left(0, 0).value == 0
+    # Values that aren't already the right dtype go through value_parser
+    assert IntGrid.from_numpy(np.array([["1", "2"]])).values() == [[1, 2]]
+    with pytest.raises(ValueError, match="at y=1, x=0"):
+        IntGrid.from_numpy(np.array([["1"], ["x"]]))
+    assert BoolGrid.from_numpy(np.eye(2) > 0).values() == [[True, False], [False, True]]
+    grid = Grid.from_numpy(np.array([["a", "b"]]), storage_cls=DictStorage)
+    assert grid.data == Grid("ab").data
+    with pytest.raises(ValueError):
+        Grid.from_numpy(np.arange(3))
+    # Custom cells still validate, the numpy dtype only says they're ints
+    with pytest.raises(ValueError):
+        IntGrid.from_numpy(np.array([[0, 2]]), cell_cls=PositiveCell)
+
+
+def test_to_numpy():
+    grid = IntGrid("12\n34", storage_cls=ArrayStorage)
+    arr = grid.to_numpy()
+    assert arr.tolist() == [[1, 2], [3, 4]]
+    # Shares memory with the grid's buffer unless copy=True
+    arr[0, 0] = 9
+    assert grid.get(0, 0).value == 9
+    grid.to_numpy(copy=True)[0, 0] = 0
+    assert grid.get(0, 0).value == 9
+    assert Grid("ab\ncd").to_numpy().tolist() == [["a", "b"], ["c", "d"]]
+    with pytest.raises(ValueError):
+        Grid("ab\nc").to_numpy()
+
+
+def test_dataframe():
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
+    grid = IntGrid.from_dataframe(df)
+    assert grid.values() == [[1, 3], [2, 4]]
+    assert grid.to_dataframe().equals(pd.DataFrame([[1, 3], [2, 4]]))
+    grid = Grid.from_dataframe(pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}))
+    assert grid.values() == [[1, "x"], [2, "y"]]
+
+
+def test_arrow():
+    pa = pytest.importorskip("pyarrow")
+    table = IntGrid("123\n456", storage_cls=ArrayStorage).to_arrow()
+    assert table.column_names == ["0", "1", "2"]
+    assert table.to_pydict() == {"0": [1, 4], "1": [2, 5], "2": [3, 6]}
+    assert Grid("ab").to_arrow().to_pydict() == {"0": ["a"], "1": ["b"]}
+    grid = IntGrid.from_arrow(table, columns=["2", "0"])
+    assert grid.values() == [[3, 1], [6, 4]]
+    table = pa.table({"a": [1, None], "b": ["x", "y"]})
+    assert Grid.from_arrow(table).values() == [[1, "x"], [None, "y"]]
+    batch = pa.RecordBatch.from_pydict({"0": ["a", "c"], "1": ["b", None]})
+    assert Grid.from_arrow(batch).values() == [["a", "b"], ["c", None]]
+    batch = pa.RecordBatch.from_pydict({"0": ["a", "c"], "1": ["b", "d"]})
+    assert Grid.from_arrow(batch).values() == [["a", "b"], ["c", "d"]]
+
+
+def test_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "grid.parquet"
+    grid = IntGrid.from_numpy(np.arange(50).reshape(10, 5))
+    grid.to_parquet(path, row_group_size=3)
+    assert IntGrid.from_parquet(path).values() == grid.values()
+    loaded = IntGrid.from_parquet(path, rows=(2, 7), columns=["1", "4"])
+    assert loaded.values() == [[11, 14], [16, 19], [21, 24], [26, 29], [31, 34]]
+    assert IntGrid.from_parquet(path, rows=(20, 30)).shape == (0, 0)
@@ -0,0 +1,192 @@
+import array
+import pickle
+
+import pytest
+
+from gridthings import (
+    ArrayStorage,
+    Cell,
+    Collection,
+    DictStorage,
+    Grid,
+    HashStorage,
+    IntCell,
+    IntGrid,
+    MmapStorage,
+)
+
+# Storage is the layer underneath a Grid that holds the values.
+# DictStorage keeps a Cell per value, ArrayStorage keeps raw values
+# in one flat buffer.  Grids should behave the same on top of either.
+
+
+def test_default_storage_is_dict():
+    grid = Grid("abc\ndef")
+    assert isinstance(grid.storage, DictStorage)
+
+
+def test_array_storage_flat_buffer():
+    grid = Grid("abc\ndef", storage_cls=ArrayStorage)
+    assert isinstance(grid.storage, ArrayStorage)
+    assert grid.storage.buffer == ["a", "b", "c", "d", "e", "f"]
+    assert grid.storage.offsets == [0, 3, 6]
+
+
+def test_array_storage_typed_buffer():
+    grid = IntGrid("123\n456", storage_cls=ArrayStorage)
+    assert grid.storage.buffer == array.array("q", [1, 2, 3, 4, 5, 6])
+    assert grid.get(1, 2) == Cell(y=1, x=2, value=6)
+
+
+def test_array_storage_validates():
+    with pytest.raises(ValueError):
+        IntGrid("12\na4", storage_cls=ArrayStorage)
+
+
+def test_array_storage_grid_methods():
+    grid = Grid("abc\ndef\nxyz", storage_cls=ArrayStorage)
+    assert grid.shape == (3, 3)
+    assert grid.is_regular
+    assert repr(grid) == "<Grid shape=(3, 3)>"
+    assert grid.get(1, 1) == Cell(y=1, x=1, value="e")
+    assert grid.get_row(2) == Collection(
+        cells=[
+            Cell(y=2, x=0, value="x"),
+            Cell(y=2, x=1, value="y"),
+            Cell(y=2, x=2, value="z"),
+        ]
+    )
+    assert grid.get_column(0) == Collection(
+        cells=[
+            Cell(y=0, x=0, value="a"),
+            Cell(y=1, x=0, value="d"),
+            Cell(y=2, x=0, value="x"),
+        ]
+    )
+    assert grid.values() == [["a", "b", "c"], ["d", "e", "f"], ["x", "y", "z"]]
+    assert grid.flatten().values() == list("abcdefxyz")
+    assert grid.peek_linear(1, 1).values() == ["d", "f", "b", "y"]
+    assert grid.peek_left(0, 0).value is None
+    assert grid.data == Grid("abc\ndef\nxyz").data
+
+
+def test_array_storage_from_dicts():
+    data = {
+        0: {0: "a", 1: "d"},
+        1: {0: "b", 1: "e"},
+    }
+    grid = Grid(data, storage_cls=ArrayStorage)
+    assert grid.values() == [["a", "b"], ["d", "e"]]
+    grid = Grid([{0: "a", 1: "b"}, {0: "d", 1: "e"}], storage_cls=ArrayStorage)
+    assert grid.values() == [["a", "b"], ["d", "e"]]
+
+
+def test_array_storage_irregular():
+    grid = Grid("abc\nd", storage_cls=ArrayStorage)
+    assert not grid.is_regular
+    assert grid.shape == (2, 3)
+    assert grid.storage.row_bounds(1) == (0, 0)
+    assert grid.peek_down(0, 1).value is None
+    with pytest.raises(KeyError):
+        grid.get(1, 1)
+    with pytest.raises(KeyError):
+        grid.get(-1, 0)
+
+
+def test_array_storage_requires_contiguous_keys():
+    with pytest.raises(ValueError):
+        Grid([{0: "a", 2: "b"}], storage_cls=ArrayStorage)
+    with pytest.raises(ValueError):
+        Grid({0: {1: "a"}}, storage_cls=ArrayStorage)
+
+
+def test_set_value():
+    for storage_cls in [DictStorage, ArrayStorage]:
+        grid = IntGrid("12\n34", storage_cls=storage_cls)
+        grid.storage.set_value(1, 0, 9)
+        assert grid.values() == [[1, 2], [9, 4]]
+
+
+def test_mmap_storage(tmp_path):
+    path = tmp_path / "grid.txt"
+    path.write_bytes(b"123\n456\n789\n")
+    grid = IntGrid.from_mmap(path)
+    assert isinstance(grid.storage, MmapStorage)
+    assert grid.shape == (3, 3)
+    assert grid.get(1, 1) == IntCell(y=1, x=1, value=5)
+    assert grid.peek_linear(1, 1).values() == [4, 6, 2, 8]
+    assert grid.peek_down(2, 0).value is None
+    assert grid.values() == IntGrid("123\n456\n789").values()
+    with pytest.raises(TypeError):
+        grid.storage.set_value(0, 0, 1)
+    grid.storage.close()
+
+
+def test_mmap_storage_line_endings(tmp_path):
+    path = tmp_path / "grid.txt"
+    path.write_bytes(b"ab\r\ncd")
+    grid = Grid.from_mmap(path)
+    assert grid.values() == [["a", "b"], ["c", "d"]]
+
+    path.write_bytes(b"ab\ncde\n")
+    with pytest.raises(ValueError):
+        Grid.from_mmap(path)
+
+    # A short last line that still ends in a line break
+    path.write_bytes(b"abc\nde\n")
+    with pytest.raises(ValueError, match="y=1"):
+        Grid.from_mmap(path)
+
+    path.write_bytes(b"abc\nabcd")
+    with pytest.raises(ValueError):
+        Grid.from_mmap(path)
+
+    path.write_bytes(b"")
+    assert Grid.from_mmap(path).storage.shape == (0, 0)
+
+
+def test_mmap_storage_decode_errors(tmp_path):
+    path = tmp_path / "grid.txt"
+    path.write_bytes(b"12\n3x\n")
+    grid = IntGrid.from_mmap(path)
+    assert grid.get(0, 1).value == 2
+    with pytest.raises(ValueError, match="at y=1, x=1"):
+        grid.get(1, 1)
+
+
+def test_mmap_storage_pickle(tmp_path):
+    path = tmp_path / "grid.txt"
+    path.write_bytes(b"123\n456\n")
+    grid = pickle.loads(pickle.dumps(IntGrid.from_mmap(path)))
+    assert grid.values() == [[1, 2, 3], [4, 5, 6]]
+
+
+def test_hash_storage():
+    storage = HashStorage([(0, {-1: "a", 4: "b"}), (-3, ["c", "."])], default=".")
+    assert storage.contains(0, -1)
+    assert not storage.contains(-3, 1)
+    assert storage.shape == (4, 6)
+    assert storage.rows() == [-3, 0]
+    assert storage.row_keys(0) == [-1, 4]
+    assert storage.row_bounds(0) == (-1, 4)
+    assert storage.values() == [["c"], ["a", "b"]]
+    assert storage.get_cell(-3, 0) == Cell(y=-3, x=0, value="c")
+    assert [cell.value for cell in storage.column_cells(4)] == ["b"]
+    storage.set_value(0, 4, ".")
+    assert storage.shape == (4, 2)
+    assert storage.row_length(0) == 1
+    with pytest.raises(KeyError):
+        storage.get_value(0, 4)
+    assert storage.row_keys(0) == [-1]
+    storage.delete(-3, 0)
+    assert storage.rows() == [0]
+    with pytest.raises(KeyError):
+        storage.row_keys(-3)
+    storage.set_value(-3, 2, "d")
+    assert storage.row_keys(-3) == [2]
+    assert storage.values() == [["d"], ["a"]]
+
+
+def test_hash_storage_validates():
+    with pytest.raises(ValueError):
+        HashStorage([(0, ["1", "a"])], cell_cls=IntCell)